@@ -31,5 +31,8 @@ setup(
     packages=find_packages(),
     package_data={'uxdconverter': ['transition_energy/*.dat', 'constants/data/*.dat']},
     include_package_data=True,
-    install_requires=requires
+    install_requires=requires,
+    entry_points={
+        'console_scripts': ['uxdconverter-batch = uxdconverter.cli:main'],
+    },
 )
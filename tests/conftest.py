@@ -0,0 +1,49 @@
+import os
+import numpy as np
+import pytest
+
+from uxdconverter.measurement import Measurement
+from uxdconverter.raw.header.range import RangeHeader
+from uxdconverter.writer.synthetic import SyntheticMeasurementGenerator
+from uxdconverter.writer.raw import RawFileWriter
+from uxdconverter.writer.uxd import UXDFileWriter
+from uxdconverter.writer.xrdml import XRDMLFileWriter
+
+ABSORBER = os.path.join(os.path.dirname(__file__), 'plugin', 'scaling', 'Absorber.raw')
+
+
+@pytest.fixture
+def absorber():
+    """
+    Path of a raw file with several ranges, measured with different absorbers.
+    """
+    return ABSORBER
+
+
+@pytest.fixture
+def create_measurement():
+    """
+    Factory for measurements without errors. By default, an exponentially decaying reflectivity curve is created.
+    """
+    def create(x=None, y=None):
+        x = np.linspace(0.05, 3.0, 200) if x is None else np.asarray(x, dtype=float)
+        y = 1e5 * np.exp(-x) if y is None else np.broadcast_to(np.asarray(y, dtype=float), x.shape)
+        return Measurement([], np.column_stack([x, np.zeros_like(x), y, np.zeros_like(x)]))
+
+    return create
+
+
+@pytest.fixture
+def synthetic_files(tmp_path):
+    """
+    The same synthetic measurements, written as raw, uxd and xrdml file. Returns the paths by extension.
+    """
+    modes = [RangeHeader.MEASUREMENT_LOCKED_COUPLED, RangeHeader.MEASUREMENT_UNLOCKED_COUPLED]
+    ranges = SyntheticMeasurementGenerator(seed=3).generate(4, 40, modes=modes, psi_offsets=[0.0, 2.0])
+
+    files = {}
+    for extension, writer in [('raw', RawFileWriter), ('uxd', UXDFileWriter), ('xrdml', XRDMLFileWriter)]:
+        files[extension] = str(tmp_path / ('synthetic.' + extension))
+        writer(ranges).write(files[extension])
+
+    return files
@@ -0,0 +1,59 @@
+import logging
+import numpy as np
+
+from uxdconverter.parser.general import GeneralParser
+
+logger = logging.getLogger(__name__)
+
+
+def test_lazy_measurements_match_parse(synthetic_files):
+    parser = GeneralParser(logger)
+
+    for file in synthetic_files.values():
+        measurements = parser.parse(file)
+        lazy = parser.parse_lazy(file)
+
+        passes = []
+        source = lazy._source
+        lazy._source = lambda: passes.append(1) or source()
+
+        streamed = list(lazy.iter_measurements())
+        assert not lazy.is_loaded()
+        assert len(streamed) == measurements.get_count_measurements()
+        # the backgrounds were found by the same pass over the file
+        assert len(list(lazy.iter_background_measurements())) == measurements.get_count_background_measurements()
+        assert len(passes) == 1
+
+        assert len(list(lazy.iter_all_measurements())) == len(list(measurements.iter_all_measurements()))
+        assert len(passes) == 2
+
+        for expected, measurement in zip(measurements.get_measurements(), streamed):
+            np.testing.assert_array_equal(expected.get_data(), measurement.get_data())
+            assert expected.get_psi() == measurement.get_psi()
+
+        assert lazy.get_count_measurements() == measurements.get_count_measurements()
+        assert lazy.is_loaded()
+
+
+def test_detect_by_content(tmp_path, synthetic_files):
+    parser = GeneralParser(logger)
+
+    for extension, file in synthetic_files.items():
+        assert parser.detect(file).get_name() == extension
+
+        # a misnamed file is still parsed by the right parser
+        misnamed = str(tmp_path / ('misnamed_%s.txt' % extension))
+        with open(file, 'rb') as src, open(misnamed, 'wb') as dst:
+            dst.write(src.read())
+
+        assert parser.detect(misnamed).get_name() == extension
+        np.testing.assert_array_equal(parser.parse(file).get_measurement(0).get_data(),
+                                      parser.parse(misnamed).get_measurement(0).get_data())
+
+    simple = tmp_path / 'simple.txt'
+    simple.write_text("# 2theta cps\n0.5 100\n0.6 90\n")
+    assert parser.detect(str(simple)).get_name() == 'simple'
+
+    unknown = tmp_path / 'unknown.bin'
+    unknown.write_bytes(b'\x00\x01\x02')
+    assert not parser.can_parse(str(unknown))
@@ -0,0 +1,19 @@
+import logging
+
+import numpy as np
+
+from uxdconverter.parser.uxd import MeasurementParser
+
+
+def test_parse_data_block():
+    parser = MeasurementParser(logging.getLogger(__name__))
+
+    data = parser._parse_data_block('1.0 2.0\n3.0 4,5\n', 2)
+    np.testing.assert_array_equal(data, [[0.5, 0, 4.0, 0], [1.5, 0, 9.0, 0]])
+
+    # blank lines are skipped
+    np.testing.assert_array_equal(parser._parse_data_block('\n1.0 2.0\n\n  \n3.0 4,5\n\n', 2), data)
+
+    # lines with more or less than two columns are rejected, instead of pairing the values across lines
+    assert len(parser._parse_data_block('1.0 2.0 5\n3.0\n', 2)) == 0
+    np.testing.assert_array_equal(parser._parse_data_block('1.0 2.0\n3.0\n5.0 6.0 7.0\n3.0 4.5\n', 2), data)
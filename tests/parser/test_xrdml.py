@@ -0,0 +1,54 @@
+import logging
+
+import numpy as np
+
+from uxdconverter.parser.xrdml import XRDMLParser, XRDMLContextParser, DetectorMode
+from uxdconverter.writer.synthetic import SyntheticMeasurementGenerator
+from uxdconverter.writer.xrdml import XRDMLFileWriter
+
+logger = logging.getLogger(__name__)
+
+
+def test_iterparse_clears_scans(tmp_path):
+    ranges = SyntheticMeasurementGenerator(seed=9).generate(4, 30)
+    file = str(tmp_path / 'scans.xrdml')
+    XRDMLFileWriter(ranges, detector_mode='Static').write(file)
+
+    parser = XRDMLParser(file, logger)
+    for number, (scan, detector_mode) in enumerate(parser._iter_scans()):
+        assert detector_mode == DetectorMode.STATIC
+        # the scans read before were cleared and removed from the document, except the last one
+        previous = [element for element in scan.itersiblings(scan.tag, preceding=True)]
+        assert len(previous) == min(number, 1)
+        assert all([len(element) == 0 for element in previous])
+
+        np.testing.assert_allclose(parser._get_measurement(scan).get_y(), ranges[number].counts)
+
+
+def test_parse_header(tmp_path):
+    ranges = SyntheticMeasurementGenerator(seed=10).generate(2, 30)
+    file = str(tmp_path / 'header.xrdml')
+    XRDMLFileWriter(ranges, wavelength=1.39).write(file)
+
+    # the header is read without reading the scans, i.e. a file cut within the first scan is fine
+    with open(file, 'r') as fp:
+        content = fp.read()
+    with open(file, 'w') as fp:
+        fp.write(content[:content.index('<scan') + 200])
+
+    context = XRDMLContextParser(file).parse_header()
+    assert context.wavelength == 1.39
+
+
+def test_parallel_matches_sequential(tmp_path):
+    ranges = SyntheticMeasurementGenerator(seed=11).generate(7, 30)
+    file = str(tmp_path / 'parallel.xrdml')
+    XRDMLFileWriter(ranges, detector_mode='Scanning').write(file)
+
+    sequential = list(XRDMLParser(file, logger).iter_measurements())
+    parallel = list(XRDMLParser(file, logger, processes=2).iter_measurements())
+
+    assert len(parallel) == len(sequential)
+    for expected, measurement in zip(sequential, parallel):
+        np.testing.assert_array_equal(measurement.get_data(), expected.get_data())
+        assert measurement.get_context('DetectorMode') == DetectorMode.CONTINUOUS
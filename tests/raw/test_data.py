@@ -0,0 +1,30 @@
+import struct
+
+import numpy as np
+
+from uxdconverter.raw.data import DataSet
+
+
+def test_data_set():
+    values = [0.0, 1.5, 1e6, 3.25]
+    data_set = DataSet(struct.pack('<4f', *values))
+
+    data = data_set.get_data_array()
+    assert data.dtype == np.dtype('<f4')
+    np.testing.assert_array_equal(data, values)
+    assert not data.flags.writeable
+    assert data_set.get_data_points() == values
+
+    copy = data_set.get_data_array(copy=True)
+    copy[0] = 2.0
+    assert data_set.get_data_array()[0] == 0.0
+
+
+def test_truncated_data_set():
+    # an incomplete trailing value is ignored
+    data_set = DataSet(struct.pack('<2f', 1.0, 2.0) + b'\x00\x00')
+    assert data_set.get_number_of_data_points() == 2
+    np.testing.assert_array_equal(data_set.get_data_array(), [1.0, 2.0])
+
+    assert len(DataSet(b'\x00\x00').get_data_array()) == 0
+    assert len(DataSet(b'').get_data_array()) == 0
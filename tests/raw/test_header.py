@@ -0,0 +1,49 @@
+from uxdconverter.raw.header.file import FileHeader
+from uxdconverter.raw.header.range import RangeHeader
+from uxdconverter.raw.parser import RawParser
+from uxdconverter.writer.raw import RawFileWriter
+from uxdconverter.writer.synthetic import SyntheticMeasurementGenerator
+
+
+def parse_synthetic():
+    ranges = SyntheticMeasurementGenerator(seed=4).generate(2, 20, step_time=2.5)
+    return RawParser().parse(RawFileWriter(ranges, wavelength=1.5418, date='05/06/21', time='12:34:56').to_bytes())
+
+
+def test_file_header_layout():
+    header = parse_synthetic().get_header()
+
+    # the precompiled layout gives the same values as decoding field by field
+    assert header.can_read() == (header.get_string(0, 8) == 'RAW1.01')
+    assert header.get_number_of_completed_data_ranges() == header.get_integer(12) == 2
+    assert header.get_date() == header.get_string(16, 10) == '05/06/21'
+    assert header.get_time() == header.get_string(26, 10) == '12:34:56'
+    assert header.get_type_anode() == header.get_string(608, 4) == 'Cu'
+    assert header.get_average_wavelength() == header.get_double(616) == 1.5418
+    assert header.get_units_wavelength() == FileHeader.UNITS_ANGSTROM
+    assert header.get_total_measurement_time() == header.get_float(664)
+
+    fields = FileHeader.LAYOUT.unpack(header.get_data(0, FileHeader.LENGTH))
+    assert fields.number_of_completed_data_ranges == 2
+    assert fields._fields[0] == 'raw_version'
+
+
+def test_range_header_layout():
+    for ms_range in parse_synthetic().get_measurements():
+        header = ms_range.get_header()
+
+        assert header.can_read()
+        assert header.get_number_of_data_records() == header.get_integer(4) == 20
+        for getter, address in [(header.get_start_theta, 8), (header.get_start_two_theta, 16),
+                                (header.get_start_chi, 24), (header.get_start_phi, 32), (header.get_start_x, 40),
+                                (header.get_start_y, 48), (header.get_start_z, 56), (header.get_step_size, 176),
+                                (header.get_wavelength, 240)]:
+            assert getter() == header.get_double(address)
+
+        for getter, address in [(header.get_scan_mode, 168), (header.get_measurement_mode, 196),
+                                (header.get_generator_kilovoltage, 224), (header.get_generator_milliamps, 228),
+                                (header.get_data_length, 252), (header.get_supplementary_header_length, 256)]:
+            assert getter() == header.get_integer(address)
+
+        assert header.get_step_time() == header.get_float(192) == 2.5
+        assert header.get_length() == RangeHeader.LENGTH + header.get_supplementary_header_length()
@@ -0,0 +1,56 @@
+import numpy as np
+
+from uxdconverter.raw.index import RawIndex
+from uxdconverter.raw.parser import RawParser
+from uxdconverter.writer.raw import RawFileWriter
+from uxdconverter.writer.synthetic import SyntheticMeasurementGenerator
+
+
+def write_raw(file, ranges):
+    raw = RawFileWriter(ranges).to_bytes()
+    with open(file, 'wb') as fp:
+        fp.write(raw)
+
+    return raw
+
+
+def test_raw_index(tmp_path):
+    ranges = SyntheticMeasurementGenerator(seed=5).generate(4, 30)
+    ranges[2].comment = 'third range'
+    file = str(tmp_path / 'indexed.raw')
+    write_raw(file, ranges)
+
+    index = RawIndex.from_file(file)
+    parsed = RawParser().parse_from_file(file).get_measurements()
+
+    assert index.get_number_of_ranges() == 4
+    assert index.get_entry(2).get_header().get_supplementaries().get_number_of_supplementaries() == 1
+
+    # random access gives the same ranges as parsing the whole file
+    for number in [3, 0, 2]:
+        loaded = index.load_range(number)
+        assert loaded.get_header().get_start_two_theta() == ranges[number].start_two_theta
+        np.testing.assert_array_equal(loaded.get_data().get_data_array(),
+                                      parsed[number].get_data().get_data_array())
+
+
+def test_truncated_raw_index(tmp_path):
+    ranges = SyntheticMeasurementGenerator(seed=6).generate(3, 30)
+    file = str(tmp_path / 'truncated.raw')
+    raw = write_raw(file, ranges)
+
+    # the last range is cut in the middle of its data block
+    with open(file, 'wb') as fp:
+        fp.write(raw[:len(raw) - 10 * 4])
+
+    index = RawIndex.from_file(file)
+    assert index.get_header().get_number_of_completed_data_ranges() == 3
+    assert index.get_number_of_ranges() == 2
+    np.testing.assert_array_equal(index.load_range(1).get_data().get_data_array(), ranges[1].counts)
+
+    # once the file is complete, the missing range is indexed
+    with open(file, 'wb') as fp:
+        fp.write(raw)
+
+    assert [entry.get_number() for entry in index.refresh()] == [2]
+    np.testing.assert_array_equal(index.load_range(2).get_data().get_data_array(), ranges[2].counts)
@@ -0,0 +1,76 @@
+import struct
+
+import numpy as np
+
+from uxdconverter.raw.header.file import FileHeader
+from uxdconverter.raw.header.range import RangeHeader
+from uxdconverter.raw.parser import RawParser
+from uxdconverter.writer.raw import RawFileWriter
+from uxdconverter.writer.synthetic import SyntheticMeasurementGenerator
+
+
+def slice_ranges(raw: bytes):
+    """
+    Splits the file by slicing the bytes, as the parser did before it used a memoryview, i.e. returns the bytes of
+    the file header and (range header, supplementary headers, data) of every range.
+    """
+    file_header = raw[0:FileHeader.LENGTH]
+    raw = raw[FileHeader.LENGTH:]
+    ranges = []
+
+    for _ in range(struct.unpack_from('<I', file_header, 12)[0]):
+        number_of_records, = struct.unpack_from('<I', raw, 4)
+        data_length, suppl_length = struct.unpack_from('<II', raw, 252)
+
+        header = raw[0:RangeHeader.LENGTH]
+        raw = raw[RangeHeader.LENGTH:]
+        suppls = raw[0:suppl_length]
+        raw = raw[suppl_length:]
+        data = raw[0:data_length * number_of_records]
+        raw = raw[data_length * number_of_records:]
+
+        ranges.append((header, suppls, data))
+
+    return file_header, ranges
+
+
+def test_parse_matches_slicing():
+    ranges = SyntheticMeasurementGenerator(seed=3).generate(3, 40)
+    ranges[1].comment = 'second range'
+    raw = RawFileWriter(ranges).to_bytes()
+
+    file_header, expected = slice_ranges(raw)
+    parsed = RawParser().parse(raw)
+
+    assert bytes(parsed.get_header().get_data(0, FileHeader.LENGTH)) == file_header
+    assert len(parsed.get_measurements()) == len(expected)
+
+    for ms_range, (header, suppls, data) in zip(parsed.get_measurements(), expected):
+        range_header = ms_range.get_header()
+        assert bytes(range_header.get_data(0, RangeHeader.LENGTH)) == header
+        assert range_header.get_supplementaries().get_length() == len(suppls)
+
+        data_set = ms_range.get_data()
+        assert bytes(data_set.get_data(0, data_set.get_length())) == data
+        np.testing.assert_array_equal(data_set.get_data_array(), np.frombuffer(data, dtype='<f4'))
+
+    assert sum([ms_range.get_length() for ms_range in parsed.get_measurements()]) + FileHeader.LENGTH == len(raw)
+
+
+def test_iter_from_file_matches_parse(tmp_path):
+    raw = RawFileWriter(SyntheticMeasurementGenerator(seed=4).generate(3, 40)).to_bytes()
+    parser = RawParser()
+
+    # the last range of the truncated file has only a part of its data points
+    for length in [len(raw), len(raw) - 50]:
+        file = str(tmp_path / ('file_%s.raw' % length))
+        with open(file, 'wb') as fp:
+            fp.write(raw[:length])
+
+        parsed = parser.parse_from_file(file).get_measurements()
+        streamed = list(parser.iter_from_file(file))
+
+        assert len(streamed) == len(parsed)
+        for expected, ms_range in zip(parsed, streamed):
+            assert ms_range.get_length() == expected.get_length()
+            np.testing.assert_array_equal(ms_range.get_data().get_data_array(), expected.get_data().get_data_array())
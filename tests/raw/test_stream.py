@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+
+from uxdconverter.raw.stream import RawFileFollower
+from uxdconverter.writer.raw import RawFileWriter
+from uxdconverter.writer.synthetic import SyntheticMeasurementGenerator
+
+
+def write(file, raw):
+    with open(file, 'wb') as fp:
+        fp.write(raw)
+
+
+def test_follow_appended_ranges(tmp_path):
+    ranges = SyntheticMeasurementGenerator(seed=7).generate(4, 25)
+    file = str(tmp_path / 'acquisition.raw')
+    follower = RawFileFollower(file)
+
+    assert follower.poll() == []
+
+    write(file, RawFileWriter(ranges[:2]).to_bytes())
+    first = follower.poll()
+    assert len(first) == 2
+
+    # the third range is announced in the file header, but its last data point is only partially written
+    raw = RawFileWriter(ranges[:3]).to_bytes()
+    write(file, raw[:-2])
+    assert follower.poll() == []
+
+    write(file, RawFileWriter(ranges).to_bytes())
+    rest = follower.poll()
+    assert len(rest) == 2
+    assert follower.poll() == []
+
+    for ms_range, measurement in zip(ranges, first + rest):
+        np.testing.assert_allclose(measurement.get_y(), ms_range.counts)
+
+
+def test_follow_replaced_file(tmp_path):
+    generator = SyntheticMeasurementGenerator(seed=8)
+    file = str(tmp_path / 'acquisition.raw')
+    follower = RawFileFollower(file)
+
+    write(file, RawFileWriter(generator.generate(3, 25)).to_bytes())
+    assert len(follower.poll()) == 3
+
+    # a new measurement is written to a new file with the same name
+    ranges = generator.generate(2, 25, start_two_theta=1.0)
+    replacement = str(tmp_path / 'replacement.raw')
+    write(replacement, RawFileWriter(ranges).to_bytes())
+    os.replace(replacement, file)
+
+    measurements = follower.poll()
+    assert len(measurements) == 2
+    np.testing.assert_allclose(measurements[0].get_y(), ranges[0].counts)
+
+    # the file is truncated and rewritten in-place
+    ranges = generator.generate(1, 25)
+    write(file, RawFileWriter(ranges).to_bytes())
+
+    measurements = follower.poll()
+    assert len(measurements) == 1
+    np.testing.assert_allclose(measurements[0].get_y(), ranges[0].counts)
+    assert follower.get_number_of_ranges() == 1
+
+
+def test_follow_rewritten_in_place(tmp_path):
+    generator = SyntheticMeasurementGenerator(seed=9)
+    file = str(tmp_path / 'acquisition.raw')
+    follower = RawFileFollower(file)
+
+    write(file, RawFileWriter(generator.generate(3, 25)).to_bytes())
+    assert len(follower.poll()) == 3
+
+    # the file is overwritten without truncating it, i.e. its size stays the same
+    ranges = generator.generate(3, 25)
+    raw = RawFileWriter(ranges).to_bytes()
+    assert len(raw) == os.path.getsize(file)
+    with open(file, 'r+b') as fp:
+        fp.write(raw)
+
+    measurements = follower.poll()
+    assert len(measurements) == 3
+    np.testing.assert_allclose(measurements[0].get_y(), ranges[0].counts)
+
+    # the file is rewritten in-place with more ranges, i.e. it grows
+    ranges = generator.generate(4, 25)
+    write(file, RawFileWriter(ranges).to_bytes())
+
+    measurements = follower.poll()
+    assert len(measurements) == 4
+    np.testing.assert_allclose(measurements[0].get_y(), ranges[0].counts)
+    assert follower.get_number_of_ranges() == 4
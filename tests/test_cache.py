@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import numpy as np
+
+from uxdconverter.cache import ParseCache
+from uxdconverter.parser.general import GeneralParser
+
+logger = logging.getLogger(__name__)
+
+
+def test_cached_measurements_match_parse(tmp_path, synthetic_files):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    parser = GeneralParser(logger, cache)
+
+    for file in synthetic_files.values():
+        measurements = GeneralParser(logger).parse(file)
+        parser.parse(file)
+        cached = cache.load(file)
+
+        assert cached is not None
+        assert cached.get_headers() == measurements.get_headers()
+        assert vars(cached.get_context()) == vars(measurements.get_context())
+        assert cached.get_count_measurements() == measurements.get_count_measurements()
+        assert cached.get_count_background_measurements() == measurements.get_count_background_measurements()
+
+        expected_all = measurements.get_measurements() + measurements.get_background_measurements()
+        cached_all = cached.get_measurements() + cached.get_background_measurements()
+        for expected, measurement in zip(expected_all, cached_all):
+            np.testing.assert_array_equal(expected.get_data(), measurement.get_data())
+            assert expected.get_headers() == measurement.get_headers()
+            assert expected.get_psi() == measurement.get_psi()
+            assert expected.get_positions() == measurement.get_positions()
+            assert expected.get_contexts() == measurement.get_contexts()
+
+
+def test_modified_file_is_not_served(tmp_path, synthetic_files):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    file = synthetic_files['raw']
+
+    GeneralParser(logger, cache).parse(file)
+    assert cache.load(file) is not None
+
+    stat = os.stat(file)
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.load(file) is None
+
+
+def test_eviction(tmp_path, synthetic_files):
+    cache = ParseCache(str(tmp_path / 'cache'), max_size=1)
+
+    GeneralParser(logger, cache).parse(synthetic_files['raw'])
+    assert cache.get_size() == 0
+
+
+def test_only_known_enums_are_restored(tmp_path, synthetic_files):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    file = synthetic_files['raw']
+
+    GeneralParser(logger, cache).parse(file)
+    data_path, meta_path = cache._paths(cache.get_key(file))
+
+    with open(meta_path, 'r', encoding='utf-8') as fp:
+        meta = json.load(fp)
+    meta['measurements'][0]['context']['mode'] = {'__enum__': 'os:system', 'value': 'echo'}
+    with open(meta_path, 'w', encoding='utf-8') as fp:
+        json.dump(meta, fp)
+
+    assert cache.load(file) is None
+    assert not os.path.exists(meta_path)
+
+
+def test_rewritten_file_is_not_served(tmp_path, synthetic_files):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    file = synthetic_files['uxd']
+
+    GeneralParser(logger, cache).parse(file)
+    stat = os.stat(file)
+
+    # the same size and modification time, but different content
+    with open(file, 'r+b') as fp:
+        fp.seek(-4, os.SEEK_END)
+        fp.write(b'9999')
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert cache.load(file) is None
+
+
+def test_evicted_entry_is_a_miss(tmp_path, synthetic_files, monkeypatch):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    file = synthetic_files['raw']
+    GeneralParser(logger, cache).parse(file)
+
+    def utime(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, 'utime', utime)
+    assert cache.load(file) is None
+
+
+def test_stale_files_are_removed(tmp_path, synthetic_files):
+    directory = tmp_path / 'cache'
+    directory.mkdir()
+    stale, recent = directory / 'interrupted.tmp', directory / 'writing.tmp'
+    orphan = directory / 'orphan.npz'
+
+    for path in [stale, recent, orphan]:
+        path.write_bytes(b'partial')
+    for path in [stale, orphan]:
+        os.utime(str(path), (0, 0))
+
+    GeneralParser(logger, ParseCache(str(directory))).parse(synthetic_files['raw'])
+    assert not stale.exists() and not orphan.exists()
+    assert recent.exists()
@@ -0,0 +1,58 @@
+import multiprocessing
+import os
+import shutil
+
+import pytest
+
+from uxdconverter import cli
+from uxdconverter.cli import main, find_files, group_files, convert_files, BatchConverter
+
+
+def test_batch_conversion(tmp_path, capsys, absorber):
+    inputs = tmp_path / 'inputs'
+    inputs.mkdir()
+    shutil.copy(absorber, str(inputs / 'absorber.raw'))
+    (inputs / 'notes.txt').write_text("not a measurement\n")
+
+    context = tmp_path / 'context.yaml'
+    context.write_text("knife_edge: true\nqz_range: [0, 10]\nnormalization: max\n")
+
+    assert find_files([str(inputs)]) == [str(inputs / 'absorber.raw')]
+
+    output = tmp_path / 'output'
+    assert main(['--context', str(context), '--output-dir', str(output), '--jobs', '1', str(inputs)]) == 0
+    assert (output / 'absorber.dat').exists()
+    assert "Converted 1 of 1" in capsys.readouterr().out
+
+    # existing outputs are not overwritten
+    assert main(['--output-dir', str(output), '--jobs', '1', str(inputs)]) == 1
+
+
+def test_glob_skips_outputs(tmp_path, absorber):
+    shutil.copy(absorber, str(tmp_path / 'absorber.raw'))
+    assert main(['--jobs', '1', str(tmp_path / 'absorber.raw')]) == 0
+
+    # absorber.dat was exported by the first run
+    assert find_files([str(tmp_path / '*')], '.dat') == [str(tmp_path / 'absorber.raw')]
+
+
+def convert_or_crash(files, output, *args):
+    if 'crash' in os.path.basename(files[0]):
+        os._exit(1)
+
+    return convert_files(files, output, *args)
+
+
+def test_crashing_worker(tmp_path, absorber, monkeypatch):
+    if multiprocessing.get_start_method() != 'fork':
+        pytest.skip("The patched conversion is used by forked worker processes only")
+
+    for name in ['a.raw', 'crash.raw', 'b.raw']:
+        shutil.copy(absorber, str(tmp_path / name))
+
+    monkeypatch.setattr(cli, 'convert_files', convert_or_crash)
+    files = find_files([str(tmp_path)])
+    results = BatchConverter(jobs=2).convert(group_files(files))
+
+    assert [os.path.basename(result.files[0]) for result in results if not result.is_successful()] == ['crash.raw']
+    assert all([os.path.exists(result.output) for result in results if result.is_successful()])
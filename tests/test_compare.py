@@ -0,0 +1,50 @@
+import numpy as np
+
+from uxdconverter.compare import Comparator
+from uxdconverter.measurement import Measurement
+
+
+def test_overlapping_data(create_measurement):
+    ms_1 = create_measurement(np.arange(0, 2.05, 0.1), 1)
+    ms_2 = create_measurement(np.arange(1.5, 3.05, 0.1), 1)
+    comparator = Comparator()
+
+    region = comparator.overlap_limits(ms_1, ms_2)
+    overlap_1, overlap_2 = comparator.overlapping_data(ms_1, ms_2)
+
+    for ms, overlap in [(ms_1, overlap_1), (ms_2, overlap_2)]:
+        data = ms.get_data()
+        expected = data[(data[:, 0] >= region[1]) & (data[:, 0] <= region[0])]
+        np.testing.assert_array_equal(overlap, expected)
+        assert not overlap.flags.writeable
+
+    # unsorted data is filtered instead
+    reversed_1 = create_measurement(ms_1.get_data()[::-1, 0], 1)
+    assert not reversed_1.is_sorted_x()
+    np.testing.assert_array_equal(comparator.overlapping_data(reversed_1, ms_2)[0], overlap_1[::-1])
+
+
+def test_interpolate():
+    x = np.array([0.0, 1.0, 2.0])
+    ms = Measurement([], np.column_stack([x, x, [1.0, 3.0, 9.0], [0.1, 0.3, 0.9]]))
+    comparator = Comparator()
+
+    linear = comparator.interpolate(ms, [0.5, 2.0])
+    np.testing.assert_allclose(linear[:, 2], [2.0, 9.0])
+    np.testing.assert_allclose(linear[:, 3], [np.sqrt(0.05 ** 2 + 0.15 ** 2), 0.9])
+
+    log = comparator.interpolate(ms, [0.5, 1.5], Comparator.INTERPOLATION_LOG)
+    np.testing.assert_allclose(log[:, 2], [np.sqrt(3), np.sqrt(27)])
+    np.testing.assert_allclose(log[:, 3] / log[:, 2], [np.sqrt(0.05 ** 2 + 0.05 ** 2)] * 2)
+
+
+def test_aligned_overlapping_data(create_measurement):
+    ms_1 = create_measurement(np.arange(0, 2.05, 0.1), 1)
+    ms_2 = create_measurement(np.arange(1.5, 3.05, 0.25), 1)
+    comparator = Comparator()
+
+    overlap_1, overlap_2 = comparator.aligned_overlapping_data(ms_1, ms_2)
+
+    assert len(overlap_1) == len(overlap_2)
+    np.testing.assert_array_equal(overlap_1[:, 0], overlap_2[:, 0])
+    np.testing.assert_allclose(overlap_2[:, 2], 1.0)
@@ -0,0 +1,121 @@
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from uxdconverter.enums import DataNormalizationMethod
+from uxdconverter.measurement import MeasurementContext, FrozenMeasurementContext, Measurement
+
+
+def create_context():
+    context = MeasurementContext()
+    context.normalization = DataNormalizationMethod.MAX
+    context.qz_range = (0.01, 0.3)
+    context.knife_edge = True
+    return context
+
+
+def test_context_round_trip():
+    context = create_context()
+
+    assert MeasurementContext.from_dict(context.to_dict()).to_dict() == context.to_dict()
+    assert MeasurementContext.from_json(context.to_json()).to_dict() == context.to_dict()
+    assert MeasurementContext.from_yaml(context.to_yaml()).to_dict() == context.to_dict()
+    assert MeasurementContext.from_json(context.to_json()).normalization is DataNormalizationMethod.MAX
+    assert MeasurementContext.from_json(context.to_json()).qz_range == (0.01, 0.3)
+
+    with pytest.raises(RuntimeError):
+        MeasurementContext.from_dict({'unknown': 1})
+
+
+def test_context_hash():
+    context = create_context()
+    other = create_context()
+    assert context.content_hash() == other.content_hash()
+
+    other.sample_length = 10.0
+    assert context.content_hash() == other.content_hash()
+
+    other.qz_range = (0.01, 0.2)
+    assert context.to_dict() != other.to_dict()
+    assert context.content_hash() != other.content_hash()
+
+
+def test_frozen_context():
+    context = create_context()
+    frozen = context.freeze()
+
+    assert isinstance(frozen, FrozenMeasurementContext)
+    assert frozen.to_dict() == context.to_dict()
+    assert frozen == create_context().freeze()
+    # a mutable context keeps the identity hash
+    assert {context: 1}[context] == 1
+    assert create_context() not in {context: 1}
+    assert hash(frozen) == hash(pickle.loads(pickle.dumps(frozen)))
+    assert {frozen: 1}[create_context().freeze()] == 1
+
+    with pytest.raises(RuntimeError):
+        frozen.knife_edge = False
+
+    thawed = frozen.thaw()
+    thawed.knife_edge = False
+    assert thawed.to_dict() != frozen.to_dict()
+
+
+def test_measurement_columns():
+    data = np.array([[0.1, 0.0, 10.0, 1.0], [0.2, 0.0, -1.0, 1.0], [0.3, 0.0, 5.0, 2.0]])
+    ms = Measurement([], data)
+
+    # negative counts are removed
+    np.testing.assert_array_equal(ms.get_data(), data[[0, 2]])
+    np.testing.assert_array_equal(ms.get_x(), [0.1, 0.3])
+    assert ms.get_length() == 2
+
+    view = ms.get_data_view()
+    x = ms.get_x()
+    with pytest.raises(ValueError):
+        x[0] = 1.0
+
+    # copy-on-write: scaling replaces the data, the views keep their values
+    shared = ms.copy()
+    ms.scale_y(2)
+    np.testing.assert_array_equal(ms.get_y(), [20.0, 10.0])
+    np.testing.assert_array_equal(view[:, 2], [10.0, 5.0])
+    np.testing.assert_array_equal(shared.get_y(), [10.0, 5.0])
+
+    columns = Measurement.from_columns([], [0.1, 0.3], [20.0, 10.0], dy=[2.0, 4.0])
+    np.testing.assert_array_equal(columns.get_data(), ms.get_data())
+
+    for other in [copy.deepcopy(ms), pickle.loads(pickle.dumps(ms))]:
+        np.testing.assert_array_equal(other.get_data(), ms.get_data())
+        assert not other.get_x().flags.writeable
+
+
+def test_measurement_summary():
+    x = np.arange(0.05, 3.0, 0.01)
+    y = np.exp(-x)
+    ms = Measurement.from_columns([], x, y)
+    summary = ms.get_summary()
+
+    assert summary.get_x_min() == x[0] and summary.get_x_max() == x[-1]
+    assert summary.is_sorted()
+    assert summary.get_step() == pytest.approx(0.01)
+    assert summary.get_total_counts() == pytest.approx(np.sum(y))
+    assert summary.get_max_counts() == y[0]
+
+    irregular = Measurement.from_columns([], np.sort(np.random.RandomState(0).uniform(0, 3, 200)), np.ones(200))
+    assert irregular.get_summary().get_step() is None
+
+    # the index range is the same as the one found by filtering
+    for measurement in [ms, irregular]:
+        data = measurement.get_data()
+        for x_min, x_max in [(0.5, 1.5), (x[10], x[20]), (-1, 10), (2.0, 1.0), (x[5] + 1e-12, x[7] - 1e-12)]:
+            start, end = measurement.get_index_range_x(x_min, x_max)
+            expected = data[(x_min <= data[:, 0]) & (data[:, 0] <= x_max)]
+            np.testing.assert_array_equal(data[start:end], expected)
+
+    # the summary is computed again after the data was replaced
+    ms.scale_y(2)
+    assert ms.get_summary().get_max_counts() == 2 * y[0]
+    assert Measurement.from_columns([], x[::-1], y).get_index_range_x(0.5, 1.5) is None
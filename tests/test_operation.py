@@ -0,0 +1,120 @@
+import numpy as np
+
+from uxdconverter.measurement import Measurement, MeasurementContext
+from uxdconverter.operation import ErrorCalculation, DataIlluminationCorrection, QzCalculation, QzCropping
+
+
+def test_manipulations(create_measurement):
+    context = MeasurementContext()
+    context.qz_range = (0.05, 0.15)
+    ms = ErrorCalculation().manipulate(create_measurement(), context)
+    data = ms.get_data()
+
+    np.testing.assert_array_equal(data[:, 1], context.theta_error)
+    np.testing.assert_array_equal(data[:, 3], np.sqrt(data[:, 2]))
+
+    corrected = DataIlluminationCorrection().manipulate(ms, context).get_data()
+    critical_angle = np.rad2deg(np.arcsin(context.xray_width / context.sample_length))
+    for row, expected in zip(corrected, data):
+        factor = 1.0
+        if expected[0] <= critical_angle:
+            factor = context.xray_width / context.sample_length / np.sin(np.deg2rad(expected[0]))
+        np.testing.assert_allclose(row, expected * [1, 1, factor, factor], rtol=1e-14)
+
+    qz = QzCalculation().manipulate(ms, context).get_data()
+    np.testing.assert_allclose(qz[:, 0], 4 * np.pi / context.wavelength * np.sin(np.deg2rad(data[:, 0])), rtol=1e-14)
+
+    cropped = QzCropping().manipulate(Measurement([], qz), context).get_data()
+    assert np.all((cropped[:, 0] >= 0.05) & (cropped[:, 0] <= 0.15))
+    assert len(cropped) == np.count_nonzero((qz[:, 0] >= 0.05) & (qz[:, 0] <= 0.15))
+
+    # sorted data is cropped by slicing, unsorted data by filtering
+    for data in [qz, qz[::-1], qz[np.random.RandomState(0).permutation(len(qz))]]:
+        inside = (data[:, 0] >= 0.05) & (data[:, 0] <= 0.15)
+        np.testing.assert_array_equal(QzCropping().apply(data.copy(), context), data[inside])
+    assert np.shares_memory(QzCropping().apply(qz, context), qz)
+
+
+def test_global_scaling_merger():
+    from uxdconverter.operation import GlobalScalingMerger
+
+    theta = np.linspace(0.1, 3.0, 291)
+    curve = 1e6 * np.exp(-2 * theta)
+    factors = [0.01, 0.1, 1.0]
+    segments = []
+
+    # three segments measured with different absorbers, each overlapping with the next one
+    for (start, end), factor in zip([(0, 110), (100, 210), (200, 291)], factors):
+        x = theta[start:end]
+        y = curve[start:end] * factor
+        segments.append(Measurement([], np.column_stack([x, np.zeros_like(x), y, np.sqrt(y)])))
+
+    before = [ms.get_data() for ms in segments]
+    merger = GlobalScalingMerger()
+
+    np.testing.assert_allclose(merger.scaling_factors(segments), [1 / f for f in factors], rtol=1e-12)
+
+    merged = merger.merge(segments[::-1]).get_data()
+    np.testing.assert_array_equal(merged[:, 0], theta)
+    np.testing.assert_allclose(merged[:, 2], curve, rtol=1e-12)
+
+    for data, ms in zip(before, segments):
+        np.testing.assert_array_equal(data, ms.get_data())
+
+
+def test_global_scaling_merger_skipping_overlap():
+    from uxdconverter.operation import GlobalScalingMerger
+
+    theta = np.linspace(0.1, 3.0, 291)
+    curve = 1e6 * np.exp(-2 * theta)
+    segments = []
+
+    # the first segment overlaps with the third one, too. It keeps its overlap with the second segment, which in turn
+    # loses its overlap to the third segment.
+    for (start, end), factor in zip([(0, 150), (100, 200), (140, 291)], [1.0, 0.01, 0.1]):
+        x = theta[start:end]
+        y = curve[start:end] * factor
+        segments.append(Measurement([], np.column_stack([x, np.zeros_like(x), y, np.sqrt(y)])))
+
+    merged = GlobalScalingMerger().merge(segments).get_data()
+    assert np.all(np.diff(merged[:, 0]) > 0)
+    np.testing.assert_array_equal(merged[:, 0], theta)
+    np.testing.assert_allclose(merged[:, 2], curve, rtol=1e-12)
+
+def test_merge_averaging():
+    from uxdconverter.operation import MeasurementMerger
+
+    theta = np.linspace(0.1, 3.0, 291)
+    curve = 1e6 * np.exp(-2 * theta)
+
+    def segment(start, end, factor):
+        x, y = theta[start:end], curve[start:end] * factor
+        return Measurement([], np.column_stack([x, np.zeros_like(x), y, np.sqrt(y)]))
+
+    merged = MeasurementMerger(averaging=True).merge(segment(0, 141, 1.0), segment(110, 291, 0.01)).get_data()
+
+    # the averaged overlap is scaled like the rest of the second segment
+    np.testing.assert_array_equal(merged[:, 0], theta)
+    np.testing.assert_allclose(merged[:, 2], curve, rtol=1e-12)
+
+    # the errors of the overlap are propagated, the scaled error of the second segment is 10 * sqrt(curve)
+    overlap = slice(110, 141)
+    np.testing.assert_allclose(merged[overlap, 3], 0.5 * np.sqrt(curve[overlap] + 100 * curve[overlap]), rtol=1e-12)
+
+
+def test_merge_mismatched_sampling():
+    from uxdconverter.compare import Comparator
+    from uxdconverter.operation import MeasurementMerger
+
+    def segment(x, factor):
+        y = 1e6 * np.exp(-2 * x) * factor
+        return Measurement([], np.column_stack([x, np.zeros_like(x), y, np.sqrt(y)]))
+
+    # the second segment was measured with a coarser step, and an absorber
+    ms_1 = segment(np.linspace(0.1, 1.5, 141), 1.0)
+    ms_2 = segment(np.linspace(1.2, 3.0, 37), 0.01)
+
+    merged = MeasurementMerger(interpolation=Comparator.INTERPOLATION_LOG).merge(ms_1, ms_2).get_data()
+
+    assert np.all(np.diff(merged[:, 0]) > 0)
+    np.testing.assert_allclose(merged[:, 2], 1e6 * np.exp(-2 * merged[:, 0]), rtol=1e-9)
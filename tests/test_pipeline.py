@@ -0,0 +1,45 @@
+import numpy as np
+
+from uxdconverter.converter import create_default_stages
+from uxdconverter.measurement import Measurement, MeasurementContext
+from uxdconverter.operation import AbstractDataManipulation, DataIlluminationCorrection, ErrorCalculation, \
+    QzCalculation, QzCropping, DataNormalization
+from uxdconverter.pipeline import Pipeline, PipelineStage
+
+
+class Offset(AbstractDataManipulation):
+    # implements manipulate only, i.e. uses the fallback of apply
+    def manipulate(self, measurement, context):
+        return Measurement(measurement.get_headers(), measurement.get_data() + [0, 0, 1, 0])
+
+
+def test_pipeline_matches_manipulations(create_measurement):
+    context = MeasurementContext()
+    context.qz_range = (0.0, 0.2)
+    ms = create_measurement()
+
+    expected = ms
+    for manipulation in [DataIlluminationCorrection(), ErrorCalculation(), QzCalculation(), QzCropping(),
+                         DataNormalization()]:
+        expected = manipulation.manipulate(expected, context)
+
+    result = Pipeline(create_default_stages()).run(ms, context)
+    np.testing.assert_array_equal(result.get_data(), expected.get_data())
+
+
+def test_insert_stage(create_measurement):
+    context = MeasurementContext()
+    context.qz_conversion = False
+    context.qz_range = (0.0, 10.0)
+
+    pipeline = Pipeline(create_default_stages())
+    pipeline.insert_stage(PipelineStage('offset', Offset()), before='error')
+    assert [stage.get_name() for stage in pipeline.get_stages()] == \
+           ['illumination', 'offset', 'error', 'qz', 'cropping', 'normalization']
+
+    pipeline.remove_stage('normalization')
+    ms = create_measurement()
+    result = pipeline.run(ms, context).get_data()
+
+    np.testing.assert_allclose(result[:, 2], DataIlluminationCorrection().manipulate(ms, context).get_data()[:, 2] + 1)
+    np.testing.assert_allclose(result[:, 3], np.sqrt(result[:, 2]))
@@ -0,0 +1,47 @@
+import copy
+import logging
+import numpy as np
+
+from uxdconverter.converter import Converter
+from uxdconverter.enums import DataNormalizationMethod
+from uxdconverter.parser.general import GeneralParser
+from uxdconverter.reduction import ReductionGraph
+
+
+def test_reduction_graph(absorber):
+    measurements = GeneralParser(logging.getLogger(__name__)).parse(absorber)
+    context = measurements.get_context()
+    context.qz_range = (0, 10)
+    converter = Converter()
+    graph = ReductionGraph(converter)
+
+    def assert_converter_result():
+        expected = Converter(copy.deepcopy(measurements)).convert()
+        np.testing.assert_array_equal(graph.reduce(measurements).get_data(), expected.get_data())
+
+    assert_converter_result()
+    assert graph.get_computed_nodes() == ['merge', 'background', 'subtract', 'illumination', 'error', 'qz',
+                                          'cropping', 'normalization']
+
+    graph.reduce(measurements)
+    assert graph.get_computed_nodes() == []
+
+    context.normalization = DataNormalizationMethod.MAX
+    assert_converter_result()
+    assert graph.get_computed_nodes() == ['normalization']
+
+    context.qz_range = (0.05, 0.3)
+    assert_converter_result()
+    assert graph.get_computed_nodes() == ['cropping', 'normalization']
+
+    context.knife_edge = not context.knife_edge
+    assert_converter_result()
+    assert graph.get_computed_nodes() == ['illumination', 'error', 'qz', 'cropping', 'normalization']
+
+    # the stages are the ones of the Converter
+    graph.remove_stage('normalization')
+    graph.reduce(measurements)
+    assert graph.get_computed_nodes() == ['merge', 'background', 'subtract', 'illumination', 'error', 'qz',
+                                          'cropping']
+    assert [stage.get_name() for stage in graph.get_stages()] == ['illumination', 'error', 'qz', 'cropping']
+    assert [stage.get_name() for stage in converter.get_stages()] == ['illumination', 'error', 'qz', 'cropping']
@@ -0,0 +1,78 @@
+import logging
+import numpy as np
+
+from uxdconverter.raw.header.range import RangeHeader
+from uxdconverter.raw.parser import RawParser
+from uxdconverter.parser.raw import RawMeasurementsParser
+from uxdconverter.parser.uxd import MeasurementsParser
+from uxdconverter.parser.xrdml import XRDMLParser
+from uxdconverter.writer.synthetic import SyntheticMeasurementGenerator
+from uxdconverter.writer.raw import RawFileWriter
+from uxdconverter.writer.uxd import UXDFileWriter
+from uxdconverter.writer.xrdml import XRDMLFileWriter
+
+logger = logging.getLogger(__name__)
+
+
+def generate_ranges():
+    modes = [RangeHeader.MEASUREMENT_LOCKED_COUPLED, RangeHeader.MEASUREMENT_LOCKED_COUPLED,
+             RangeHeader.MEASUREMENT_UNLOCKED_COUPLED]
+    return SyntheticMeasurementGenerator(seed=1).generate(3, 50, modes=modes, psi_offsets=[0.0, 0.0, 0.1])
+
+
+def test_raw_roundtrip(tmp_path):
+    ranges = generate_ranges()
+    ranges[0].comment = 'first range'
+    file = str(tmp_path / 'synthetic.raw')
+    RawFileWriter(ranges).write(file)
+
+    raw = RawParser().parse_from_file(file)
+    assert raw.get_header().can_read()
+    assert len(raw.get_measurements()) == 3
+    assert raw.get_measurements()[0].get_header().get_supplementaries().get_number_of_supplementaries() == 1
+
+    measurements = RawMeasurementsParser(file, logger).parse()
+    assert measurements.get_count_measurements() == 2
+    assert measurements.get_count_background_measurements() == 1
+
+    for ms_range, measurement in zip(ranges, measurements.get_measurements()):
+        data = measurement.get_data()
+        np.testing.assert_allclose(data[:, 0], ms_range.get_two_theta() / 2.0)
+        np.testing.assert_allclose(data[:, 2], ms_range.counts)
+
+
+def test_xrdml_roundtrip(tmp_path):
+    ranges = generate_ranges()
+    file = str(tmp_path / 'synthetic.xrdml')
+
+    for options in [{}, {'use_intensities': True, 'use_list_positions': True}]:
+        XRDMLFileWriter(ranges, wavelength=1.54, **options).write(file)
+
+        measurements = XRDMLParser(file, logger).parse()
+        assert measurements.get_count_measurements() == 3
+        assert measurements.get_context().wavelength == 1.54
+
+        for ms_range, measurement in zip(ranges, measurements.get_measurements()):
+            data = measurement.get_data()
+            np.testing.assert_allclose(data[:, 0], ms_range.get_two_theta() / 2.0)
+            np.testing.assert_allclose(data[:, 2], ms_range.counts)
+            np.testing.assert_allclose(measurement.get_psi(), ms_range.psi)
+
+
+def test_uxd_roundtrip(tmp_path):
+    ranges = SyntheticMeasurementGenerator(seed=2).generate(3, 50, step_time=2.0)
+
+    for decimal in ['.', ',']:
+        file = str(tmp_path / 'synthetic.uxd')
+        UXDFileWriter(ranges, decimal=decimal).write(file)
+
+        measurements = MeasurementsParser(file, logger).parse()
+        # the last range of a uxd file is the background
+        assert measurements.get_count_measurements() == 2
+        assert measurements.get_count_background_measurements() == 1
+
+        parsed = measurements.get_measurements() + measurements.get_background_measurements()
+        for ms_range, measurement in zip(ranges, parsed):
+            data = measurement.get_data()
+            np.testing.assert_allclose(data[:, 0], ms_range.get_two_theta() / 2.0)
+            np.testing.assert_allclose(data[:, 2], ms_range.counts)
@@ -0,0 +1,273 @@
+"""
+Benchmarks for the parsers, the reduction pipeline and the exporters.
+
+All inputs are synthetic files (see uxdconverter.writer), hence no network or measurement data is needed:
+
+    python -m uxdconverter.benchmark --output results.json --baseline baseline.json
+
+The results are written as JSON. If a baseline is given, every benchmark is compared against it and
+regressions are reported.
+"""
+
+import argparse
+import contextlib
+import copy
+import datetime
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from uxdconverter import __version__
+from uxdconverter.writer.synthetic import SyntheticMeasurementGenerator
+from uxdconverter.writer.raw import RawFileWriter
+from uxdconverter.writer.uxd import UXDFileWriter
+from uxdconverter.writer.xrdml import XRDMLFileWriter
+
+# number of ranges, points per range
+SIZES = {
+    'small': (4, 250),
+    'medium': (8, 5000),
+    'huge': (16, 50000),
+}
+
+WRITERS = {
+    'raw': RawFileWriter,
+    'uxd': UXDFileWriter,
+    'xrdml': XRDMLFileWriter,
+}
+
+
+class Benchmark(object):
+    def __init__(self, name, function, setup=None, repeat=5):
+        """
+        :param str name: Name of the benchmark
+        :param function: Function to time, called with the result of setup
+        :param setup: Function creating the input of the benchmark. It is called before every repetition and is
+                      not timed, e.g. to copy measurements which are modified by the benchmarked function.
+        :param int repeat: Number of repetitions
+        """
+        self.name = name
+        self._function = function
+        self._setup = setup
+        self._repeat = repeat
+
+    def run(self):
+        timings = []
+
+        try:
+            for _ in range(self._repeat):
+                args = self._setup() if self._setup is not None else None
+
+                # some operations print their progress, which we do not want to time or see.
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    self._function(args)
+                    timings.append(time.perf_counter() - start)
+        except Exception as e:
+            return {'error': "%s: %s" % (e.__class__.__name__, e)}
+
+        return {
+            'min': min(timings),
+            'mean': float(np.mean(timings)),
+            'repeat': len(timings),
+        }
+
+
+class BenchmarkSuite(object):
+    def __init__(self, directory, sizes=None, repeat=5, logger=None):
+        if sizes is None:
+            sizes = list(SIZES.keys())
+
+        if logger is None:
+            logger = logging.getLogger(__name__)
+
+        self._directory = directory
+        self._sizes = sizes
+        self._repeat = repeat
+        self._logger = logger
+
+    def _create_files(self, size):
+        number_of_ranges, points_per_range = SIZES[size]
+        ranges = SyntheticMeasurementGenerator(seed=0).generate(number_of_ranges, points_per_range,
+                                                                step_size=0.002)
+
+        files = {}
+        for extension, writer in WRITERS.items():
+            files[extension] = os.path.join(self._directory, "%s.%s" % (size, extension))
+            writer(ranges).write(files[extension])
+
+        return files
+
+    def _benchmarks(self, files):
+        from uxdconverter.parser.general import GeneralParser
+        from uxdconverter.converter import Converter, create_default_stages
+        from uxdconverter.compare import Comparator
+        from uxdconverter.exporter import ORSOExportAlgorithm
+        from uxdconverter.pipeline import Pipeline
+        from uxdconverter.operation import MultiMerger, MeasurementMerger, GlobalScalingMerger, DataNormalization, \
+            DataIlluminationCorrection, ErrorCalculation, QzCalculation, QzCropping
+
+        parser = GeneralParser(self._logger)
+        benchmarks = []
+
+        for extension, file in files.items():
+            benchmarks.append(Benchmark("parse.%s" % extension, lambda _, file=file: parser.parse(file),
+                                        repeat=self._repeat))
+
+        measurements = parser.parse(files['raw'])
+        context = measurements.get_context()
+        context.qz_range = (0, 10)
+        mss = measurements.get_measurements()
+
+        # Converter and merging modify the measurements (scaling), hence every repetition gets a fresh copy.
+        benchmarks.append(Benchmark("convert", lambda mss: Converter(mss).convert(),
+                                    setup=lambda: copy.deepcopy(measurements), repeat=self._repeat))
+        benchmarks.append(Benchmark("merge", lambda mss: MultiMerger(MeasurementMerger()).merge(mss),
+                                    setup=lambda: copy.deepcopy(mss), repeat=self._repeat))
+        benchmarks.append(Benchmark("merge.global", lambda mss: GlobalScalingMerger().merge(mss),
+                                    setup=lambda: copy.deepcopy(mss), repeat=self._repeat))
+        benchmarks.append(Benchmark("overlapping_data", lambda _: Comparator().overlapping_data(mss[0], mss[1]),
+                                    repeat=self._repeat))
+
+        # The manipulations run on the merged measurement, i.e. on distinct and ascending x-values as in a conversion.
+        with contextlib.redirect_stdout(io.StringIO()):
+            merged = MultiMerger(MeasurementMerger()).merge(copy.deepcopy(mss))
+        merged = ErrorCalculation().manipulate(merged, context)
+
+        for manipulation in [ErrorCalculation(), DataIlluminationCorrection(), QzCalculation(), QzCropping(),
+                             DataNormalization()]:
+            benchmarks.append(Benchmark("manipulate.%s" % manipulation.__class__.__name__,
+                                        lambda _, m=manipulation: m.manipulate(merged, context),
+                                        repeat=self._repeat))
+
+        pipeline = Pipeline(create_default_stages())
+        benchmarks.append(Benchmark("pipeline", lambda _: pipeline.run(merged, context), repeat=self._repeat))
+
+        def export(_):
+            algorithm = ORSOExportAlgorithm(merged, context)
+            algorithm.set_used_data_files([files['raw']])
+            algorithm.set_used_background_files([])
+            return algorithm.export()
+
+        benchmarks.append(Benchmark("export.orso", export, repeat=self._repeat))
+        benchmarks.append(self._fit_benchmark())
+
+        return benchmarks
+
+    def _fit_benchmark(self):
+        def setup():
+            from skipi.function import Function
+
+            x = np.linspace(20, 22, 400)
+            y = 1000 * np.exp(-(x - 21) ** 2 / 0.005) + 500 * np.exp(-(x - 21.06) ** 2 / 0.005) + 10
+            return Function.to_function(x, y)
+
+        def fit(function):
+            from uxdconverter.plugin.stress.fit import CorrelatedTwoPeakFit
+            return CorrelatedTwoPeakFit(function, 0.70931724, 0.71360728).fit()
+
+        return Benchmark("fit.CorrelatedTwoPeakFit", fit, setup=setup, repeat=self._repeat)
+
+    def run(self):
+        results = {}
+
+        for size in self._sizes:
+            self._logger.info("Running benchmarks for size %s", size)
+            results[size] = {}
+
+            try:
+                benchmarks = self._benchmarks(self._create_files(size))
+            except Exception as e:
+                results[size]['setup'] = {'error': "%s: %s" % (e.__class__.__name__, e)}
+                continue
+
+            for benchmark in benchmarks:
+                results[size][benchmark.name] = benchmark.run()
+                self._logger.info("%s: %s", benchmark.name, results[size][benchmark.name])
+
+        return {
+            'version': __version__,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'date': datetime.datetime.now().isoformat(),
+            'sizes': {size: SIZES[size] for size in self._sizes},
+            'results': results,
+        }
+
+
+def compare(results, baseline, threshold=1.2):
+    """
+    Compares the results with a baseline.
+
+    :param dict results: Results of BenchmarkSuite.run
+    :param dict baseline: Results of a previous run
+    :param float threshold: A benchmark regressed, if it is slower than threshold times the baseline.
+    :return: List of (size, name, ratio) of all regressions
+    """
+    regressions = []
+
+    for size, benchmarks in results['results'].items():
+        for name, result in benchmarks.items():
+            reference = baseline.get('results', {}).get(size, {}).get(name, {})
+
+            if 'min' not in result or 'min' not in reference or reference['min'] <= 0:
+                continue
+
+            ratio = result['min'] / reference['min']
+            if ratio > threshold:
+                regressions.append((size, name, ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description="Benchmarks for UXDConverter")
+    argparser.add_argument('--output', '-o', help="JSON file to write the results to. Default: stdout")
+    argparser.add_argument('--baseline', '-b', help="JSON file with results of a previous run")
+    argparser.add_argument('--threshold', type=float, default=1.2,
+                           help="Ratio to the baseline, above which a benchmark counts as regression")
+    argparser.add_argument('--sizes', default=",".join(SIZES.keys()),
+                           help="Comma separated list of sizes (%s)" % ", ".join(SIZES.keys()))
+    argparser.add_argument('--repeat', type=int, default=5, help="Number of repetitions per benchmark")
+    args = argparser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip() != '']
+    for size in sizes:
+        if size not in SIZES:
+            argparser.error("Unknown size %s" % size)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = BenchmarkSuite(directory, sizes, args.repeat).run()
+
+    output = json.dumps(results, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, 'w') as fp:
+            fp.write(output)
+
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as fp:
+            baseline = json.load(fp)
+
+        regressions = compare(results, baseline, args.threshold)
+        for size, name, ratio in regressions:
+            print("Regression: %s/%s is %.2f times slower than the baseline" % (size, name, ratio), file=sys.stderr)
+
+        if len(regressions) > 0:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
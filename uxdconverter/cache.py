@@ -0,0 +1,308 @@
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from enum import Enum
+
+from uxdconverter import __version__
+from uxdconverter.measurement import Measurements, Measurement, MeasurementContext
+
+
+class ParseCache(object):
+    """
+    Persistent cache for parsed measurement files.
+
+    Every parsed file is stored as a .npz file containing the data arrays, and a .json sidecar containing the headers,
+    positions and contexts. The entries are keyed by the path, size and modification time of the file, a hash of its
+    first and last bytes, and the version of UXDConverter, hence changed files and new parser versions are not served
+    from the cache. Only a file rewritten in-place within the same modification time, with the same size and changes
+    in the middle only, is not detected.
+
+    The cache is bounded by its total size on disk. If it grows larger, the least recently used entries are removed.
+    """
+
+    # Increase this, if the format of the cache entries changes
+    FORMAT_VERSION = 3
+
+    # Number of bytes at the beginning and the end of a file, which are hashed for the key
+    FINGERPRINT_SIZE = 64 * 1024
+
+    # Temporary files of a store and data files without sidecar are removed, if they are older than this (in seconds).
+    # Younger ones may belong to a store in progress.
+    STALE_AGE = 3600
+
+    def __init__(self, directory=None, max_size=512 * 1024 ** 2):
+        """
+        :param str directory: Cache directory. Defaults to the user cache directory.
+        :param int max_size: Maximum total size of the cache in bytes
+        """
+        if directory is None:
+            directory = self.get_default_directory()
+
+        self._directory = directory
+        self._max_size = max_size
+
+    @staticmethod
+    def get_default_directory():
+        cache_home = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+        return os.path.join(cache_home, 'uxdconverter')
+
+    def get_directory(self):
+        return self._directory
+
+    def get_key(self, file) -> str:
+        stat = os.stat(file)
+        identity = [os.path.abspath(file), stat.st_size, stat.st_mtime_ns, self._fingerprint(file, stat.st_size),
+                    __version__, self.FORMAT_VERSION]
+        return hashlib.sha256(json.dumps(identity).encode('utf-8')).hexdigest()
+
+    def _fingerprint(self, file, size):
+        digest = hashlib.sha256()
+
+        with open(file, 'rb') as fp:
+            digest.update(fp.read(self.FINGERPRINT_SIZE))
+
+            if size > self.FINGERPRINT_SIZE:
+                fp.seek(max(self.FINGERPRINT_SIZE, size - self.FINGERPRINT_SIZE))
+                digest.update(fp.read(self.FINGERPRINT_SIZE))
+
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self._directory, key)
+        return base + '.npz', base + '.json'
+
+    def load(self, file) -> Measurements:
+        """
+        Returns the cached measurements of the file, or None if the file is not cached.
+        """
+        try:
+            data_path, meta_path = self._paths(self.get_key(file))
+        except OSError:
+            return None
+
+        if not os.path.exists(meta_path):
+            return None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as fp:
+                meta = json.load(fp)
+
+            with np.load(data_path) as arrays:
+                measurements = [self._decode_measurement(m, arrays['measurement_%s' % i])
+                                for i, m in enumerate(meta['measurements'])]
+                backgrounds = [self._decode_measurement(m, arrays['background_%s' % i])
+                               for i, m in enumerate(meta['backgrounds'])]
+        except Exception:
+            # a broken entry is just removed and re-created
+            self._remove(meta_path, data_path)
+            return None
+
+        # mark the entry as recently used. If it was evicted in the meantime, e.g. by another process, it is a miss.
+        try:
+            os.utime(meta_path)
+        except OSError:
+            return None
+
+        return Measurements(meta['header'], measurements, backgrounds, _decode_context(meta['context']))
+
+    def store(self, file, measurements: Measurements):
+        data_path, meta_path = self._paths(self.get_key(file))
+        os.makedirs(self._directory, exist_ok=True)
+
+        arrays = {}
+        for i, ms in enumerate(measurements.get_measurements()):
+            arrays['measurement_%s' % i] = ms.get_data()
+        for i, ms in enumerate(measurements.get_background_measurements()):
+            arrays['background_%s' % i] = ms.get_data()
+
+        meta = {
+            'file': os.path.abspath(file),
+            'version': __version__,
+            'header': _encode_value(measurements.get_headers()),
+            'context': _encode_context(measurements.get_context()),
+            'measurements': [self._encode_measurement(ms) for ms in measurements.get_measurements()],
+            'backgrounds': [self._encode_measurement(ms) for ms in measurements.get_background_measurements()],
+        }
+
+        # The sidecar marks a complete entry, hence it is written last. Both files are written atomically.
+        self._write_atomic(data_path, lambda fp: np.savez(fp, **arrays))
+        try:
+            self._write_atomic(meta_path, lambda fp: fp.write(json.dumps(meta).encode('utf-8')))
+        except:
+            self._remove(data_path)
+            raise
+
+        self._evict()
+
+    def clear(self):
+        for data_path, meta_path in self._entries():
+            self._remove(meta_path, data_path)
+
+    def get_size(self):
+        return sum([self._entry_size(*entry) for entry in self._entries()])
+
+    def _encode_measurement(self, ms: Measurement):
+        return {
+            'headers': _encode_value(ms.get_headers()),
+            'is_background': ms.is_background(),
+            'counting_time': _encode_value(ms.get_counting_time()),
+            'file_name': ms.file_name,
+            'name': ms.get_display_name(),
+            'positions': _encode_value(ms.get_positions()),
+            'context': _encode_value(ms.get_contexts()),
+        }
+
+    def _decode_measurement(self, meta, data) -> Measurement:
+        ms = Measurement(_decode_value(meta['headers']), data, is_background=meta['is_background'])
+
+        if meta['counting_time'] is not None:
+            ms.set_counting_time(meta['counting_time'])
+
+        ms.file_name = meta['file_name']
+        ms.set_display_name(meta['name'])
+
+        for name, value in _decode_value(meta['positions']).items():
+            ms.set_position(name, value)
+
+        for key, value in _decode_value(meta['context']).items():
+            ms.set_context(key, value)
+
+        return ms
+
+    def _write_atomic(self, path, write):
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                write(fp)
+            os.replace(tmp_path, path)
+        except:
+            self._remove(tmp_path)
+            raise
+
+    def _remove(self, *paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _entries(self):
+        if not os.path.isdir(self._directory):
+            return []
+
+        entries = []
+        for name in os.listdir(self._directory):
+            if name.endswith('.json'):
+                key = name[:-len('.json')]
+                entries.append(self._paths(key))
+
+        return entries
+
+    def _entry_size(self, data_path, meta_path):
+        size = 0
+        for path in [data_path, meta_path]:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _remove_stale_files(self):
+        """
+        Removes the files left by an interrupted store, i.e. temporary files and data files without sidecar.
+        """
+        now = time.time()
+
+        for name in os.listdir(self._directory):
+            path = os.path.join(self._directory, name)
+
+            if name.endswith('.npz'):
+                if os.path.exists(path[:-len('.npz')] + '.json'):
+                    continue
+            elif not name.endswith('.tmp'):
+                continue
+
+            try:
+                if now - os.path.getmtime(path) > self.STALE_AGE:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        self._remove_stale_files()
+
+        entries = []
+        for data_path, meta_path in self._entries():
+            try:
+                last_used = os.path.getmtime(meta_path)
+            except OSError:
+                continue
+            entries.append((last_used, data_path, meta_path))
+
+        # least recently used first
+        entries.sort()
+        total = sum([self._entry_size(data_path, meta_path) for _, data_path, meta_path in entries])
+
+        for _, data_path, meta_path in entries:
+            if total <= self._max_size:
+                break
+
+            total -= self._entry_size(data_path, meta_path)
+            self._remove(meta_path, data_path)
+
+
+# Enum classes which may be restored from a cache entry, as "module:class". Other classes are never imported.
+ENUMS = {
+    'uxdconverter.enums:DataNormalizationMethod',
+    'uxdconverter.parser.xrdml:DetectorMode',
+}
+
+
+def _encode_value(value):
+    """
+    Converts the value into a json serializable value. Enums are stored with their class, such that they
+    can be restored.
+    """
+    if isinstance(value, Enum):
+        return {'__enum__': "%s:%s" % (value.__class__.__module__, value.__class__.__qualname__),
+                'value': value.value}
+    if isinstance(value, dict):
+        return {str(key): _encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if '__enum__' in value:
+            if value['__enum__'] not in ENUMS:
+                raise ValueError("Enum %s can not be restored from the cache" % value['__enum__'])
+
+            module, name = value['__enum__'].split(':')
+            return getattr(importlib.import_module(module), name)(value['value'])
+
+        return {key: _decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(item) for item in value]
+
+    return value
+
+
+def _encode_context(context: MeasurementContext):
+    return context.to_dict() if context is not None else None
+
+
+def _decode_context(values) -> MeasurementContext:
+    return MeasurementContext.from_dict(values) if values is not None else None
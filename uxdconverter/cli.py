@@ -0,0 +1,360 @@
+"""
+Headless batch conversion of measurement files.
+
+Every input file (or every group of files) is converted in a worker process and exported as ORSO or Parratt file:
+
+    uxdconverter-batch --context context.yaml --output-dir reduced/ beamtime/*.raw beamtime/day2/
+
+Directories are scanned recursively for measurement files. The context file is a YAML or JSON mapping of
+MeasurementContext attributes, e.g.
+
+    knife_edge: true
+    qz_range: [0.0, 0.3]
+    normalization: max
+
+Attributes which are not given keep the values read from the measurement file.
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import glob
+import json
+import logging
+import os
+import sys
+import time
+
+import yaml
+
+from concurrent.futures.process import BrokenProcessPool
+
+from uxdconverter.measurement import MeasurementContext
+
+EXPORT_FORMATS = ['orso', 'parratt']
+GROUP_MODES = ['file', 'directory', 'all']
+
+
+class ConversionResult(object):
+    def __init__(self, files, output, duration, error=None):
+        self.files = files
+        self.output = output
+        self.duration = duration
+        self.error = error
+
+    def is_successful(self):
+        return self.error is None
+
+
+def load_context_values(file) -> dict:
+    """
+    Reads the MeasurementContext attributes from a YAML or JSON file.
+    """
+    with open(file, 'r') as fp:
+        if os.path.splitext(file)[1].lower() == '.json':
+            values = json.load(fp)
+        else:
+            values = yaml.safe_load(fp)
+
+    if values is None:
+        return {}
+
+    if not isinstance(values, dict):
+        raise RuntimeError("Context file %s does not contain a mapping" % file)
+
+    # raises an error for unknown attributes or values
+    MeasurementContext.from_dict(values)
+
+    return values
+
+
+def find_files(inputs, output_suffix=None):
+    """
+    Expands globs and directories into a sorted list of measurement files.
+
+    Files given explicitly are always included, whereas files inside directories are included only if their content
+    is recognized as measurement file, i.e. previously exported files are skipped. Files matching a glob are skipped
+    in the same way, if they have the suffix of the output files.
+
+    :param list inputs: Files, globs or directories
+    :param str output_suffix: Suffix of the output files, see BatchConverter
+    """
+    from uxdconverter.parser.general import GeneralParser, SIMPLE
+
+    parser = GeneralParser(None)
+    files = []
+
+    for pattern in inputs:
+        is_glob = glob.has_magic(pattern)
+        paths = glob.glob(pattern, recursive=True) if is_glob else [pattern]
+
+        for path in sorted(paths):
+            if not os.path.isdir(path):
+                # e.g. *.dat also matches the files exported by a previous run
+                if is_glob and output_suffix is not None and path.endswith(output_suffix) \
+                        and parser.detect(path) in [None, SIMPLE]:
+                    continue
+
+                files.append(path)
+                continue
+
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    file = os.path.join(root, name)
+                    if parser.detect(file) not in [None, SIMPLE]:
+                        files.append(file)
+
+    unique = []
+    for file in files:
+        if file not in unique:
+            unique.append(file)
+
+    return unique
+
+
+def group_files(files, mode='file'):
+    """
+    Groups the files which are converted into one output.
+
+    :param list files: Files
+    :param str mode: 'file' converts each file on its own, 'directory' combines all files of a directory, 'all'
+                     combines all files.
+    :return: List of (name, files)
+    """
+    if mode == 'file':
+        return [(os.path.splitext(os.path.basename(file))[0], [file]) for file in files]
+
+    if mode == 'all':
+        return [('merged', list(files))] if len(files) > 0 else []
+
+    if mode == 'directory':
+        groups = {}
+        for file in files:
+            groups.setdefault(os.path.dirname(os.path.abspath(file)), []).append(file)
+
+        return [(os.path.basename(directory) or 'merged', group) for directory, group in groups.items()]
+
+    raise RuntimeError("Unknown group mode %s" % mode)
+
+
+def convert_files(files, output, context_values, export_format='orso', use_cache=False, global_scaling=False):
+    """
+    Converts the files into a single measurement and exports it. This runs in the worker processes.
+
+    :return ConversionResult:
+    """
+    start = time.perf_counter()
+
+    try:
+        # the merging prints its progress, which would clutter the summary.
+        with contextlib.redirect_stdout(sys.stderr):
+            _convert_files(files, output, context_values, export_format, use_cache, global_scaling)
+    except Exception as e:
+        return ConversionResult(files, output, time.perf_counter() - start, "%s: %s" % (e.__class__.__name__, e))
+
+    return ConversionResult(files, output, time.perf_counter() - start)
+
+
+def _convert_files(files, output, context_values, export_format, use_cache, global_scaling):
+    from uxdconverter.converter import Converter
+    from uxdconverter.exporter import FileExporter, ORSOExportAlgorithm, ParrattExportAlgorithm
+    from uxdconverter.operation import GlobalScalingMerger
+    from uxdconverter.parser.general import GeneralParser
+
+    cache = None
+    if use_cache:
+        from uxdconverter.cache import ParseCache
+        cache = ParseCache()
+
+    parser = GeneralParser(logging.getLogger(__name__), cache)
+    measurements = None
+
+    for file in files:
+        mss = parser.parse(file)
+        for ms in mss.get_measurements() + mss.get_background_measurements():
+            ms.file_name = file
+
+        if measurements is None:
+            measurements = mss
+        else:
+            measurements.add(mss)
+
+    if measurements is None:
+        raise RuntimeError("No files given")
+
+    # the context read from the (first) file, e.g. the wavelength, is overwritten by the given values only.
+    context = measurements.get_context()
+    if context is None:
+        context = MeasurementContext()
+    measurements.set_context(context.update(context_values))
+
+    ms = Converter(measurements, GlobalScalingMerger() if global_scaling else None).convert()
+
+    if export_format == 'parratt':
+        algorithm = ParrattExportAlgorithm(ms, context)
+    else:
+        algorithm = ORSOExportAlgorithm(ms, context)
+        algorithm.set_used_data_files([m.file_name for m in measurements.get_measurements()])
+        algorithm.set_used_background_files([m.file_name for m in measurements.get_background_measurements()])
+
+    FileExporter(output, algorithm).do_export()
+
+
+class BatchConverter(object):
+    def __init__(self, context_values=None, export_format='orso', output_directory=None, suffix='.dat',
+                 jobs=None, overwrite=False, use_cache=False, global_scaling=False):
+        """
+        :param dict context_values: MeasurementContext attributes, see load_context_values
+        :param str export_format: 'orso' or 'parratt'
+        :param str output_directory: Directory of the output files. Defaults to the directory of the input files.
+        :param str suffix: Suffix of the output files
+        :param int jobs: Number of worker processes. Defaults to the number of CPUs, 1 converts in this process.
+        :param bool overwrite: Whether existing output files are overwritten
+        :param bool use_cache: Whether parsed files are cached, see uxdconverter.cache.ParseCache
+        :param bool global_scaling: Whether all measurements are scaled at once, see
+                                    uxdconverter.operation.GlobalScalingMerger
+        """
+        if context_values is None:
+            context_values = {}
+
+        if export_format not in EXPORT_FORMATS:
+            raise RuntimeError("Unknown export format %s" % export_format)
+
+        self._context_values = context_values
+        self._format = export_format
+        self._output_directory = output_directory
+        self._suffix = suffix
+        self._jobs = jobs
+        self._overwrite = overwrite
+        self._use_cache = use_cache
+        self._global_scaling = global_scaling
+
+    def get_output_file(self, name, files):
+        directory = self._output_directory
+        if directory is None:
+            directory = os.path.dirname(os.path.abspath(files[0]))
+
+        return os.path.join(directory, name + self._suffix)
+
+    def convert(self, groups):
+        """
+        :param list groups: List of (name, files), see group_files
+        :return: List of ConversionResult, in the order of the groups
+        """
+        tasks = []
+        results = [None] * len(groups)
+        outputs = []
+
+        for index, (name, files) in enumerate(groups):
+            output = self.get_output_file(name, files)
+
+            # e.g. sample.raw and sample.uxd must not be written to the same output file
+            number = 2
+            base, ext = os.path.splitext(output)
+            while output in outputs:
+                output = "%s_%s%s" % (base, number, ext)
+                number += 1
+            outputs.append(output)
+
+            if os.path.exists(output) and not self._overwrite:
+                results[index] = ConversionResult(files, output, 0.0, "Output file already exists")
+                continue
+
+            tasks.append((index, (files, output, self._context_values, self._format, self._use_cache,
+                                  self._global_scaling)))
+
+        if self._output_directory is not None:
+            os.makedirs(self._output_directory, exist_ok=True)
+
+        if self._jobs == 1 or len(tasks) <= 1:
+            for index, args in tasks:
+                results[index] = convert_files(*args)
+            return results
+
+        crashed = []
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self._jobs) as executor:
+            futures = {executor.submit(convert_files, *args): (index, args) for index, args in tasks}
+
+            for future in concurrent.futures.as_completed(futures):
+                index, args = futures[future]
+                try:
+                    results[index] = future.result()
+                except BrokenProcessPool:
+                    crashed.append((index, args))
+
+        # A crashing worker breaks the whole pool, i.e. all pending conversions fail. Hence, they are repeated one by
+        # one in a process of their own, such that only the crashing conversion fails.
+        for index, args in crashed:
+            results[index] = self._convert_isolated(args)
+
+        return results
+
+    def _convert_isolated(self, args):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+            try:
+                return executor.submit(convert_files, *args).result()
+            except BrokenProcessPool:
+                files, output = args[0], args[1]
+                return ConversionResult(files, output, 0.0, "The worker process crashed")
+
+
+def print_summary(results, total_duration, stream=None):
+    if stream is None:
+        stream = sys.stdout
+
+    failures = [result for result in results if not result.is_successful()]
+
+    for result in results:
+        status = "ok" if result.is_successful() else "FAILED (%s)" % result.error
+        print("%8.2fs  %s -> %s: %s" % (result.duration, ", ".join(result.files), result.output, status), file=stream)
+
+    print("Converted %s of %s in %.2fs, %s failed" % (len(results) - len(failures), len(results), total_duration,
+                                                       len(failures)), file=stream)
+
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description="Batch conversion of reflectivity measurements")
+    argparser.add_argument('inputs', nargs='+', help="Measurement files, globs or directories")
+    argparser.add_argument('--context', '-c', help="YAML or JSON file with the measurement context")
+    argparser.add_argument('--output-dir', '-o', help="Output directory. Default: directory of the input file")
+    argparser.add_argument('--format', '-f', choices=EXPORT_FORMATS, default='orso', help="Export format")
+    argparser.add_argument('--group', '-g', choices=GROUP_MODES, default='file',
+                           help="Convert each file on its own, all files of a directory together, or all files "
+                                "together")
+    argparser.add_argument('--suffix', default='.dat', help="Suffix of the output files")
+    argparser.add_argument('--jobs', '-j', type=int, help="Number of worker processes. Default: number of CPUs")
+    argparser.add_argument('--overwrite', action='store_true', help="Overwrite existing output files")
+    argparser.add_argument('--cache', action='store_true', help="Cache parsed files on disk")
+    argparser.add_argument('--global-scaling', action='store_true',
+                           help="Compute the scaling factors of all measurements at once, instead of pairwise")
+    args = argparser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+
+    context_values = {}
+    if args.context is not None:
+        try:
+            context_values = load_context_values(args.context)
+        except Exception as e:
+            argparser.error("Could not read the context file: %s" % e)
+
+    files = find_files(args.inputs, args.suffix)
+    if len(files) == 0:
+        argparser.error("No measurement files found")
+
+    converter = BatchConverter(context_values, args.format, args.output_dir, args.suffix, args.jobs,
+                               args.overwrite, args.cache, args.global_scaling)
+
+    start = time.perf_counter()
+    results = converter.convert(group_files(files, args.group))
+    print_summary(results, time.perf_counter() - start)
+
+    if any([not result.is_successful() for result in results]):
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,15 @@ import numpy as np
 
 
 class Comparator(object):
-    def __init__(self):
-        pass
+    INTERPOLATION_LINEAR = 'linear'
+    INTERPOLATION_LOG = 'log'
+
+    def __init__(self, grid_tolerance=1e-6):
+        """
+        :param float grid_tolerance: Two overlaps with the same number of points are considered to be measured at the
+                                     same x-values, if no x-value differs by more than this.
+        """
+        self._grid_tolerance = grid_tolerance
 
     def overlap_limits(self, measurement_1: Measurement, measurement_2: Measurement) -> (float, float):
         """
@@ -71,25 +78,136 @@ class Comparator(object):
             return measurement_2, measurement_1
 
     def overlapping_data(self, measurement_1: Measurement, measurement_2: Measurement, overlapping_region=None) -> (
-    list, list):
+    np.ndarray, np.ndarray):
         """
         Returns the overlapping data from the two measurements.
         It computes the overlapping region, see overlap_limits and extracts the data which lies in this region
 
-        A custom region can be passed via the overlapping_region parameter.
+        A custom region can be passed via the overlapping_region parameter. The returned arrays may be read-only
+        views of the measurement data, see data_in_region.
+
+        :param Measurement measurement_1:
+        :param Measurement measurement_2:
+        :param tuple overlapping_region: First entry contains max limit, second one the min limit
+        :return:
+        """
+        if overlapping_region is None:
+            overlapping_region = self.overlap_limits(measurement_1, measurement_2)
+
+        return (self.data_in_region(measurement_1, overlapping_region),
+                self.data_in_region(measurement_2, overlapping_region))
+
+    def data_in_region(self, measurement: Measurement, region) -> np.ndarray:
+        """
+        Returns the data of the measurement with region[1] <= x <= region[0].
+
+        For measurements with ascending x-values (the usual case), the region is found by Measurement.get_index_range_x
+        and a read-only view of the data is returned. Otherwise, the data is filtered.
+
+        :param Measurement measurement:
+        :param tuple region: First entry contains max limit, second one the min limit
+        :return:
+        """
+        data = measurement.get_data_view()
+
+        if len(data) == 0:
+            return data
+
+        index_range = measurement.get_index_range_x(region[1], region[0])
+
+        if index_range is not None:
+            return data[index_range[0]:index_range[1]]
+
+        x = measurement.get_x()
+        return data[(region[0] >= x) & (x >= region[1])]
+
+    def is_same_grid(self, data_1: np.ndarray, data_2: np.ndarray) -> bool:
+        """
+        Returns whether the two data sets are measured at the same x-values.
+        """
+        if not len(data_1) == len(data_2):
+            return False
+
+        if len(data_1) == 0:
+            return True
+
+        return bool(np.all(np.abs(data_1[:, 0] - data_2[:, 0]) <= self._grid_tolerance))
+
+    def interpolate(self, measurement: Measurement, x: np.ndarray, mode=INTERPOLATION_LINEAR) -> np.ndarray:
+        """
+        Interpolates the data of the measurement at the given x-values, which have to lie within the data region of
+        the measurement.
+
+        The errors are propagated, i.e. for linear interpolation y = (1-t) y_a + t y_b the error is
+            sqrt((1-t)^2 dy_a^2 + t^2 dy_b^2).
+        The log interpolation y = y_a^(1-t) y_b^t is better suited for reflectivity curves, which decay
+        exponentially. Here the relative errors are propagated in the same way. Points without positive counts are
+        interpolated linearly.
+
+        :param Measurement measurement:
+        :param np.ndarray x: x-values
+        :param str mode: INTERPOLATION_LINEAR or INTERPOLATION_LOG
+        :return: Data at the x-values, with the columns of a measurement
+        """
+        if mode not in [self.INTERPOLATION_LINEAR, self.INTERPOLATION_LOG]:
+            raise RuntimeError("Unknown interpolation mode %s" % mode)
+
+        data = measurement.get_data_view()
+        if not measurement.is_sorted_x():
+            data = data[np.argsort(data[:, 0], kind='stable')]
+
+        x = np.asarray(x, dtype=float)
+        result = np.zeros((len(x), 4))
+        result[:, 0] = x
+
+        if len(data) == 1:
+            result[:, 1:] = data[0, 1:]
+            return result
+
+        xs = data[:, 0]
+        idx = np.clip(np.searchsorted(xs, x, side='right') - 1, 0, len(xs) - 2)
+        step = xs[idx + 1] - xs[idx]
+        t = np.divide(x - xs[idx], step, out=np.zeros(len(x)), where=step > 0)
+
+        a, b = data[idx], data[idx + 1]
+
+        result[:, 1] = (1 - t) * a[:, 1] + t * b[:, 1]
+        result[:, 2] = (1 - t) * a[:, 2] + t * b[:, 2]
+        result[:, 3] = np.sqrt(((1 - t) * a[:, 3]) ** 2 + (t * b[:, 3]) ** 2)
+
+        if mode == self.INTERPOLATION_LOG:
+            positive = (a[:, 2] > 0) & (b[:, 2] > 0)
+            t, a, b = t[positive], a[positive], b[positive]
+
+            y = np.exp((1 - t) * np.log(a[:, 2]) + t * np.log(b[:, 2]))
+            relative_error = np.sqrt(((1 - t) * a[:, 3] / a[:, 2]) ** 2 + (t * b[:, 3] / b[:, 2]) ** 2)
+
+            result[positive, 2] = y
+            result[positive, 3] = y * relative_error
+
+        return result
+
+    def aligned_overlapping_data(self, measurement_1: Measurement, measurement_2: Measurement,
+                                 overlapping_region=None, mode=INTERPOLATION_LINEAR) -> (np.ndarray, np.ndarray):
+        """
+        Returns the overlapping data of the two measurements at the same x-values, i.e. the x-values of
+        measurement_1 in the overlapping region.
+
+        If both measurements were measured at the same x-values, this is the same as overlapping_data. Otherwise,
+        measurement_2 is interpolated, see interpolate.
 
         :param Measurement measurement_1:
         :param Measurement measurement_2:
         :param tuple overlapping_region: First entry contains max limit, second one the min limit
+        :param str mode: Interpolation mode, see interpolate
         :return:
         """
         if overlapping_region is None:
             overlapping_region = self.overlap_limits(measurement_1, measurement_2)
 
-        overlap_data = []
+        overlap_1, overlap_2 = self.overlapping_data(measurement_1, measurement_2, overlapping_region)
 
-        for ms in [measurement_1, measurement_2]:
-            data = [x for x in ms.get_data() if (overlapping_region[0] >= x[0] >= overlapping_region[1])]
-            overlap_data.append(np.array(data))
+        if self.is_same_grid(overlap_1, overlap_2) or len(overlap_1) == 0:
+            return overlap_1, overlap_2
 
-        return overlap_data[0], overlap_data[1]
+        return overlap_1, self.interpolate(measurement_2, overlap_1[:, 0], mode)
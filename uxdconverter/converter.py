@@ -1,21 +1,61 @@
-from uxdconverter.measurement import Measurements, Measurement
+from typing import List
+
+from uxdconverter.measurement import Measurements, Measurement, MeasurementContext
 from uxdconverter.operation import MultiMerger, MeasurementMerger, MeasurementSubtraction, DataIlluminationCorrection, \
     DataNormalization, QzCalculation, QzCropping, ErrorCalculation
+from uxdconverter.pipeline import Pipeline, PipelineStage
 
 
-class Converter(object):
-    def __init__(self, measurements: Measurements):
-        self._backgrounds = measurements.get_background_measurements()
-        self._context = measurements.get_context()
-        self._measurements = measurements.get_measurements()
+def create_default_stages() -> List[PipelineStage]:
+    """
+    The corrections done after merging and background subtraction, in this order.
+    """
+    return [
+        PipelineStage('illumination', DataIlluminationCorrection(), lambda context: context.knife_edge is False,
+                      ['knife_edge']),
+        PipelineStage('error', ErrorCalculation()),
+        PipelineStage('qz', QzCalculation(), lambda context: context.qz_conversion is True, ['qz_conversion']),
+        PipelineStage('cropping', QzCropping()),
+        PipelineStage('normalization', DataNormalization()),
+    ]
+
 
-        self._multi_merge = MultiMerger(MeasurementMerger())
+class Converter(object):
+    def __init__(self, measurements: Measurements = None, multi_merger: MultiMerger = None):
+        """
+        :param Measurements measurements: Measurements to convert. May be None, if only the single steps of the
+                                          conversion are used, see uxdconverter.reduction.ReductionGraph
+        :param MultiMerger multi_merger: Merges the measurements. Defaults to merging them pairwise, see also
+                                         GlobalScalingMerger.
+        """
+        if multi_merger is None:
+            multi_merger = MultiMerger(MeasurementMerger())
+
+        if measurements is None:
+            self._backgrounds = []
+            self._context = None
+            self._measurements = []
+        else:
+            self._backgrounds = measurements.get_background_measurements()
+            self._context = measurements.get_context()
+            self._measurements = measurements.get_measurements()
+
+        self._multi_merge = multi_merger
         self._subtract = MeasurementSubtraction()
-        self._illumination = DataIlluminationCorrection()
-        self._normalization = DataNormalization()
-        self._qz_calc = QzCalculation()
-        self._cropping = QzCropping()
         self._error = ErrorCalculation()
+        self._pipeline = Pipeline(create_default_stages())
+
+    def get_stages(self) -> List[PipelineStage]:
+        return self._pipeline.get_stages()
+
+    def insert_stage(self, stage: PipelineStage, before=None, after=None):
+        """
+        Inserts an additional correction, see Pipeline.insert_stage and create_default_stages for the stage names.
+        """
+        self._pipeline.insert_stage(stage, before, after)
+
+    def remove_stage(self, name):
+        self._pipeline.remove_stage(name)
 
     def convert(self) -> Measurement:
         """
@@ -38,26 +78,41 @@ class Converter(object):
         if len(mss) == 0:
             raise ValueError("Cannot convert if no measurement was given.")
 
-        mss = [self._error.manipulate(ms, context) for ms in mss]
-
-        measurement = self._multi_merge.merge(mss)
+        measurement = self.merge(mss, context)
 
         # If we have any background, subtract it from the measurement
-        if len(backgrounds) > 0:
-            background = self._multi_merge.merge(backgrounds)
+        measurement = self.subtract_background(measurement, self.merge_backgrounds(backgrounds))
+
+        # illumination correction, errors, qz conversion, cropping and normalization in a single pass.
+        return self.correct(measurement, context)
+
+    def merge(self, measurements: List[Measurement], context: MeasurementContext) -> Measurement:
+        """
+        Calculates the errors of the measurements and merges them. The given measurements are not modified.
+        """
+        mss = [self._error.manipulate(ms, context) for ms in measurements]
 
-            # Do the subtraction: measurement - background
-            measurement = self._subtract.subtract(measurement, background)
+        return self._multi_merge.merge(mss)
 
-        if context.knife_edge is False:
-            measurement = self._illumination.manipulate(measurement, context)
+    def merge_backgrounds(self, backgrounds: List[Measurement]) -> Measurement:
+        """
+        Merges the background measurements, or returns None if there are none. Note that merging scales the given
+        measurements.
+        """
+        if len(backgrounds) == 0:
+            return None
 
-        measurement = self._error.manipulate(measurement, context)
+        return self._multi_merge.merge(backgrounds)
 
-        if self._context.qz_conversion is True:
-            measurement = self._qz_calc.manipulate(measurement, context)
+    def subtract_background(self, measurement: Measurement, background: Measurement) -> Measurement:
+        if background is None:
+            return measurement
 
-        measurement = self._cropping.manipulate(measurement, context)
-        measurement = self._normalization.manipulate(measurement, context)
+        # Do the subtraction: measurement - background
+        return self._subtract.subtract(measurement, background)
 
-        return measurement
\ No newline at end of file
+    def correct(self, measurement: Measurement, context: MeasurementContext) -> Measurement:
+        """
+        Applies the stages, see get_stages, on the merged and background subtracted measurement.
+        """
+        return self._pipeline.run(measurement, context)
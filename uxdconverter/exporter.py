@@ -52,7 +52,7 @@ class ParrattExportAlgorithm(AbstractExportAlgorithm):
 
         data_line = 999 * [""]
 
-        data = measurement.get_data()
+        data = measurement.get_data_view()
 
         header = "# " + yaml.dump(header).replace('\n', '\n# ') + "\n"
         # write out at most 1000 lines. Parratt cannot handle more than that...
@@ -71,7 +71,7 @@ class ORSOExportAlgorithm(AbstractExportAlgorithm):
     def export(self):
         header = self._create_headers()
         d_to_str = lambda d: "\t".join(map(lambda v: "{:.4E}".format(v), d))
-        data = "\n".join([d_to_str(d) for d in self._ms.get_data()]).strip()
+        data = "\n".join([d_to_str(d) for d in self._ms.get_data_view()]).strip()
 
         h = "# " + yaml.dump(header).replace('\n', '\n# ')
         return h + "\n" + data
@@ -36,9 +36,8 @@ def load_file(file):
     "/mnt/hektor/measure/Dünnschicht/01_X-ray_Messdaten/01_Alex/Detector_Scan_deltaTheta.raw"
     from uxdconverter.parser.general import GeneralParser
     measurements = GeneralParser().parse(file, None)
-    data = measurements.get_measurement(0).get_data()
-    x, y = data.T[0], data.T[2]
-    return x, y
+    ms = measurements.get_measurement(0)
+    return ms.get_x(), ms.get_y()
 
 
 def find_fwhm(file):
@@ -1,6 +1,13 @@
 from .enums import DataNormalizationMethod
+import hashlib
+import itertools
+import json
 import numpy as np
 
+from enum import Enum
+
+from typing import Callable, Iterator
+
 
 class MeasurementContext(object):
     def __init__(self):
@@ -21,20 +28,264 @@ class MeasurementContext(object):
     def get_wavelength(self):
         return self.wavelength
 
+    def to_dict(self) -> dict:
+        """
+        Returns the context as dict of plain python values, i.e. the normalization method as its value and the qz
+        range as list.
+        """
+        values = {}
+
+        for key, value in vars(self).items():
+            if key.startswith('_'):
+                continue
+
+            if isinstance(value, Enum):
+                value = value.value
+            elif isinstance(value, tuple):
+                value = list(value)
+            elif isinstance(value, np.generic):
+                value = value.item()
+
+            values[key] = value
+
+        return values
+
+    def update(self, values: dict):
+        """
+        Sets the given attributes. Attributes which are not given are kept.
+
+        :param dict values: Attributes, as returned by to_dict
+        """
+        known = vars(MeasurementContext())
+
+        for key, value in values.items():
+            if key not in known:
+                raise RuntimeError("Unknown measurement context attribute %s" % key)
+
+            if key == 'normalization' and not isinstance(value, DataNormalizationMethod):
+                value = DataNormalizationMethod(str(value).lower())
+            elif key == 'qz_range':
+                value = tuple(value)
+
+            setattr(self, key, value)
+
+        return self
+
+    @classmethod
+    def from_dict(cls, values: dict) -> 'MeasurementContext':
+        """
+        Creates a context from the attributes. Missing attributes have their default value.
+        """
+        context = MeasurementContext()
+        context.update(values)
+
+        if cls is MeasurementContext:
+            return context
+
+        return cls(context)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, text) -> 'MeasurementContext':
+        return cls.from_dict(json.loads(text))
+
+    def to_yaml(self) -> str:
+        import yaml
+        return yaml.safe_dump(self.to_dict(), default_flow_style=False)
+
+    @classmethod
+    def from_yaml(cls, text) -> 'MeasurementContext':
+        import yaml
+        values = yaml.safe_load(text)
+        return cls.from_dict(values if values is not None else {})
+
+    def content_hash(self) -> str:
+        """
+        Returns a hash of the attributes, which is the same for equal contexts in every process and python version.
+        """
+        values = self.to_dict()
+
+        # 10 and 10.0 are the same sample length, but not the same json
+        for key, value in values.items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                values[key] = float(value)
+            elif isinstance(value, list):
+                values[key] = [float(v) for v in value]
+
+        return hashlib.sha256(json.dumps(values, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def copy(self) -> 'MeasurementContext':
+        return MeasurementContext.from_dict(self.to_dict())
+
+    def freeze(self) -> 'FrozenMeasurementContext':
+        return FrozenMeasurementContext(self)
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.to_json())
+
+
+class FrozenMeasurementContext(MeasurementContext):
+    """
+    Immutable measurement context, e.g. to be used as key of a cache.
+    """
+
+    def __init__(self, context: MeasurementContext = None):
+        if context is None:
+            context = MeasurementContext()
+
+        for key, value in MeasurementContext.from_dict(context.to_dict()).__dict__.items():
+            object.__setattr__(self, key, value)
+
+        object.__setattr__(self, '_hash', self.content_hash())
+
+    def __setattr__(self, key, value):
+        raise RuntimeError("The measurement context is frozen, use thaw() to get a modifiable copy")
+
+    def __delattr__(self, key):
+        raise RuntimeError("The measurement context is frozen, use thaw() to get a modifiable copy")
+
+    def update(self, values: dict):
+        raise RuntimeError("The measurement context is frozen, use thaw() to get a modifiable copy")
+
+    def content_hash(self) -> str:
+        if '_hash' in self.__dict__:
+            return self._hash
+
+        return super(FrozenMeasurementContext, self).content_hash()
+
+    def freeze(self) -> 'FrozenMeasurementContext':
+        return self
+
+    def thaw(self) -> MeasurementContext:
+        return self.copy()
+
+    def __eq__(self, other):
+        # contrary to the (mutable) MeasurementContext, frozen contexts with the same attributes are equal
+        if not isinstance(other, FrozenMeasurementContext):
+            return NotImplemented
+
+        return self._hash == other._hash
+
+    def __hash__(self):
+        return hash(self._hash)
+
+
+class MeasurementSummary(object):
+    """
+    Properties of the data of a measurement, which are computed once, see Measurement.get_summary.
+    """
+
+    # relative tolerance of the steps between the x-values, for them to be considered uniform
+    STEP_TOLERANCE = 1e-6
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        self._length = len(x)
+        self._x_min = None
+        self._x_max = None
+        self._sorted = True
+        self._step = None
+        self._total_counts = 0.0
+        self._max_counts = None
+
+        if self._length == 0:
+            return
+
+        self._x_min = np.amin(x)
+        self._x_max = np.amax(x)
+        self._total_counts = np.sum(y)
+        self._max_counts = np.amax(y)
+
+        steps = np.diff(x)
+        self._sorted = bool(np.all(steps >= 0))
+
+        if self._sorted and self._length > 1:
+            step = (x[-1] - x[0]) / (self._length - 1)
+            if step > 0 and np.all(np.abs(steps - step) <= self.STEP_TOLERANCE * step):
+                self._step = step
+
+    def get_length(self) -> int:
+        return self._length
+
+    def get_x_min(self) -> float:
+        return self._x_min
+
+    def get_x_max(self) -> float:
+        return self._x_max
+
+    def is_sorted(self) -> bool:
+        """
+        Returns whether the x-values are in ascending order.
+        """
+        return self._sorted
+
+    def get_step(self) -> float:
+        """
+        Returns the step between the x-values, if they are in ascending order with a uniform step. Otherwise None.
+        """
+        return self._step
+
+    def get_total_counts(self) -> float:
+        return self._total_counts
+
+    def get_max_counts(self) -> float:
+        return self._max_counts
+
 
 class Measurement(object):
+    """
+    A measurement, i.e. the columns theta, dtheta, counts (total; not per second) and dcounts.
+
+    The data is stored column-wise and is never modified in-place: get_data_view and the column getters return
+    read-only views, and operations like scale_y replace the data (copy-on-write). Hence, returned views keep their
+    values, and copies of a measurement share its data, see copy. Use get_data for a modifiable copy.
+    """
+
+    __slots__ = ['_headers', '_columns', '_is_background', '_psi', '_time', 'file_name', 'name', '_pos', '_ctx',
+                 '_summary']
+
     def __init__(self, headers, data, is_background=False):
+        """
+        :param headers: Headers of the measurement
+        :param data: array of [theta, dtheta, counts (total; not per second), dcounts], one row per data point
+        :param bool is_background: Whether this is a background measurement
+        """
+        data = np.asarray(data, dtype=float)
+        if data.size == 0:
+            data = data.reshape(0, 4)
+
         self._headers = headers
-        # data: [theta, dtheta, counts (total; not per second), dcounts]
-        self._data = np.array(data)
-        self._remove_strange_data_points()
+        self._set_columns(np.array(data.T, order='C'))
         self._is_background = bool(is_background)
         self._psi = 0
+        self._time = None
         self.file_name = None
         self.name = ""
         self._pos = {}
         self._ctx = {}
 
+    @classmethod
+    def from_columns(cls, headers, x, y, dx=None, dy=None, is_background=False) -> 'Measurement':
+        """
+        Creates a measurement from its columns, without creating the row-wise data first. Missing errors are zero.
+
+        :param headers: Headers of the measurement
+        :param x: theta
+        :param y: counts (total; not per second)
+        :param dx: dtheta
+        :param dy: dcounts
+        :param bool is_background: Whether this is a background measurement
+        """
+        columns = np.zeros((4, len(x)))
+        for index, column in enumerate([x, dx, y, dy]):
+            if column is not None:
+                columns[index] = column
+
+        ms = cls(headers, np.zeros((0, 4)), is_background)
+        ms._set_columns(columns)
+        return ms
+
     def set_counting_time(self, time):
         self._time = time
 
@@ -56,50 +307,158 @@ class Measurement(object):
     def get_display_name(self):
         return self.name
 
-    def _remove_strange_data_points(self):
+    def _set_columns(self, columns: np.ndarray):
+        self._columns = self.remove_strange_data_points(columns)
+        self._columns.flags.writeable = False
+        # computed when needed, see get_summary
+        self._summary = None
+
+    @staticmethod
+    def remove_strange_data_points(columns: np.ndarray) -> np.ndarray:
         """
-        Removes "strange" data points, i.e. data points with counts less or equal to zero counts.
+        Removes "strange" data points, i.e. data points with counts less than zero. Usually there is nothing to
+        remove, hence the columns are returned without a copy then.
 
+        :param np.ndarray columns: The columns [theta, dtheta, counts, dcounts]
         :return:
         """
-        if len(self._data ) == 0:
-            return
-
-        data = self._data.T
+        if columns.shape[1] == 0:
+            return columns
 
         # Thats the counts.
-        ind = data[2] >= 0
+        ind = columns[2] >= 0
+
+        if ind.all():
+            return columns
 
-        if any(ind) == False:
+        if not ind.any():
             raise RuntimeError("Data contains no positive counts?")
 
-        new_data = 4 * [None]
+        return columns[:, ind]
+
+    def get_data(self) -> np.ndarray:
+        """
+        Returns a modifiable copy of the data, i.e. array of [theta, dtheta, counts, dcounts].
+        """
+        return np.array(self._columns.T, order='C')
+
+    def get_data_view(self) -> np.ndarray:
+        """
+        Returns the data without copying it. The returned array is read-only, use get_data for a modifiable copy.
+        """
+        return self._columns.T
+
+    def get_columns(self) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+        """
+        Returns read-only views of the columns theta, dtheta, counts, dcounts.
+        """
+        return tuple(self._columns)
+
+    def get_x(self) -> np.ndarray:
+        return self._columns[0]
 
-        new_data[0] = data[0][ind]
-        new_data[1] = data[1][ind]
-        new_data[2] = data[2][ind]
-        new_data[3] = data[3][ind]
+    def get_dx(self) -> np.ndarray:
+        return self._columns[1]
 
-        self._data = np.array(new_data).T
+    def get_y(self) -> np.ndarray:
+        return self._columns[2]
 
-    def get_data(self):
-        return np.copy(self._data)
+    def get_dy(self) -> np.ndarray:
+        return self._columns[3]
+
+    def get_length(self) -> int:
+        return self._columns.shape[1]
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+        # unpickled arrays are writeable again
+        self._columns.flags.writeable = False
+
+    def copy(self) -> 'Measurement':
+        """
+        Returns a copy of the measurement, which shares the (read-only) data with this measurement.
+        """
+        ms = Measurement.__new__(Measurement)
+        for name in self.__slots__:
+            setattr(ms, name, getattr(self, name))
+
+        ms._pos = dict(self._pos)
+        ms._ctx = dict(self._ctx)
+        return ms
 
     def scale_y(self, factor):
-        self._data = self._data * np.array([1, 1, factor, factor])
+        self._set_columns(self._columns * np.array([[1], [1], [factor], [factor]]))
 
     def get_headers(self):
         return self._headers
 
+    def get_summary(self) -> MeasurementSummary:
+        """
+        Returns the summary of the data, which is computed once and again only after the data was replaced.
+        """
+        if self._summary is None:
+            self._summary = MeasurementSummary(self._columns[0], self._columns[2])
+
+        return self._summary
+
     def get_data_region_x(self) -> (float, float):
         """
         Returns the data region for the x-variable (i.e. theta)
         :return: (max, min)
         """
-        max = np.amax(self._data, axis=0)[0]
-        min = np.amin(self._data, axis=0)[0]
+        summary = self.get_summary()
+
+        if summary.get_length() == 0:
+            raise ValueError("Measurement does not contain any data")
+
+        return summary.get_x_max(), summary.get_x_min()
+
+    def is_sorted_x(self) -> bool:
+        """
+        Returns whether the x-values are in ascending order.
+        """
+        return self.get_summary().is_sorted()
+
+    def get_index_range_x(self, x_min, x_max):
+        """
+        Returns the indices (start, end), such that the data points start, ..., end - 1 are the ones with
+        x_min <= x <= x_max. This is possible only if the x-values are in ascending order, otherwise None is returned.
+
+        For a uniform step, the indices are computed directly, and corrected for rounding errors. Otherwise, they
+        are found by a binary search.
+        """
+        summary = self.get_summary()
+        x = self._columns[0]
+        length = len(x)
+
+        if not summary.is_sorted():
+            return None
+
+        step = summary.get_step()
+
+        if step is None:
+            start = int(np.searchsorted(x, x_min, side='left'))
+            end = int(np.searchsorted(x, x_max, side='right'))
+            return start, max(start, end)
 
-        return max, min
+        start = int(np.clip(np.ceil((x_min - x[0]) / step), 0, length))
+        end = int(np.clip(np.floor((x_max - x[0]) / step) + 1, 0, length))
+
+        while start > 0 and x[start - 1] >= x_min:
+            start -= 1
+        while start < length and x[start] < x_min:
+            start += 1
+        while end > 0 and x[end - 1] > x_max:
+            end -= 1
+        while end < length and x[end] <= x_max:
+            end += 1
+
+        return start, max(start, end)
 
     def set_psi(self, psi):
         self.set_position('psi', psi)
@@ -113,16 +472,22 @@ class Measurement(object):
     def get_position(self, name) -> float:
         return self._pos.get(name, None)
 
+    def get_positions(self) -> dict:
+        return dict(self._pos)
+
     def set_context(self, key, value):
         self._ctx[key] = value
 
     def get_context(self, key, alternative=None):
         return self._ctx.get(key, alternative)
 
+    def get_contexts(self) -> dict:
+        return dict(self._ctx)
+
     def as_function(self):
         from skipi.function import Function
 
-        return Function.to_function(2*self._data[:,0], self._data[:,2])
+        return Function.to_function(2*self._columns[0], self._columns[2])
 
 class Measurements(object):
     def __init__(self, header, measurements, backgrounds, measurement_context):
@@ -167,6 +532,105 @@ class Measurements(object):
     def get_background_measurement(self, index):
         return self._background_measurement[index]
 
+    def iter_measurements(self) -> Iterator[Measurement]:
+        return iter(self.get_measurements())
+
+    def iter_background_measurements(self) -> Iterator[Measurement]:
+        return iter(self.get_background_measurements())
+
+    def iter_all_measurements(self) -> Iterator[Measurement]:
+        """
+        Iterates over the measurements and the background measurements, see Measurement.is_background.
+        """
+        return itertools.chain(self.get_measurements(), self.get_background_measurements())
+
     def add(self, mss: 'Measurements'):
         self._measurement = self._measurement + mss.get_measurements()
         self._background_measurement = self._background_measurement + mss.get_background_measurements()
+
+
+class LazyMeasurements(Measurements):
+    """
+    Measurements which are backed by a lazy source, e.g. a parser yielding one measurement at a time.
+
+    The source is a callable returning an iterator over all measurements, where the background measurements are
+    marked by Measurement.is_background. iter_all_measurements streams the measurements and backgrounds from the
+    source in a single pass without keeping them, hence it runs in bounded memory. iter_measurements does the same,
+    but keeps the (usually few) background measurements it passes, hence a following iter_background_measurements
+    does not read the source again. All other methods load the measurements from the source once and keep them.
+    """
+
+    def __init__(self, header, source: Callable[[], Iterator[Measurement]], measurement_context):
+        super(LazyMeasurements, self).__init__(header, None, None, measurement_context)
+        self._source = source
+        # the background measurements found by a complete pass of iter_measurements
+        self._streamed_backgrounds = None
+
+    def _load(self):
+        if self._measurement is None:
+            measurements = list(self._source())
+            self._measurement = [ms for ms in measurements if not ms.is_background()]
+            self._background_measurement = [ms for ms in measurements if ms.is_background()]
+
+    def is_loaded(self):
+        return self._measurement is not None
+
+    def get_count_measurements(self):
+        self._load()
+        return super(LazyMeasurements, self).get_count_measurements()
+
+    def get_count_background_measurements(self):
+        self._load()
+        return super(LazyMeasurements, self).get_count_background_measurements()
+
+    def get_measurement(self, index):
+        self._load()
+        return super(LazyMeasurements, self).get_measurement(index)
+
+    def get_measurements(self):
+        self._load()
+        return super(LazyMeasurements, self).get_measurements()
+
+    def get_background_measurements(self):
+        self._load()
+        return super(LazyMeasurements, self).get_background_measurements()
+
+    def get_background_measurement(self, index):
+        self._load()
+        return super(LazyMeasurements, self).get_background_measurement(index)
+
+    def iter_measurements(self) -> Iterator[Measurement]:
+        if self.is_loaded():
+            return super(LazyMeasurements, self).iter_measurements()
+
+        return self._stream_measurements()
+
+    def _stream_measurements(self) -> Iterator[Measurement]:
+        backgrounds = []
+
+        for ms in self._source():
+            if ms.is_background():
+                backgrounds.append(ms)
+            else:
+                yield ms
+
+        self._streamed_backgrounds = backgrounds
+
+    def iter_background_measurements(self) -> Iterator[Measurement]:
+        if self.is_loaded():
+            return super(LazyMeasurements, self).iter_background_measurements()
+
+        if self._streamed_backgrounds is not None:
+            return iter(self._streamed_backgrounds)
+
+        return (ms for ms in self._source() if ms.is_background())
+
+    def iter_all_measurements(self) -> Iterator[Measurement]:
+        if self.is_loaded():
+            return super(LazyMeasurements, self).iter_all_measurements()
+
+        return self._source()
+
+    def add(self, mss: 'Measurements'):
+        self._load()
+        super(LazyMeasurements, self).add(mss)
@@ -12,9 +12,18 @@ class AbstractMeasurementMerger(object):
 
 
 class MeasurementMerger(AbstractMeasurementMerger):
-    def __init__(self, scaling_factor=None, averaging=False, comparator: Comparator = None):
+    def __init__(self, scaling_factor=None, averaging=False, comparator: Comparator = None,
+                 interpolation=Comparator.INTERPOLATION_LINEAR):
+        """
+        :param float scaling_factor: Fixed scaling factor. If None, it is computed from the overlap.
+        :param bool averaging: Whether the overlapping region is averaged
+        :param Comparator comparator:
+        :param str interpolation: If the measurements were not measured at the same x-values in the overlap,
+                                  measurement_2 is interpolated, see Comparator.interpolate
+        """
         self._scaling = scaling_factor
         self._averaging = averaging
+        self._interpolation = interpolation
 
         if comparator is None:
             comparator = Comparator()
@@ -32,6 +41,9 @@ class MeasurementMerger(AbstractMeasurementMerger):
             A user-defined scaling_factor can be passed by the argument.
             An averaging function at the overlap region can be performed by the averaging=True parameter.
 
+            If the measurements were measured at different x-values in the overlap region, the scaling factor is
+            computed at the x-values of the 'left' measurement, by interpolating the 'right' one.
+
             Note:
                 The scaling factor is calculated to be bigger than 1 and is chosen to minimize the following problem:
 
@@ -54,23 +66,22 @@ class MeasurementMerger(AbstractMeasurementMerger):
         # and get the data in the overlapping region
         overlap_data_1, overlap_data_2 = self._compare.overlapping_data(measurement_1, measurement_2, overlap_region)
 
-        # We now assume that the x-values are correctly ordered,
-        # i.e. the x-values are decreasing.
+        if len(overlap_data_1) == 0:
+            raise ValueError("Cannot merge data sets without data points in the overlapping region.")
 
-        # Next we want to compare at the same x-values. For that we just check for the
-        # same amount of elements in the list. This should be enough.
-        if not len(overlap_data_1) == len(overlap_data_2):
-            raise ValueError("Cannot merge data sets, if the overlapping region has not the same data elements.")
+        # We compare at the same x-values. If the measurements were not measured at the same x-values, we
+        # interpolate measurement_2 at the ones of measurement_1.
+        aligned_data_2 = overlap_data_2
+        if not self._compare.is_same_grid(overlap_data_1, overlap_data_2):
+            aligned_data_2 = self._compare.interpolate(measurement_2, overlap_data_1[:, 0], self._interpolation)
 
         scaling_factor = self._scaling
+        y_1 = overlap_data_1[:, 2]
+        y_2 = aligned_data_2[:, 2]
 
         # Compute the scaling factor if the user did not specify it.
         if scaling_factor is None:
-            scaling_factors = [overlap_data_1[i][2] / overlap_data_2[i][2] for i in range(len(overlap_data_1))]
-            scaling_factor = np.average(scaling_factors)
-            scaling_factor_std = np.std(scaling_factors)
-
-            scaling_factor = sum([overlap_data_1[i][2]*overlap_data_2[i][2] for i in range(len(overlap_data_1))]) / sum([overlap_data_2[i][2]**2 for i in range(len(overlap_data_1))])
+            scaling_factor = np.sum(y_1 * y_2) / np.sum(y_2 ** 2)
 
             #scaling_factor = sum([x[2] for x in overlap_data_1]) / sum([x[2] for x in overlap_data_2])
             if scaling_factor < 1:
@@ -78,8 +89,7 @@ class MeasurementMerger(AbstractMeasurementMerger):
 
         # figure out, which measurement has bigger values in the overlapping region
         # then we scale the other measurement.
-        diff = sum([overlap_data_1[i][2] - overlap_data_2[i][2] for i in range(len(overlap_data_1))])
-        print(f"Scaling factor std {scaling_factor_std}")
+        diff = np.sum(y_1 - y_2)
         if diff >= 0:
             print(f"Scaling measurement 2 with {scaling_factor:.3f}, diff={diff}")
             # measurement 1 is bigger, hence scale measurement 2
@@ -93,14 +103,14 @@ class MeasurementMerger(AbstractMeasurementMerger):
         # Already calculate the left and right data regions. They need to be scaled in the next step.
         # Choose the regions, such that we keep most of the data...
         if measurement_1.get_data_region_x()[1] <= measurement_2.get_data_region_x()[1]:
-            data_left = np.array([x for x in measurement_1.get_data() if x[0] < overlap_region[1]])
+            data_left = self._data_below(measurement_1, overlap_region[1])
         else:
-            data_left = np.array([x for x in measurement_2.get_data() if x[0] < overlap_region[1]])
+            data_left = self._data_below(measurement_2, overlap_region[1])
 
         if measurement_1.get_data_region_x()[0] >= measurement_2.get_data_region_x()[0]:
-            data_right = np.array([x for x in measurement_1.get_data() if x[0] > overlap_region[0]])
+            data_right = self._data_above(measurement_1, overlap_region[0])
         else:
-            data_right = np.array([x for x in measurement_2.get_data() if x[0] > overlap_region[0]])
+            data_right = self._data_above(measurement_2, overlap_region[0])
 
         """
         if diff >= 0:
@@ -119,8 +129,17 @@ class MeasurementMerger(AbstractMeasurementMerger):
         # The right region from measurement_2 (scaled)
         # The overlapping region either from measurement_1 or from the average of both
         if self._averaging is True:
-            # now average over the two data sets
-            data_middle = np.array(0.5 * (overlap_data_2 + overlap_data_1))
+            # now average over the two data sets, at the x-values of measurement_1. The overlaps were taken before
+            # scaling, hence the scaling factor is applied here, too.
+            scaling_array = np.array([1, 1, scaling_factor, scaling_factor])
+            if diff >= 0:
+                aligned_data_2 = aligned_data_2 * scaling_array
+            else:
+                overlap_data_1 = overlap_data_1 * scaling_array
+
+            data_middle = np.array(overlap_data_1)
+            data_middle[:, 1:3] = 0.5 * (overlap_data_1[:, 1:3] + aligned_data_2[:, 1:3])
+            data_middle[:, 3] = 0.5 * np.sqrt(overlap_data_1[:, 3] ** 2 + aligned_data_2[:, 3] ** 2)
         else:
             # as the middle part, take the measurements which were not scaled.
             if diff >= 0:
@@ -138,6 +157,14 @@ class MeasurementMerger(AbstractMeasurementMerger):
 
         return Measurement(measurement_1.get_headers(), data)
 
+    def _data_below(self, measurement: Measurement, x_limit):
+        data = measurement.get_data_view()
+        return data[data[:, 0] < x_limit]
+
+    def _data_above(self, measurement: Measurement, x_limit):
+        data = measurement.get_data_view()
+        return data[data[:, 0] > x_limit]
+
 
 class MultiMerger(object):
     def __init__(self, merger_class: AbstractMeasurementMerger):
@@ -177,6 +204,138 @@ class MultiMerger(object):
         return measurement
 
 
+class GlobalScalingMerger(MultiMerger):
+    """
+    Merges all measurements at once, instead of merging them pairwise one after another.
+
+    The scaling factors s_i of all measurements are computed in a single weighted linear least-squares problem in the
+    log domain. Every pair i, j of overlapping measurements gives an estimate d_ij of log(s_j / s_i), namely the
+    solution of min_alpha || f_i - alpha f_j ||^2 (see MeasurementMerger.merge), weighted by the inverse of its
+    poisson variance 1 / sum(f_i) + 1 / sum(f_j). The measurement with the most counts is the reference, i.e. it is not
+    scaled.
+
+    In overlapping regions, the data of the measurement with more counts in the overlap is taken. A measurement never
+    contributes points below the largest x already taken from the previous ones, hence also overlaps of measurements
+    which are not consecutive are taken only once. The result is assembled by a single concatenation, and the given
+    measurements are not modified.
+    """
+
+    def __init__(self, comparator: Comparator = None):
+        super(GlobalScalingMerger, self).__init__(None)
+
+        if comparator is None:
+            comparator = Comparator()
+
+        self._compare = comparator
+
+    def _overlap(self, measurement_1: Measurement, measurement_2: Measurement):
+        try:
+            region = self._compare.overlap_limits(measurement_1, measurement_2)
+        except ValueError:
+            return None
+
+        overlap_1, overlap_2 = self._compare.aligned_overlapping_data(measurement_1, measurement_2, region)
+
+        if len(overlap_1) == 0:
+            return None
+
+        return region, overlap_1[:, 2], overlap_2[:, 2]
+
+    def scaling_factors(self, measurements: List[Measurement]) -> np.ndarray:
+        """
+        Computes the scaling factors of the measurements, see GlobalScalingMerger.
+
+        :param list measurements: Measurements
+        :return: Scaling factors, in the order of the measurements
+        """
+        count = len(measurements)
+        rows, estimates, weights = [], [], []
+
+        for i in range(count):
+            for j in range(i + 1, count):
+                overlap = self._overlap(measurements[i], measurements[j])
+                if overlap is None:
+                    continue
+
+                _, y_i, y_j = overlap
+                sum_i, sum_j = np.sum(y_i), np.sum(y_j)
+                product, norm = np.sum(y_i * y_j), np.sum(y_j ** 2)
+
+                if sum_i <= 0 or sum_j <= 0 or product <= 0:
+                    continue
+
+                # s_i * f_i = s_j * f_j and f_i = alpha * f_j, hence log(s_j) - log(s_i) = log(alpha)
+                row = np.zeros(count)
+                row[i], row[j] = -1, 1
+                rows.append(row)
+                estimates.append(np.log(product / norm))
+                weights.append(1.0 / (1.0 / sum_i + 1.0 / sum_j))
+
+        totals = [ms.get_summary().get_total_counts() for ms in measurements]
+        reference = int(np.argmax(totals))
+        unknowns = [k for k in range(count) if k != reference]
+
+        log_factors = np.zeros(count)
+
+        if len(unknowns) > 0:
+            if len(rows) == 0:
+                raise ValueError("Cannot merge measurements without any overlap")
+
+            sqrt_w = np.sqrt(weights)
+            A = np.array(rows)[:, unknowns] * sqrt_w[:, np.newaxis]
+            b = np.array(estimates) * sqrt_w
+
+            if np.linalg.matrix_rank(A) < len(unknowns):
+                raise ValueError("Cannot merge measurements, not every measurement overlaps with the others")
+
+            log_factors[unknowns] = np.linalg.lstsq(A, b, rcond=None)[0]
+
+        return np.exp(log_factors)
+
+    def merge(self, measurements: List[Measurement]) -> Measurement:
+        measurements = self.sort(measurements)
+
+        if len(measurements) == 1:
+            return Measurement(measurements[0].get_headers(), measurements[0].get_data_view())
+
+        factors = self.scaling_factors(measurements)
+
+        # The x-interval every measurement contributes, in the order of the measurements. Between consecutive
+        # measurements, the one with more counts in the overlap keeps the overlapping region.
+        lower = [(-np.inf, True) for _ in measurements]
+        upper = [(np.inf, True) for _ in measurements]
+
+        for i in range(len(measurements) - 1):
+            overlap = self._overlap(measurements[i], measurements[i + 1])
+            if overlap is None:
+                continue
+
+            (overlap_max, overlap_min), y_1, y_2 = overlap
+
+            if np.sum(y_1 - y_2) >= 0:
+                lower[i + 1] = (overlap_max, False)
+            else:
+                upper[i] = (overlap_min, False)
+
+        parts = []
+        x_max = -np.inf
+        for ms, factor, (low, low_inclusive), (high, high_inclusive) in zip(measurements, factors, lower, upper):
+            data = ms.get_data_view()
+            x = data[:, 0]
+
+            mask = (x >= low) if low_inclusive else (x > low)
+            mask &= (x <= high) if high_inclusive else (x < high)
+            mask &= x > x_max
+
+            part = data[mask] * np.array([1, 1, factor, factor])
+            if len(part) > 0:
+                x_max = max(x_max, np.max(part[:, 0]))
+
+            parts.append(part)
+
+        return Measurement(measurements[0].get_headers(), np.concatenate(parts))
+
+
 class MeasurementSubtraction(object):
     def __init__(self, comparator: Comparator = None):
         if comparator is None:
@@ -199,7 +358,7 @@ class MeasurementSubtraction(object):
 
         overlap_data_1, overlap_data_2 = self._comp.overlapping_data(measurement_1, measurement_2)
 
-        if not len(overlap_data_1) == len(measurement_1.get_data()):
+        if not len(overlap_data_1) == measurement_1.get_length():
             print("Subtracting measurements: The overlapping region is smaller than before. Ignoring entries...")
 
         if not len(overlap_data_1) == len(overlap_data_2):
@@ -212,12 +371,40 @@ class MeasurementSubtraction(object):
 
 
 class AbstractDataManipulation(object):
+    # The MeasurementContext attributes the manipulation depends on. None means all of them.
+    CONTEXT_FIELDS = None
+
     def manipulate(self, measurement: Measurement, context: MeasurementContext) -> Measurement:
         raise NotImplementedError()
 
-class DataNormalization(AbstractDataManipulation):
+    def apply(self, data: np.ndarray, context: MeasurementContext) -> np.ndarray:
+        """
+        Applies the manipulation on the data array of a measurement, see uxdconverter.pipeline.Pipeline.
+        The array may be modified in-place, the returned array is the result.
+
+        This falls back to manipulate, hence every manipulation can be used in a pipeline.
+        """
+        return self.manipulate(Measurement([], data), context).get_data()
+
+
+class AbstractArrayManipulation(AbstractDataManipulation):
+    """
+    A manipulation implemented on the data array only, i.e. apply does the work and manipulate just wraps the
+    result in a new measurement.
+    """
 
     def manipulate(self, measurement: Measurement, context: MeasurementContext) -> Measurement:
+        data = np.asarray(measurement.get_data(), dtype=float)
+        return Measurement(measurement.get_headers(), self.apply(data, context))
+
+    def apply(self, data: np.ndarray, context: MeasurementContext) -> np.ndarray:
+        raise NotImplementedError()
+
+
+class DataNormalization(AbstractArrayManipulation):
+    CONTEXT_FIELDS = ['normalization', 'normalization_factor']
+
+    def apply(self, data: np.ndarray, context: MeasurementContext) -> np.ndarray:
         """
             Normalizes the measurement to one.
 
@@ -236,10 +423,10 @@ class DataNormalization(AbstractDataManipulation):
              Just find the point with the most counts per second, and normalize this point to 1. The scaling factor is 
              applied to every point.
             """
-            data = measurement.get_data()
-            max = np.amax([x[2] for x in data])
+            max = np.amax(data[:, 2])
             norm = 1.0 / max
-            return Measurement(measurement.get_headers(), data * np.array([1, 1, norm, norm]))
+            data[:, 2:4] *= norm
+            return data
 
         if method == DataNormalizationMethod.FLANK:
             """
@@ -248,31 +435,34 @@ class DataNormalization(AbstractDataManipulation):
              reflection) and find there the point with the slope nearest to zero, i.e. with the smallest absolute gradient.
             """
 
-            data = measurement.get_data()
             # Find the first flank via the gradient.
-            deriv = np.gradient([x[2] for x in data], [x[0] for x in data])
+            deriv = np.gradient(data[:, 2], data[:, 0])
             first_flank = np.argmin(deriv)
 
             if first_flank == 0:
                 idx = 0
             else:
                 # Now look at the points left to the first flank, and find the smallest absolute slope.
-                vf = np.vectorize(abs)
-                left_deriv = vf(deriv[0:first_flank])
+                left_deriv = np.abs(deriv[0:first_flank])
                 idx = np.argmin(left_deriv)
 
             # The scaling factor is then 1 / y_c, where y_c is the point with the lowest absolute slope
             norm = 1.0 / data[idx][2]
-            return Measurement(measurement.get_headers(), data * np.array([1, 1, norm, norm]))
+            data[:, 2:4] *= norm
+            return data
 
         if method == DataNormalizationMethod.FACTOR:
             factor = context.normalization_factor
-            data = measurement.get_data()
-            return Measurement(measurement.get_headers(), data * np.array([1, 1, factor, factor]))
+            data[:, 2:4] *= factor
+            return data
 
+        raise RuntimeError("Unknown normalization method %s" % method)
 
-class DataIlluminationCorrection(AbstractDataManipulation):
-    def manipulate(self, measurement: Measurement, context: MeasurementContext) -> Measurement:
+
+class DataIlluminationCorrection(AbstractArrayManipulation):
+    CONTEXT_FIELDS = ['xray_width', 'sample_length']
+
+    def apply(self, data: np.ndarray, context: MeasurementContext) -> np.ndarray:
         """
             This method takes the measurement data and applies a illumination correction.
 
@@ -290,9 +480,9 @@ class DataIlluminationCorrection(AbstractDataManipulation):
             Note that the scaling factor is only applied if the x-ray footprint is larger than the sample size, i.e.
                 w / \sin(\theta) > l  <=> \theta <= \arcsin( w / l ) =: \theta_c
 
-        :param Measurement measurement: the measurement to correct
+        :param np.ndarray data: the data to correct, modified in-place
         :param MeasurementContext context: the context of the measurement (needed for e.g. xray width and sample length)
-        :return: Performs a new measurement with illumination correction applied
+        :return: The data with illumination correction applied
         """
 
         w = context.xray_width
@@ -300,82 +490,102 @@ class DataIlluminationCorrection(AbstractDataManipulation):
 
         # in the docstring, \theta_c denoted, in degree
         critical_angle = np.arcsin(w / l) * 180 / np.pi
-        # make a copy of the data, so we do not modify the data from the measurement (i.e. measurement is immutable)
-        data = measurement.get_data()
 
         pre_scaling = float(w) / l
 
-        # Correct the data
-        for i in range(len(data)):
-            # Correct only if the footprint is larger than the sample
-            # So, scale the cps and the relative error
-            if data[i][0] <= critical_angle:
-                correction = pre_scaling / np.sin(data[i][0] * np.pi / 180)
-                # do nothing with the q-error
-                #data[i][1] = data[i][1]
-                data[i][2] = data[i][2] * correction
-                data[i][3] = data[i][3] * correction
+        if len(data) == 0:
+            return data
 
-        return Measurement(measurement.get_headers(), data)
+        # Correct only if the footprint is larger than the sample
+        # So, scale the cps and the relative error, do nothing with the q-error
+        illuminated = data[:, 0] <= critical_angle
+        correction = pre_scaling / np.sin(data[illuminated, 0] * np.pi / 180)
+        data[illuminated, 2] *= correction
+        data[illuminated, 3] *= correction
 
+        return data
 
-class ErrorCalculation(AbstractDataManipulation):
-    def manipulate(self, measurement: Measurement, context: MeasurementContext) -> Measurement:
+
+class ErrorCalculation(AbstractArrayManipulation):
+    CONTEXT_FIELDS = ['theta_error']
+
+    def apply(self, data: np.ndarray, context: MeasurementContext) -> np.ndarray:
         """
          Simply calculate the relative error. For poisson distributed data,
          the absolute error is \sqrt(y) where y is the measurement counts.
          The relative error is hence 1/\sqrt(y).
 
-        :param Measurement measurement:
+        :param np.ndarray data:
         :param MeasurementContext context
         :return:
         """
-        dT = context.theta_error
-        data = [[x[0], dT, x[2], np.sqrt(x[2])] for x in measurement.get_data()]
-        #data = [[x[0], dT, x[2], 1/np.sqrt(x[2])] for x in measurement.get_data()]
-        return Measurement(measurement.get_headers(), data)
+        if len(data) == 0:
+            return data
 
+        data[:, 1] = context.theta_error
+        data[:, 3] = np.sqrt(data[:, 2])
+        return data
 
-class QzCalculation(AbstractDataManipulation):
-    def manipulate(self, measurement: Measurement, context: MeasurementContext) -> Measurement:
+
+class QzCalculation(AbstractArrayManipulation):
+    CONTEXT_FIELDS = ['wavelength', 'wavelength_error']
+
+    def apply(self, data: np.ndarray, context: MeasurementContext) -> np.ndarray:
         """
             Converts the x-data of measurement into qz data by the formula
                 q_z = 4 * pi / \lambda * \sin(\theta)
             where \lambda is the wavelength to the x-ray beam and \theta is the reflectance angle.
 
-            :param Measurement measurement:
+            :param np.ndarray data:
             :param MeasurementContext context:
-            :return Measurement:
+            :return np.ndarray:
                 """
 
         # this is the constant pre-factor for the conversion
         # 4 * pi / \lambda
         pre_factor = 4 * np.pi / context.wavelength
 
-        # make a copy
-        data = measurement.get_data()
-
         # delta Lambda / Lambda squared
         dLoLsq = (context.wavelength_error / context.wavelength)**2
-        #dTsq = dT ** 2
 
-        for i in range(len(data)):
-            t_rad = np.deg2rad(data[i][0])
-            dTsq = np.deg2rad(data[i][1])**2
+        if len(data) == 0:
+            return data
 
-            data[i][0] = pre_factor * np.sin(t_rad)
-            data[i][1] = pre_factor * np.sqrt(np.sin(t_rad)**2 * dLoLsq + np.cos(t_rad)**2 * dTsq)
+        t_rad = np.deg2rad(data[:, 0])
+        dTsq = np.deg2rad(data[:, 1])**2
+        sin_t = np.sin(t_rad)
 
-        return Measurement(measurement.get_headers(), data)
+        data[:, 0] = pre_factor * sin_t
+        data[:, 1] = pre_factor * np.sqrt(sin_t**2 * dLoLsq + np.cos(t_rad)**2 * dTsq)
+
+        return data
 
 
-class QzCropping(AbstractDataManipulation):
+class QzCropping(AbstractArrayManipulation):
+    CONTEXT_FIELDS = ['qz_range']
+
     def manipulate(self, measurement: Measurement, context: MeasurementContext) -> Measurement:
+        # for ascending x-values, the data in the range is a slice, see Measurement.get_index_range_x
+        index_range = measurement.get_index_range_x(context.qz_range[0], context.qz_range[1])
+
+        if index_range is None:
+            return super(QzCropping, self).manipulate(measurement, context)
+
+        if index_range[0] == index_range[1]:
+            raise RuntimeWarning("No data point in selected range. Check settings")
+
+        data = measurement.get_data_view()[index_range[0]:index_range[1]]
+        return Measurement(measurement.get_headers(), data)
+
+    def apply(self, data: np.ndarray, context: MeasurementContext) -> np.ndarray:
         """
             Crops the qz data, i.e. removes data which does not lie in the interval
                 [qz_min, qz_max], where qz_min, qz_max are defined from context.qz_range
 
-        :param Measurement measurement:
+            After the QzCalculation the qz values are ascending, hence the range is found by a binary search and
+            the cropped data is a slice of the given array. Otherwise, the data points are filtered.
+
+        :param np.ndarray data:
         :param MeasurementContext context:
         :return:
         """
@@ -383,9 +593,25 @@ class QzCropping(AbstractDataManipulation):
         qz_min = context.qz_range[0]
         qz_max = context.qz_range[1]
 
-        new_data = np.array([d for d in measurement.get_data() if qz_min <= d[0] <= qz_max])
+        if len(data) == 0:
+            raise RuntimeWarning("No data point in selected range. Check settings")
 
-        if len(new_data) == 0:
+        qz = data[:, 0]
+        if np.all(qz[1:] >= qz[:-1]):
+            start = np.searchsorted(qz, qz_min, side='left')
+            end = np.searchsorted(qz, qz_max, side='right')
+
+            if start >= end:
+                raise RuntimeWarning("No data point in selected range. Check settings")
+
+            return data[start:end]
+
+        inside = (qz_min <= data[:, 0]) & (data[:, 0] <= qz_max)
+
+        if not inside.any():
             raise RuntimeWarning("No data point in selected range. Check settings")
 
-        return Measurement(measurement.get_headers(), np.array(new_data))
+        if inside.all():
+            return data
+
+        return data[inside]
@@ -1,27 +1,200 @@
+import importlib
 import os
 
-from uxdconverter.parser.uxd import MeasurementsParser
-from uxdconverter.parser.simple import SimpleMeasurementsParser
-from uxdconverter.parser.raw import RawMeasurementsParser
-from uxdconverter.parser.nicos import NicosParser
-from uxdconverter.parser.xrdml import XRDMLParser
+from uxdconverter.measurement import Measurements, Measurement, LazyMeasurements
+
+from typing import Iterator
+
+
+class ParserFormat(object):
+    """
+    Describes a file format and the parser reading it.
+
+    The parser module is imported only when a file of this format is parsed for the first time, hence detecting the
+    format of a file does not import e.g. lxml or the NICOS loader.
+    """
+
+    def __init__(self, name, module, class_name, extensions=None, probe=None, parallel=False):
+        """
+        :param str name: Name of the format
+        :param str module: Module containing the parser
+        :param str class_name: Name of the parser class. It is instantiated with (file, logger)
+        :param list extensions: File extensions of the format, used if the content is not recognized by any probe.
+        :param probe: Function returning True, if the given first bytes of a file are in this format.
+        :param bool parallel: True, if the parser accepts the number of worker processes as keyword processes.
+        """
+        self._name = name
+        self._module = module
+        self._class_name = class_name
+        self._extensions = [ext.lower() for ext in (extensions or [])]
+        self._probe = probe
+        self._parallel = parallel
+        self._parser_class = None
+
+    def get_name(self):
+        return self._name
+
+    def get_extensions(self):
+        return self._extensions
+
+    def has_extension(self, file) -> bool:
+        return os.path.splitext(file)[1].lower() in self._extensions
+
+    def probe(self, head: bytes) -> bool:
+        return self._probe is not None and bool(self._probe(head))
+
+    def get_parser_class(self):
+        if self._parser_class is None:
+            self._parser_class = getattr(importlib.import_module(self._module), self._class_name)
+
+        return self._parser_class
+
+    def create_parser(self, file, logger, processes=None):
+        if self._parallel and processes is not None:
+            return self.get_parser_class()(file, logger, processes=processes)
+
+        return self.get_parser_class()(file, logger)
+
+
+def _probe_raw(head):
+    return head.startswith(b'RAW1.01')
+
+
+def _probe_xrdml(head):
+    return head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<?xml') and b'xrdMeasurements' in head
+
+
+def _probe_uxd(head):
+    return b'; (Data for Range' in head or b'_2THETACPS' in head
+
+
+def _probe_nicos(head):
+    return head.startswith(b'### NICOS data file')
+
+
+def _probe_simple(head):
+    # the first data line has to consist of at least two numbers, i.e. 2theta and cps.
+    for line in head.splitlines():
+        line = line.strip()
+
+        if len(line) == 0 or line.startswith(b'#'):
+            continue
+
+        try:
+            return len([float(value) for value in line.split()]) >= 2
+        except ValueError:
+            return False
+
+    return False
+
+
+RAW = ParserFormat('raw', 'uxdconverter.parser.raw', 'RawMeasurementsParser', ['.raw'], _probe_raw)
+XRDML = ParserFormat('xrdml', 'uxdconverter.parser.xrdml', 'XRDMLParser', ['.xrdml'], _probe_xrdml, parallel=True)
+UXD = ParserFormat('uxd', 'uxdconverter.parser.uxd', 'MeasurementsParser', ['.uxd'], _probe_uxd)
+NICOS = ParserFormat('nicos', 'uxdconverter.parser.nicos', 'NicosParser', ['.dat'], _probe_nicos)
+SIMPLE = ParserFormat('simple', 'uxdconverter.parser.simple', 'SimpleMeasurementsParser', [], _probe_simple)
 
-from uxdconverter.measurement import Measurements
 
 class GeneralParser(object):
-    def __init__(self, logger):
+    # Formats are tried in this order. The simple format has to be the last one, since its probe is the weakest.
+    FORMATS = [RAW, XRDML, UXD, NICOS, SIMPLE]
+
+    # Number of bytes read from the beginning of a file to detect its format
+    PROBE_SIZE = 4096
+
+    def __init__(self, logger, cache=None, processes=None):
+        """
+        :param logger: Logger
+        :param uxdconverter.cache.ParseCache cache: If given, parsed files are stored in and loaded from the cache
+        :param int processes: Number of worker processes decoding a single file, for the formats supporting it
+            (currently XRDML). By default, files are decoded in this process.
+        """
         self._logger = logger
+        self._cache = cache
+        self._processes = processes
+        self._formats = list(self.FORMATS)
+
+    def set_cache(self, cache):
+        """
+        :param uxdconverter.cache.ParseCache cache: The cache for parsed files, or None to disable caching
+        """
+        self._cache = cache
+
+    def register_format(self, parser_format: ParserFormat):
+        """
+        Registers an additional format. It is probed before all other formats.
+        """
+        self._formats.insert(0, parser_format)
+
+    def get_formats(self):
+        return self._formats
+
+    def _read_head(self, file):
+        try:
+            with open(file, 'rb') as fp:
+                return fp.read(self.PROBE_SIZE)
+        except OSError:
+            return b''
+
+    def detect(self, file) -> ParserFormat:
+        """
+        Returns the format of the file, or None if the format is unknown.
+
+        The format is detected by the content of the first few KB of the file. If no format recognizes the content,
+        the file extension decides.
+        """
+        head = self._read_head(file)
+
+        for parser_format in self._formats:
+            if parser_format.probe(head):
+                return parser_format
+
+        for parser_format in self._formats:
+            if parser_format.has_extension(file):
+                return parser_format
+
+        return None
+
+    def can_parse(self, file) -> bool:
+        return self.detect(file) is not None
+
+    def _get_parser(self, file):
+        parser_format = self.detect(file)
+
+        # unknown files are tried with the simple parser, as before.
+        if parser_format is None:
+            parser_format = SIMPLE
+
+        return parser_format.create_parser(file, self._logger, self._processes)
 
     def parse(self, file) -> Measurements:
-        ext = os.path.splitext(file)[1]
-
-        if ext.lower() == '.raw':
-            return RawMeasurementsParser(file, self._logger).parse()
-        elif ext.lower() == '.uxd':
-            return MeasurementsParser(file, self._logger).parse()
-        elif ext.lower() == '.dat':
-            return NicosParser(file, self._logger).parse()
-        elif ext.lower() == '.xrdml':
-            return XRDMLParser(file, self._logger).parse()
-        else:
-            return SimpleMeasurementsParser(file, self._logger).parse()
+        if self._cache is None:
+            return self._get_parser(file).parse()
+
+        measurements = self._cache.load(file)
+        if measurements is not None:
+            return measurements
+
+        measurements = self._get_parser(file).parse()
+
+        try:
+            self._cache.store(file, measurements)
+        except Exception as e:
+            # not being able to cache is not an error, we just have to parse the file again next time.
+            if self._logger is not None:
+                self._logger.warning("Could not cache the measurements of file %s: %s" % (file, e))
+
+        return measurements
+
+    def parse_lazy(self, file) -> LazyMeasurements:
+        """
+        Returns the measurements of the file, backed by the parser. See LazyMeasurements.
+        """
+        return self._get_parser(file).parse_lazy()
+
+    def iter_measurements(self, file) -> Iterator[Measurement]:
+        """
+        Yields the measurements of the file one at a time, i.e. one range/scan after another.
+        Background measurements are marked as such, see Measurement.is_background
+        """
+        return self._get_parser(file).iter_measurements()
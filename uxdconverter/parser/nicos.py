@@ -1,5 +1,7 @@
 from uxdconverter.parser.ndatautils.parser import DataPath, ASCIILoader, InstrumentLoader
-from uxdconverter.measurement import Measurements, MeasurementContext, Measurement
+from typing import Iterator
+
+from uxdconverter.measurement import Measurements, MeasurementContext, Measurement, LazyMeasurements
 
 
 class XrayDataPath(DataPath):
@@ -15,7 +17,7 @@ class NicosParser(object):
         self._file = file_obj
         self._logger = logger
 
-    def parse(self) -> Measurements:
+    def _parse_measurement(self) -> Measurement:
         datapath = XrayDataPath(self._file)
         loader = ASCIILoader(datapath, InstrumentLoader())
 
@@ -24,4 +26,13 @@ class NicosParser(object):
         # d[3] is steptime
         # d[4] is counts
         data = [[d[0], 0.0, d[4], 0.0] for d in rawdata]
-        return Measurements([], [Measurement([], data)], [], MeasurementContext())
+        return Measurement([], data)
+
+    def iter_measurements(self) -> Iterator[Measurement]:
+        yield self._parse_measurement()
+
+    def parse_lazy(self) -> LazyMeasurements:
+        return LazyMeasurements([], self.iter_measurements, MeasurementContext())
+
+    def parse(self) -> Measurements:
+        return Measurements([], [self._parse_measurement()], [], MeasurementContext())
@@ -1,6 +1,8 @@
-from uxdconverter.raw.converter import MeasurementsConverter
+from typing import Iterator
+
+from uxdconverter.raw.converter import MeasurementsConverter, MeasurementConverter
 from uxdconverter.raw.parser import RawParser
-from uxdconverter.measurement import Measurements
+from uxdconverter.measurement import Measurements, Measurement, LazyMeasurements, MeasurementContext
 
 class RawMeasurementsParser(object):
     def __init__(self, file, logger):
@@ -9,9 +11,16 @@ class RawMeasurementsParser(object):
         self._converter = MeasurementsConverter()
 
     def parse(self) -> Measurements:
-        try:
-            f = open(self._file, "rb")
-        except:
-            raise RuntimeError("Could not open file %s" % self._file)
+        return self._converter.convert(RawParser().parse_from_file(self._file))
+
+    def iter_measurements(self) -> Iterator[Measurement]:
+        """
+        Yields the measurements of the file, reading and converting one range at a time.
+        """
+        converter = MeasurementConverter()
+
+        for measurement_range in RawParser().iter_from_file(self._file):
+            yield converter.convert(measurement_range)
 
-        return self._converter.convert(RawParser().parse(f.read()))
\ No newline at end of file
+    def parse_lazy(self) -> LazyMeasurements:
+        return LazyMeasurements([], self.iter_measurements, MeasurementContext())
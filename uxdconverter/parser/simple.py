@@ -1,6 +1,8 @@
 import numpy as np
 
-from uxdconverter.measurement import MeasurementContext, Measurement, Measurements
+from typing import Iterator
+
+from uxdconverter.measurement import MeasurementContext, Measurement, Measurements, LazyMeasurements
 
 
 class SimpleMeasurementsParser(object):
@@ -14,6 +16,19 @@ class SimpleMeasurementsParser(object):
         if context is None:
             context = MeasurementContext()
 
+        # also, we have no headers here and no background.
+        return Measurements([], [self._parse_measurement()], [], context)
+
+    def iter_measurements(self) -> Iterator[Measurement]:
+        yield self._parse_measurement()
+
+    def parse_lazy(self, context=None) -> LazyMeasurements:
+        if context is None:
+            context = MeasurementContext()
+
+        return LazyMeasurements([], self.iter_measurements, context)
+
+    def _parse_measurement(self) -> Measurement:
         # we assume that the file structure is readable by numpy.loadtxt
         # and the data format is:
         #
@@ -34,7 +49,4 @@ class SimpleMeasurementsParser(object):
         parsed = np.array(parsed)
 
         # we have no headers here...
-        measurement = Measurement([], parsed)
-
-        # also, we have no headers here and no background.
-        return Measurements([], [measurement], [], context)
\ No newline at end of file
+        return Measurement([], parsed)
\ No newline at end of file
@@ -1,8 +1,67 @@
-import codecs
+import io
+import mmap
+import re
+import warnings
 
 import numpy as np
 
-from uxdconverter.measurement import MeasurementContext, Measurements, Measurement
+from typing import Iterator
+
+from uxdconverter.measurement import MeasurementContext, Measurements, Measurement, LazyMeasurements
+
+
+class UXDRangeSplitter(object):
+    """
+    Splits the content of an UXD file into its ranges, without decoding the file line by line.
+
+    The content is a bytes-like buffer, e.g. a mmap of the file. The ranges start with the
+    '; (Data for Range number' mark, followed by the headers of the range. The data section of a range starts
+    after the '_2THETACPS' line.
+    """
+
+    RANGE_MARKER = re.compile(rb'^; \(Data for Range number', re.MULTILINE)
+    DATA_MARKER = re.compile(rb'^_2THETACPS[^\n]*\n?', re.MULTILINE)
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._starts = [match.start() for match in self.RANGE_MARKER.finditer(buffer)]
+
+    def get_number_of_ranges(self):
+        return len(self._starts)
+
+    def get_general_header(self) -> bytes:
+        """
+        Returns everything before the first range.
+        """
+        if len(self._starts) == 0:
+            return self._buffer[:]
+
+        return self._buffer[0:self._starts[0]]
+
+    def get_range(self, number) -> (bytes, bytes):
+        """
+        Returns the headers and the data section of the range.
+
+        :param int number: Index of the range, starting at zero
+        :return: (header_bytes, data_bytes)
+        """
+        start = self._starts[number]
+
+        if number + 1 < len(self._starts):
+            end = self._starts[number + 1]
+        else:
+            end = len(self._buffer)
+
+        match = self.DATA_MARKER.search(self._buffer, start, end)
+
+        if match is None:
+            return self._buffer[start:end], b''
+
+        return self._buffer[start:match.start()], self._buffer[match.end():end]
+
+    def __iter__(self):
+        for number in range(len(self._starts)):
+            yield self.get_range(number)
 
 
 class MeasurementsParser(object):
@@ -10,64 +69,93 @@ class MeasurementsParser(object):
         self._file = file_obj
         self._logger = logger
 
-    def _read_measurements(self):
+    def _open_buffer(self):
+        try:
+            file = open(self._file, 'rb')
+        except:
+            raise RuntimeError("Could not open file %s" % self._file)
+
+        with file:
+            try:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty files cannot be mapped
+                return b''
 
-        # Contains as the first element the general header information
-        # Then, for every positive index, the array contains headers and
-        # the measurement data. The headers differ for each measurement.
+    def _close_buffer(self, buffer):
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
 
-        # i.e.
-        # measurements = [general_header, header_and_measurement_1, header_and_measurement_2, ... header_and_measurement_n]
+    def parse_header(self):
+        """
+        Parses the general header of the file, located before the first range.
+        """
+        buffer = self._open_buffer()
 
         try:
-            file = codecs.open(self._file, 'r', encoding='utf-8', errors='ignore')
-        except:
-            raise RuntimeError("Could not open file %s" % self._file)
+            return self._parse_header(UXDRangeSplitter(buffer))
+        finally:
+            self._close_buffer(buffer)
 
+    def _parse_header(self, splitter: UXDRangeSplitter):
+        raw_header = MeasurementParser.decode(splitter.get_general_header())
+        return MeasurementParser(self._logger).parse_header(raw_header.splitlines(True))
 
+    def iter_measurements(self) -> Iterator[Measurement]:
+        """
+        Yields the measurements of the file, one range at a time. The last range is marked as background, if the
+        file contains more than one range.
+        """
+        buffer = self._open_buffer()
 
-        measurements = [[]]
+        try:
+            for measurement in self._iter_measurements(UXDRangeSplitter(buffer)):
+                yield measurement
+        finally:
+            self._close_buffer(buffer)
 
-        measurement_number = 0
+    def _iter_measurements(self, splitter: UXDRangeSplitter) -> Iterator[Measurement]:
+        ms_parser = MeasurementParser(self._logger)
 
-        file.seek(0)
+        # The general header is located before the first range. Then, every range contains
+        # headers and the measurement data. The headers differ for each measurement.
+        number_of_ranges = splitter.get_number_of_ranges()
 
-        for line in file:
-            # This is the mark for a data set with headers. After this mark,
-            # a few headers (context data) for a measurement and the measurement itself
-            # is located
-            if line.startswith('; (Data for Range number'):
-                measurement_number += 1
-                measurements.append([])
+        if number_of_ranges < 1:
+            self._logger.error("Did not found any measurements")
 
-            measurements[measurement_number].append(line)
+        for index, (raw_header, raw_data) in enumerate(splitter):
+            measurement = ms_parser.parse_range(raw_header, raw_data)
 
-        return measurements
+            if number_of_ranges > 1 and index == number_of_ranges - 1:
+                measurement.set_background(True)
 
-    def parse(self, context=None) -> Measurements:
+            yield measurement
 
-        # use the default measurement context
+    def parse_lazy(self, context=None) -> LazyMeasurements:
         if context is None:
             context = MeasurementContext()
 
-        ms_parser = MeasurementParser(self._logger)
-
-        measurements = self._read_measurements()
+        return LazyMeasurements(self.parse_header(), self.iter_measurements, context)
 
-        if len(measurements) < 2:
-            self._logger.error("Did not found any measurements")
+    def parse(self, context=None) -> Measurements:
 
-        raw_header = measurements.pop(0)
-        header = ms_parser.parse_header(raw_header)
+        # use the default measurement context
+        if context is None:
+            context = MeasurementContext()
 
-        parsed_measurements = []
-        parsed_backgrounds = []
+        # the header and all ranges are read from a single mapping of the file
+        buffer = self._open_buffer()
 
-        for measurement in measurements:
-            parsed_measurements.append(ms_parser.parse(measurement))
+        try:
+            splitter = UXDRangeSplitter(buffer)
+            header = self._parse_header(splitter)
+            parsed = list(self._iter_measurements(splitter))
+        finally:
+            self._close_buffer(buffer)
 
-        if len(parsed_measurements) > 1:
-            parsed_backgrounds.append(parsed_measurements.pop())
+        parsed_measurements = [ms for ms in parsed if not ms.is_background()]
+        parsed_backgrounds = [ms for ms in parsed if ms.is_background()]
 
         return Measurements(header, parsed_measurements, parsed_backgrounds, context)
 
@@ -76,26 +164,6 @@ class MeasurementParser(object):
     def __init__(self, logger):
         self._logger = logger
 
-    def _split_measurement_from_header(self, raw):
-
-        header = []
-        data = []
-
-        in_header = True
-
-        for line in raw:
-            # This header indicates the start of the data section
-            if line.startswith('_2THETACPS'):
-                in_header = False
-                continue
-
-            if in_header:
-                header.append(line)
-            else:
-                data.append(line)
-
-        return header, data
-
     def parse_header(self, raw):
         return self._parse_header(raw)
 
@@ -121,23 +189,81 @@ class MeasurementParser(object):
 
         return parsed_headers
 
-    def _parse_data(self, raw, steptime):
+    def _parse_data_block(self, block, steptime):
+        """
+        Parses the data section of a range, i.e. the lines after _2THETACPS.
+
+        Every data line contains the 2theta and counts_per_second information. Nothing more, nothing less.
+        Hence, the whole block is decoded at once as a sequence of numbers. Only if the block is malformed,
+        it is parsed line by line.
+
+        :param str block: The data section
+        :param steptime: The counting time per data point
+        :return: array of [theta, 0, counts, 0]
+        """
+        steptime = float(str(steptime).replace(',', '.'))
+        # the decimal separator is replaced once for the whole block
+        block = block.replace(',', '.')
+
+        values = self._decode_block(block)
+
+        if values is None:
+            return self._parse_data_lines(block.splitlines(), steptime)
+
+        ttheta, cps = values.T
+
+        # add 2theta, cps, and delta_cps, where delta_cps is currently set to zero.
+        # divide 2theta by 2, so we just have theta :)
+        data = np.zeros((len(ttheta), 4))
+        data[:, 0] = ttheta / 2.0
+        data[:, 2] = cps * steptime
+
+        return data
+
+    def _decode_block(self, block):
+        """
+        Decodes the data section at once. Returns None, if any line does not contain exactly two numbers.
+        Empty lines are ignored, as by _parse_data_lines.
+        """
+        if len(block.strip()) == 0:
+            return np.zeros((0, 2))
+
+        try:
+            with warnings.catch_warnings():
+                # numpy warns about empty input, which is handled by the shape check below
+                warnings.simplefilter('ignore')
+                values = np.loadtxt(io.StringIO(block), dtype=float, comments=None, ndmin=2)
+        except ValueError:
+            # e.g. a line with a different number of columns, or something else than numbers
+            return None
+
+        if not values.shape[1] == 2:
+            return None
+
+        return values
+
+    def _parse_data_lines(self, raw, steptime):
         parsed_data = []
 
         for line in raw:
-            try:
+            if line.strip() == '':
+                continue
 
-                # every data line contains the 2theta and counts_per_second information. Nothing more, nothing less.
-                ttheta, cps = line.replace(',', '.').split()
-                # add 2theta, cps, and delta_cps, where delta_cps is currently set to zero.
-                # divide 2theta by 2, so we just have theta :)
+            try:
+                ttheta, cps = line.split()
                 parsed_data.append([float(ttheta) / 2.0, 0.0, float(cps) * steptime, 0.0])
             except:
-                self._logger.error("Could not parse data line '%s'")
+                self._logger.error("Could not parse data line '%s'", line)
 
         return np.array(parsed_data)
 
-    def parse(self, raw):
-        raw_header, raw_data = self._split_measurement_from_header(raw)
-        headers = self._parse_header(raw_header)
-        return Measurement(headers, self._parse_data(raw_data, headers['STEPTIME']))
\ No newline at end of file
+    @staticmethod
+    def decode(raw) -> str:
+        return bytes(raw).decode('utf-8', errors='ignore')
+
+    def parse_range(self, raw_header, raw_data):
+        """
+        Parses a range, given as the bytes of its headers and of its data section (see UXDRangeSplitter).
+        """
+        headers = self._parse_header(self.decode(raw_header).splitlines(True))
+        return Measurement(headers, self._parse_data_block(self.decode(raw_data), headers['STEPTIME']))
@@ -1,10 +1,15 @@
+import warnings
+
 import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
+from typing import Iterator
 
 from lxml import etree
 
 from uxdconverter.enums import DataNormalizationMethod
-from uxdconverter.measurement import MeasurementContext, Measurements, Measurement
+from uxdconverter.measurement import MeasurementContext, Measurements, Measurement, LazyMeasurements
 
 AXIS_2THETA = '2Theta'
 AXIS_OMEGA = 'Omega'
@@ -21,38 +26,53 @@ class DetectorMode(Enum):
     CONTINUOUS = 'scanning'
 
 class GeneralXRDMLParser(object):
-    def __init__(self, file, tree=None):
+    def __init__(self, file):
         self._file = file
-        self._tree = tree
-        self._root = None
         self._ns = None
 
-    def _parse_root(self):
-        if self._tree is None:
-            self._tree = etree.parse(self._file)
+    def _iterparse(self, events=('end',)):
+        """
+        Parses the file incrementally and yields (event, element, name), where name is the tag without namespace.
 
-        self._root = self._tree.getroot()
-        self._ns = self._root.nsmap
+        Note that the document is not kept in memory, as long as the consumer clears the processed elements,
+        see _clear_element.
+        """
+        # huge_tree, since counts of area detectors easily exceed the default text size limit of lxml
+        for event, element in etree.iterparse(self._file, events=events, huge_tree=True):
+            if self._ns is None:
+                self._ns = element.nsmap
 
-    def get_measurement_element(self):
-        self._parse_root()
+            yield event, element, etree.QName(element).localname
 
-        try:
-            measurement = self._root.findall("xrdMeasurement", self._ns)
-        except Exception as e:
-            self._logger.exception(e)
-            raise RuntimeError(f"xrdMeasurement entry not found in file {self._file}")
+    def _clear_element(self, element):
+        # Remove the element and all preceding siblings, which were already processed.
+        element.clear(keep_tail=True)
 
-        if len(measurement) > 1:
-            raise RuntimeError("More than one xrdMeasurement entry?")
+        parent = element.getparent()
+        if parent is None:
+            return
 
-        return measurement[0]
+        while element.getprevious() is not None:
+            del parent[0]
 
 class XRDMLContextParser(GeneralXRDMLParser):
-    def parse(self):
-        xrd_entry = self.get_measurement_element()
-        wavelength = self._get_wavelength(xrd_entry)
+    def parse_header(self):
+        """
+        Parses the context only from the header elements, i.e. the elements before the first scan.
+        The rest of the file is not read.
+        """
+        wavelength = 0.0
+
+        for event, element, name in self._iterparse(events=('start', 'end')):
+            if name == 'scan':
+                break
+
+            if event == 'end' and name == 'usedWavelength':
+                wavelength = self._get_wavelength_from_element(element)
 
+        return self._create_context(wavelength)
+
+    def _create_context(self, wavelength):
         ctx = MeasurementContext()
         ctx.wavelength = wavelength
         ctx.normalization = DataNormalizationMethod.FACTOR
@@ -63,8 +83,7 @@ class XRDMLContextParser(GeneralXRDMLParser):
 
         return ctx
 
-    def _get_wavelength(self, xrd_entry):
-        wavelength = xrd_entry.find("usedWavelength", self._ns)
+    def _get_wavelength_from_element(self, wavelength):
         if wavelength is None:
             return 0.0
 
@@ -75,46 +94,92 @@ class XRDMLContextParser(GeneralXRDMLParser):
 
         return float(kAlpha1.text)
 
+def _decode_scan(fragment, detector_mode):
+    """
+    Decodes a serialized scan element into a measurement. Used by the worker processes of XRDMLParser.
+    """
+    scan = etree.fromstring(fragment, parser=etree.XMLParser(huge_tree=True))
+
+    parser = XRDMLParser(None, None)
+    parser._ns = scan.nsmap
+
+    measurement = parser._get_measurement(scan)
+    measurement.set_context('DetectorMode', detector_mode)
+    return measurement
+
+
 class XRDMLParser(GeneralXRDMLParser):
-    def __init__(self, file, logger):
+    def __init__(self, file, logger, processes=None):
+        """
+        :param file: The XRDML file
+        :param logger:
+        :param int processes: If more than one, the scans are decoded in parallel by this many worker processes.
+            Only worthwhile for files with many large scans on a machine with several cores.
+        """
         super(XRDMLParser, self).__init__(file)
         self._logger = logger
+        self._processes = processes
 
-    def parse(self, context=None) -> Measurements:
-        xrd_entry = self.get_measurement_element()
+    def parse_context(self) -> MeasurementContext:
+        return XRDMLContextParser(self._file).parse_header()
+
+    def iter_measurements(self) -> Iterator[Measurement]:
+        """
+        Yields the measurements of the file, one scan at a time, in document order.
 
-        # use the default measurement context
-        ctxParser = XRDMLContextParser(self._file, self._tree)
-        context = ctxParser.parse()
+        The file is parsed incrementally: Every scan is converted as soon as it is completely read, and removed
+        from the document afterwards. Hence, at most one scan is kept in memory, regardless of the file size.
+        The detector mode is taken from the header elements before the scans.
 
+        If the parser uses multiple processes, the serialized scans are decoded by a process pool. Only a few scans
+        per process are pending at any time.
         """
-        try:
-            tree = etree.parse(self._file)
-            root = tree.getroot()
-            mss = root.findall("xrdMeasurement", root.nsmap)
-        except Exception as e:
-            self._logger.exception(e)
-            raise RuntimeError("Could not read file %s" % self._file)
+        if self._processes is not None and self._processes > 1:
+            return self._iter_parallel()
 
-        self._ns = root.nsmap
+        return self._iter_sequential()
 
-        if len(mss) > 1:
-            raise RuntimeError("More than one xrdMeasurement entry?")
+    def _iter_scans(self):
+        detector_mode = DetectorMode.UNKNOWN
 
-        xrd_entry = mss[0]
-        """
+        for event, element, name in self._iterparse():
+            if name == 'diffractedBeamPath':
+                detector_mode = self._get_detector_mode_from_path(element)
+            elif name == 'scan':
+                yield element, detector_mode
+                self._clear_element(element)
 
-        detector_mode = self._get_detector_mode(xrd_entry)
-        measurements = [self._get_measurement(scan) for scan in xrd_entry.findall("scan", self._ns)]
+    def _iter_sequential(self):
+        for scan, detector_mode in self._iter_scans():
+            measurement = self._get_measurement(scan)
+            measurement.set_context('DetectorMode', detector_mode)
+            yield measurement
 
-        for ms in measurements:
-            ms.set_context('DetectorMode', detector_mode)
+    def _iter_parallel(self):
+        with ProcessPoolExecutor(max_workers=self._processes) as executor:
+            pending = deque()
 
-        return Measurements([], measurements, [], context)
+            for scan, detector_mode in self._iter_scans():
+                pending.append(executor.submit(_decode_scan, etree.tostring(scan), detector_mode))
+
+                if len(pending) >= 2 * self._processes:
+                    yield pending.popleft().result()
+
+            while len(pending) > 0:
+                yield pending.popleft().result()
+
+    def parse_lazy(self) -> LazyMeasurements:
+        return LazyMeasurements([], self.iter_measurements, self.parse_context())
 
-    def _get_detector_mode(self, xrd_entry):
-        diffractedBeamPath = xrd_entry.find("diffractedBeamPath", self._ns)
+    def parse(self, context=None) -> Measurements:
+        measurements = list(self.iter_measurements())
+
+        # use the measurement context of the file
+        context = self.parse_context()
+
+        return Measurements([], measurements, [], context)
 
+    def _get_detector_mode_from_path(self, diffractedBeamPath):
         if diffractedBeamPath is None:
             return DetectorMode.UNKNOWN
 
@@ -136,11 +201,8 @@ class XRDMLParser(GeneralXRDMLParser):
             return DetectorMode.UNKNOWN
 
     def _construct_measurement(self, theta, counts):
-        dtheta = len(theta) * [0.0]
-        dcounts = len(counts) * [0.0]
-        data = np.array(list(zip(theta, dtheta, counts, dcounts)))
-
-        return Measurement([], data)
+        # the errors (dtheta, dcounts) stay zero
+        return Measurement.from_columns([], theta, counts)
 
     def _get_measurement(self, scan):
         datapoints = scan.find("dataPoints", self._ns)
@@ -212,7 +274,7 @@ class XRDMLParser(GeneralXRDMLParser):
 
         list_position = axis.find("listPositions", self._ns)
         if list_position is not None:
-            return np.array(list(map(type, list_position.text.split(" "))))
+            return self._decode_numbers(list_position, type)
 
         start_position = axis.find("startPosition", self._ns)
         end_position = axis.find("endPosition", self._ns)
@@ -226,12 +288,37 @@ class XRDMLParser(GeneralXRDMLParser):
 
         return None
 
+    def _decode_numbers(self, element, type=float) -> np.ndarray:
+        """
+        Decodes the whitespace separated numbers of the element text directly into an array.
+        """
+        if element.text is None:
+            return np.zeros(0, dtype=type)
+
+        try:
+            with warnings.catch_warnings():
+                # numpy only warns (and stops decoding) if the text contains anything else than numbers
+                warnings.simplefilter('error')
+                return np.fromstring(element.text, dtype=type, sep=' ')
+        except (ValueError, DeprecationWarning):
+            raise RuntimeError("Could not decode the numbers of %s" % etree.QName(element).localname)
+
     def _get_counts(self, datapoints):
         element = datapoints.find("counts", self._ns)
 
+        if element is not None:
+            return self._decode_numbers(element, int)
+
+        # Newer files contain the intensities, which are not corrected for the beam attenuation.
+        element = datapoints.find("intensities", self._ns)
+
         if element is None:
             raise RuntimeError("datapoint entry did not contain counts")
 
-        counts = np.array(list(map(int, element.text.split(" "))))
+        intensities = self._decode_numbers(element)
+
+        attenuation = datapoints.find("beamAttenuationFactors", self._ns)
+        if attenuation is not None:
+            intensities = intensities * self._decode_numbers(attenuation)
 
-        return counts
\ No newline at end of file
+        return intensities
@@ -0,0 +1,116 @@
+import numpy as np
+
+from typing import List
+
+from uxdconverter.measurement import Measurement, MeasurementContext
+from uxdconverter.operation import AbstractDataManipulation
+
+
+def remove_strange_data_points(data: np.ndarray) -> np.ndarray:
+    """
+    The same as creating a Measurement of the data does, for data points as rows.
+    """
+    return Measurement.remove_strange_data_points(data.T).T
+
+
+class PipelineStage(object):
+    def __init__(self, name, manipulation: AbstractDataManipulation, condition=None, condition_fields=None):
+        """
+        :param str name: Name of the stage, used to insert other stages before or after it
+        :param AbstractDataManipulation manipulation: The manipulation, applied by its apply method
+        :param condition: Function of the MeasurementContext, returning whether the stage is applied. If None, the
+                          stage is always applied.
+        :param list condition_fields: MeasurementContext attributes the condition depends on. If not given for a
+                                      condition, the stage is assumed to depend on the whole context.
+        """
+        if condition_fields is not None:
+            condition_fields = list(condition_fields)
+        elif condition is None:
+            condition_fields = []
+
+        self._name = name
+        self._manipulation = manipulation
+        self._condition = condition
+        self._condition_fields = condition_fields
+
+    def get_name(self):
+        return self._name
+
+    def get_manipulation(self) -> AbstractDataManipulation:
+        return self._manipulation
+
+    def is_enabled(self, context: MeasurementContext) -> bool:
+        return self._condition is None or bool(self._condition(context))
+
+    def get_context_fields(self):
+        """
+        Returns the MeasurementContext attributes the result of this stage depends on, or None if unknown, i.e. it
+        depends on the whole context.
+        """
+        fields = self._manipulation.CONTEXT_FIELDS
+        if fields is None or self._condition_fields is None:
+            return None
+
+        return self._condition_fields + list(fields)
+
+
+class Pipeline(object):
+    """
+    Applies a list of data manipulations in a single pass over one working array.
+
+    Contrary to calling manipulate for each manipulation, no intermediate Measurement is created, i.e. the data is
+    copied once at the beginning and wrapped into a Measurement once at the end.
+    """
+
+    def __init__(self, stages: List[PipelineStage] = None):
+        if stages is None:
+            stages = []
+
+        self._stages = list(stages)
+
+    def get_stages(self) -> List[PipelineStage]:
+        return list(self._stages)
+
+    def get_stage(self, name) -> PipelineStage:
+        for stage in self._stages:
+            if stage.get_name() == name:
+                return stage
+
+        raise RuntimeError("Unknown pipeline stage %s" % name)
+
+    def _index(self, name):
+        return self._stages.index(self.get_stage(name))
+
+    def insert_stage(self, stage: PipelineStage, before=None, after=None):
+        """
+        Inserts a stage before or after the stage with the given name. If neither is given, the stage is appended.
+        """
+        if before is not None and after is not None:
+            raise RuntimeError("A stage can be inserted either before or after another stage, not both")
+
+        if before is not None:
+            self._stages.insert(self._index(before), stage)
+        elif after is not None:
+            self._stages.insert(self._index(after) + 1, stage)
+        else:
+            self._stages.append(stage)
+
+    def remove_stage(self, name):
+        del self._stages[self._index(name)]
+
+    def apply(self, data: np.ndarray, context: MeasurementContext) -> np.ndarray:
+        """
+        Applies all enabled stages on the data. The data is modified in-place.
+        """
+        for stage in self._stages:
+            if not stage.is_enabled(context):
+                continue
+
+            data = stage.get_manipulation().apply(data, context)
+            data = remove_strange_data_points(data)
+
+        return data
+
+    def run(self, measurement: Measurement, context: MeasurementContext) -> Measurement:
+        data = np.asarray(measurement.get_data(), dtype=float)
+        return Measurement(measurement.get_headers(), self.apply(data, context))
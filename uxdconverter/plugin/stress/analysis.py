@@ -18,12 +18,13 @@ class StressAnalysis(object):
         self._fitters = {}
 
     def group_measurements_by_psi(self, measurements):
-
-        mss = measurements.get_measurements()
-
+        """
+        Groups the measurements by their psi angle. The measurements are iterated, hence a lazily parsed file is
+        streamed instead of being loaded as a whole, see LazyMeasurements.
+        """
         grouped = defaultdict(list)
 
-        for ms in mss:
+        for ms in measurements.iter_measurements():
             grouped[round(ms.get_psi(), 2)].append(ms)
 
         return grouped
@@ -34,8 +35,7 @@ class StressAnalysis(object):
         for psi, mss in group.items():
             merge = multi_merge.merge(mss)
             merge = ErrorCalculation().manipulate(merge, self._c._settings_controller.get_measurement_context())
-            theta, dtheta, counts, dcounts = zip(*merge.get_data())
-            theta = np.array(theta)
+            theta, dtheta, counts, dcounts = merge.get_columns()
             dx = Function.to_function(theta, dtheta)
             dy = Function.to_function(theta, dcounts)
             merged[psi] = Function.to_function(theta, counts, dx=dx, dy=dy)
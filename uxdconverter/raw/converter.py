@@ -10,55 +10,56 @@ class MeasurementConverter(object):
         pass
 
     def convert(self, measurement: MeasurementRange):
-        stepsize = measurement.get_header().get_step_size()
-        steptime = measurement.get_header().get_step_time()
+        header = measurement.get_header()
+        mode = header.get_measurement_mode()
+        stepsize = header.get_step_size()
+        steptime = header.get_step_time()
 
         is_background = False
-        theta_data = (np.array(range(0, measurement.get_header().get_number_of_data_records())) * stepsize) / 2.0
+        theta_data = (np.arange(header.get_number_of_data_records()) * stepsize) / 2.0
 
         psi = 0
 
         # convert to theta, currently it is 2 theta
         # 2Theta = 2 * Theta
-        if measurement.get_header().get_measurement_mode() == RangeHeader.MEASUREMENT_LOCKED_COUPLED:
-            offset = measurement.get_header().get_start_theta()
+        if mode == RangeHeader.MEASUREMENT_LOCKED_COUPLED:
+            offset = header.get_start_theta()
         # 2Theta != 2 * Theta, i.e. usually used for a background scan and Theta has an offset (typ. 0.15deg)
         # or for stress measurements using larger offsets
-        elif measurement.get_header().get_measurement_mode() == RangeHeader.MEASUREMENT_UNLOCKED_COUPLED:
+        elif mode == RangeHeader.MEASUREMENT_UNLOCKED_COUPLED:
             is_background = True
-            psi = measurement.get_header().get_start_theta() - measurement.get_header().get_start_two_theta() / 2.0
+            psi = header.get_start_theta() - header.get_start_two_theta() / 2.0
             if abs(psi) > 0.5:
                 is_background = False
-            offset = measurement.get_header().get_start_two_theta() / 2
-        elif measurement.get_header().get_measurement_mode() == RangeHeader.MEASUREMENT_DETECTOR_SCAN:
-            offset = measurement.get_header().get_start_two_theta() / 2
-        elif measurement.get_header().get_measurement_mode() == RangeHeader.MEASUREMENT_ROCKING_CURVE:
-            offset = measurement.get_header().get_start_theta()
-        elif measurement.get_header().get_measurement_mode() == RangeHeader.MEASUREMENT_PHI_SCAN:
-            offset = measurement.get_header().get_start_phi()
+            offset = header.get_start_two_theta() / 2
+        elif mode == RangeHeader.MEASUREMENT_DETECTOR_SCAN:
+            offset = header.get_start_two_theta() / 2
+        elif mode == RangeHeader.MEASUREMENT_ROCKING_CURVE:
+            offset = header.get_start_theta()
+        elif mode == RangeHeader.MEASUREMENT_PHI_SCAN:
+            offset = header.get_start_phi()
         else:
             raise RuntimeError("Unknown measurement mode")
 
-        #print(measurement.get_header().get_start_chi())
+        #print(header.get_start_chi())
 
-        if measurement.get_header().get_measurement_mode() == RangeHeader.MEASUREMENT_ROCKING_CURVE:
+        if mode == RangeHeader.MEASUREMENT_ROCKING_CURVE:
             data_x = 2 * theta_data + offset # we multiply by two since the division at the start was already wrong...
-        elif measurement.get_header().get_measurement_mode() == RangeHeader.MEASUREMENT_PHI_SCAN:
+        elif mode == RangeHeader.MEASUREMENT_PHI_SCAN:
             data_x = 2*theta_data + offset
         else:
             data_x = theta_data + offset
 
         # Convert to counts per second
         # Naaaah, do not convert to counts per second
-        data_y = np.array(measurement.get_data().get_data_points())# / steptime
+        data_y = measurement.get_data().get_data_array()# / steptime
 
         # do not calculate errors here, we're calculating them later on...
-        error_y = np.array(len(data_x) * [0])
-
-        error_x = np.array(len(data_x) * [0])
+        # i.e. the error columns (1 and 3) stay zero.
+        length = min(len(data_x), len(data_y))
 
         # we do not care about headers at this point
-        ms = Measurement([], [list(a) for a in zip(data_x, error_x, data_y, error_y)], is_background=is_background)
+        ms = Measurement.from_columns([], data_x[:length], data_y[:length], is_background=is_background)
         ms.set_psi(psi)
         ms.set_counting_time(steptime)
         return ms
@@ -1,7 +1,12 @@
+import numpy as np
+
 from uxdconverter.raw.header.structure import AbstractStructure
 
 
 class DataSet(AbstractStructure):
+
+    DTYPE = np.dtype('<f4')
+
     def __init__(self, raw_data):
         super(DataSet, self).__init__(raw_data)
 
@@ -11,5 +16,21 @@ class DataSet(AbstractStructure):
     def get_number_of_data_points(self):
         return int(self.get_length() / self.LENGTH_FLOAT)
 
+    def get_data_array(self, copy=False) -> np.ndarray:
+        """
+        Returns the data points as little-endian float32 array.
+
+        Without copy, the array is a read-only view into the raw data buffer.
+
+        :param bool copy: Return a writeable copy instead of a view
+        :return np.ndarray:
+        """
+        data = np.frombuffer(self._raw, dtype=self.DTYPE, count=self.get_number_of_data_points())
+
+        if copy:
+            return data.copy()
+
+        return data
+
     def get_data_points(self):
-        return [self.get_float(self.LENGTH_FLOAT * addr) for addr in range(0, self.get_number_of_data_points())]
+        return self.get_data_array().tolist()
@@ -1,4 +1,4 @@
-from uxdconverter.raw.header.structure import AbstractStructure
+from uxdconverter.raw.header.structure import AbstractStructure, StructureLayout
 
 
 class FileHeader(AbstractStructure):
@@ -9,41 +9,53 @@ class FileHeader(AbstractStructure):
     UNITS_ANGSTROM = 0
     UNITS_NANOMETER = 1
 
+    LAYOUT = StructureLayout('FileHeaderFields', LENGTH, [
+        ('raw_version', 0, '8s'),
+        ('number_of_completed_data_ranges', 12, 'I'),
+        ('date', 16, '10s'),
+        ('time', 26, '10s'),
+        ('type_anode', 608, '4s'),
+        ('average_wavelength', 616, 'd'),
+        ('units_wavelength', 656, '4s'),
+        ('total_measurement_time', 664, 'f'),
+    ])
 
     def __init__(self, raw_data):
         super(FileHeader, self).__init__(raw_data)
         if not len(raw_data) == self.LENGTH:
             raise RuntimeError("Given input must be exactly 712 bytes long")
 
+        self._fields = self.LAYOUT.unpack(self._raw)
+
     def get_length(self):
         return self.LENGTH
 
     def can_read(self):
-        return self.get_string(0, 8) == 'RAW1.01'
+        return self.decode_string(self._fields.raw_version) == 'RAW1.01'
 
     def get_version(self):
         return self.VERSION_RAW01
 
     def get_number_of_completed_data_ranges(self):
-        return self.get_integer(12)
+        return self._fields.number_of_completed_data_ranges
 
     def get_date(self):
-        return self.get_string(16, 10)
+        return self.decode_string(self._fields.date)
 
     def get_time(self):
-        return self.get_string(26, 10)
+        return self.decode_string(self._fields.time)
 
     def get_type_anode(self):
-        return self.get_string(608, 4)
+        return self.decode_string(self._fields.type_anode)
 
     def get_units_wavelength(self):
-        if self.get_data(656, 4) == b'A\x00\x00\x00':
+        if self._fields.units_wavelength == b'A\x00\x00\x00':
             return self.UNITS_ANGSTROM
         else:
             return self.UNITS_NANOMETER
 
     def get_average_wavelength(self):
-        return self.get_double(616)
+        return self._fields.average_wavelength
 
     def get_total_measurement_time(self):
-        return self.get_float(664)
+        return self._fields.total_measurement_time
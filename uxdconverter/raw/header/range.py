@@ -1,4 +1,4 @@
-from uxdconverter.raw.header.structure import AbstractStructure
+from uxdconverter.raw.header.structure import AbstractStructure, StructureLayout
 from uxdconverter.raw.header.supplementary import Supplementaries
 
 class RangeHeader(AbstractStructure):
@@ -25,6 +25,27 @@ class RangeHeader(AbstractStructure):
     MEASUREMENT_PSD_FIXED_SCAN = 129
     MEASUREMENT_PSD_FAST_SCAN = 130
 
+    LAYOUT = StructureLayout('RangeHeaderFields', LENGTH, [
+        ('header_length', 0, 'I'),
+        ('number_of_data_records', 4, 'I'),
+        ('start_theta', 8, 'd'),
+        ('start_two_theta', 16, 'd'),
+        ('start_chi', 24, 'd'),
+        ('start_phi', 32, 'd'),
+        ('start_x', 40, 'd'),
+        ('start_y', 48, 'd'),
+        ('start_z', 56, 'd'),
+        ('scan_mode', 168, 'I'),
+        ('step_size', 176, 'd'),
+        ('step_time', 192, 'f'),
+        ('measurement_mode', 196, 'I'),
+        ('generator_kilovoltage', 224, 'I'),
+        ('generator_milliamps', 228, 'I'),
+        ('wavelength', 240, 'd'),
+        ('data_length', 252, 'I'),
+        ('supplementary_header_length', 256, 'I'),
+    ])
+
     def __init__(self, raw_data):
 
         super(RangeHeader, self).__init__(raw_data)
@@ -32,64 +53,66 @@ class RangeHeader(AbstractStructure):
         if not len(raw_data) == self.LENGTH:
             raise RuntimeError("Given input must be exactly 304 bytes long")
 
+        self._fields = self.LAYOUT.unpack(self._raw)
+
         self._supplementaries = None
 
     def can_read(self):
-        return self.get_integer(0) == self.LENGTH
+        return self._fields.header_length == self.LENGTH
 
     def get_number_of_data_records(self):
-        return self.get_integer(4)
+        return self._fields.number_of_data_records
 
     def get_start_theta(self):
-        return self.get_double(8)
+        return self._fields.start_theta
 
     def get_start_two_theta(self):
-        return self.get_double(16)
+        return self._fields.start_two_theta
 
     def get_start_chi(self):
-        return self.get_double(24)
+        return self._fields.start_chi
 
     def get_start_phi(self):
-        return self.get_double(32)
+        return self._fields.start_phi
 
     def get_start_x(self):
-        return self.get_double(40)
+        return self._fields.start_x
 
     def get_start_y(self):
-        return self.get_double(48)
+        return self._fields.start_y
 
     def get_start_z(self):
-        return self.get_double(56)
+        return self._fields.start_z
 
     def get_scan_mode(self):
-        return self.get_integer(168)
+        return self._fields.scan_mode
 
     def get_step_size(self):
-        return self.get_double(176)
+        return self._fields.step_size
 
     def get_step_time(self):
-        return self.get_float(192)
+        return self._fields.step_time
 
     def get_measurement_mode(self):
-        return self.get_integer(196)
+        return self._fields.measurement_mode
 
     def get_generator_kilovoltage(self):
-        return self.get_integer(224)
+        return self._fields.generator_kilovoltage
 
     def get_generator_milliamps(self):
-        return self.get_integer(228)
+        return self._fields.generator_milliamps
 
     def get_wavelength(self):
-        return self.get_double(240)
+        return self._fields.wavelength
 
     def get_data_length(self):
-        return self.get_integer(252)
+        return self._fields.data_length
 
     def has_supplementary_headers(self):
         return self.get_supplementary_header_length() > 0
 
     def get_supplementary_header_length(self):
-        return self.get_integer(256)
+        return self._fields.supplementary_header_length
 
     def get_supplementaries(self):
         return self._supplementaries
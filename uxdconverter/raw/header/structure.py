@@ -1,5 +1,7 @@
 import struct
 
+from collections import namedtuple
+
 
 class AbstractStructure(object):
 
@@ -9,8 +11,13 @@ class AbstractStructure(object):
     BYTEORDER = 'little'
 
     def __init__(self, raw):
-        if not isinstance(raw, bytes):
-            raise RuntimeError("Given data is not an instance of bytes")
+        # All structures operate on a memoryview, so that slicing a structure out of a
+        # file buffer does not copy the underlying bytes.
+        if isinstance(raw, (bytes, bytearray)):
+            raw = memoryview(raw)
+
+        if not isinstance(raw, memoryview):
+            raise RuntimeError("Given data is not a bytes-like object")
 
         self._raw = raw
 
@@ -25,9 +32,11 @@ class AbstractStructure(object):
 
     def get_string(self, address, length):
         # Note that the string must end with \0
-        data = self.get_data(address, length)
+        return self.decode_string(self.get_data(address, length))
 
-        return data.decode('utf-8').strip(chr(0x0))
+    @staticmethod
+    def decode_string(data):
+        return bytes(data).decode('utf-8').strip(chr(0x0))
 
     def get_integer(self, address, signed=False):
         return int.from_bytes(self.get_data(address, self.LENGTH_INTEGER), byteorder=self.BYTEORDER, signed=signed)
@@ -43,3 +52,64 @@ class AbstractStructure(object):
 
     def get_float8(self, address):
         return struct.unpack('<d', self.get_data(address, self.LENGTH_DOUBLE))[0]
+
+
+class StructureLayout(object):
+    """
+    Describes the fixed fields of a structure, i.e. their name, address and struct format.
+
+    All fields are compiled into a single struct.Struct, hence a structure can be decoded with one
+    unpack call into a compact record (a namedtuple) instead of decoding every field on access.
+    """
+
+    def __init__(self, name, length, fields):
+        """
+        :param str name: Name of the record type
+        :param int length: Total length of the structure in bytes
+        :param list fields: List of (name, address, format) tuples, e.g. ('step_time', 192, 'f')
+        """
+        fields = sorted(fields, key=lambda field: field[1])
+
+        fmt = '<'
+        position = 0
+
+        for field_name, address, field_format in fields:
+            if address < position:
+                raise RuntimeError("Field %s overlaps with the previous field" % field_name)
+
+            if address > position:
+                fmt += '%dx' % (address - position)
+
+            fmt += field_format
+            position = address + struct.calcsize('<' + field_format)
+
+        if position > length:
+            raise RuntimeError("Fields exceed the structure length of %s bytes" % length)
+
+        self._length = length
+        self._struct = struct.Struct(fmt)
+        self._record = namedtuple(name, [field[0] for field in fields])
+        self._defaults = [b'' if field[2].endswith('s') else 0 for field in fields]
+
+    def get_length(self):
+        return self._length
+
+    def unpack(self, raw, address=0):
+        return self._record._make(self._struct.unpack_from(raw, address))
+
+    def pack(self, **fields) -> bytes:
+        """
+        Creates the raw structure from the given field values. Missing fields and the space between the fields
+        are filled with zeros.
+
+        :return bytes:
+        """
+        unknown = set(fields.keys()) - set(self._record._fields)
+        if len(unknown) > 0:
+            raise RuntimeError("Unknown fields %s" % ", ".join(sorted(unknown)))
+
+        values = [fields.get(name, default) for name, default in zip(self._record._fields, self._defaults)]
+
+        raw = bytearray(self._length)
+        self._struct.pack_into(raw, 0, *values)
+        return bytes(raw)
@@ -0,0 +1,162 @@
+import os
+
+from typing import List
+
+from uxdconverter.raw.header.file import FileHeader
+from uxdconverter.raw.header.range import RangeHeader
+from uxdconverter.raw.data import DataSet
+from uxdconverter.raw.measurement import MeasurementRange, Measurements
+from uxdconverter.raw.parser import RawParser
+
+
+class RangeIndexEntry(object):
+    def __init__(self, number, offset, header: RangeHeader):
+        self._number = number
+        self._offset = offset
+        self._header = header
+
+    def get_number(self):
+        return self._number
+
+    def get_offset(self):
+        """
+        Address of the range header within the file.
+        """
+        return self._offset
+
+    def get_header(self) -> RangeHeader:
+        return self._header
+
+    def get_data_offset(self):
+        return self._offset + self._header.get_length()
+
+    def get_data_length(self):
+        return self._header.get_data_length() * self._header.get_number_of_data_records()
+
+    def get_end(self):
+        return self.get_data_offset() + self.get_data_length()
+
+
+class RawIndex(object):
+    """
+    Index of the ranges in a RAW file.
+
+    Building the index only reads the file header and the range (and supplementary) headers, and records the
+    addresses of every range. The data blocks are read on demand, i.e. only for the ranges which are loaded.
+    """
+
+    def __init__(self, file):
+        self._file = file
+        self._parser = RawParser()
+        self._header = None
+        self._entries = []  # type: List[RangeIndexEntry]
+        self._end = FileHeader.LENGTH
+
+    @classmethod
+    def from_file(cls, file) -> 'RawIndex':
+        index = cls(file)
+        index.refresh()
+        return index
+
+    def get_file(self):
+        return self._file
+
+    def _open(self):
+        try:
+            return open(self._file, 'rb')
+        except:
+            raise RuntimeError("Could not open file %s" % self._file)
+
+    def _read(self, fp, offset, length):
+        fp.seek(offset)
+        return fp.read(length)
+
+    def refresh(self) -> List[RangeIndexEntry]:
+        """
+        Re-reads the file header and indexes all completed ranges which are not yet in the index.
+        Ranges which are not completely written to the file yet, are not indexed.
+
+        :return: The newly indexed entries
+        """
+        new_entries = []
+
+        with self._open() as fp:
+            raw = self._read(fp, 0, FileHeader.LENGTH)
+            if len(raw) < FileHeader.LENGTH:
+                return new_entries
+
+            self._header = FileHeader(raw)
+            file_size = os.fstat(fp.fileno()).st_size
+
+            while len(self._entries) < self._header.get_number_of_completed_data_ranges():
+                entry = self._read_entry(fp, len(self._entries), self._end, file_size)
+
+                if entry is None:
+                    break
+
+                self._entries.append(entry)
+                self._end = entry.get_end()
+                new_entries.append(entry)
+
+        return new_entries
+
+    def _read_entry(self, fp, number, offset, file_size):
+        if offset + RangeHeader.LENGTH > file_size:
+            return None
+
+        header = RangeHeader(self._read(fp, offset, RangeHeader.LENGTH))
+
+        raw_suppls = self._read(fp, offset + RangeHeader.LENGTH, header.get_supplementary_header_length())
+        if len(raw_suppls) < header.get_supplementary_header_length():
+            return None
+
+        header.set_supplementaries(self._parser.parse_supplementary_headers(memoryview(raw_suppls), header))
+
+        entry = RangeIndexEntry(number, offset, header)
+
+        if entry.get_end() > file_size:
+            return None
+
+        return entry
+
+    def get_header(self) -> FileHeader:
+        return self._header
+
+    def get_number_of_ranges(self):
+        return len(self._entries)
+
+    def get_entries(self) -> List[RangeIndexEntry]:
+        return self._entries
+
+    def get_entry(self, number) -> RangeIndexEntry:
+        return self._entries[number]
+
+    def load_range(self, number) -> MeasurementRange:
+        return self.load_ranges([number])[0]
+
+    def load_ranges(self, numbers=None) -> List[MeasurementRange]:
+        """
+        Reads the data blocks of the given ranges.
+
+        :param list numbers: Numbers of the ranges to load. If None, all indexed ranges are loaded.
+        :return:
+        """
+        if numbers is None:
+            numbers = range(len(self._entries))
+
+        entries = [self.get_entry(number) for number in numbers]
+        ranges = []
+
+        with self._open() as fp:
+            for entry in entries:
+                raw = self._read(fp, entry.get_data_offset(), entry.get_data_length())
+
+                if len(raw) < entry.get_data_length():
+                    raise RuntimeError("Data of range %s is incomplete in file %s" % (entry.get_number(), self._file))
+
+                ranges.append(MeasurementRange(entry.get_header(), DataSet(raw)))
+
+        return ranges
+
+    def load(self, numbers=None) -> Measurements:
+        return Measurements(self._header, self.load_ranges(numbers))
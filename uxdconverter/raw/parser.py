@@ -1,5 +1,4 @@
-
-import codecs
+from typing import Iterator
 
 from uxdconverter.raw.header.file import FileHeader
 from uxdconverter.raw.header.range import RangeHeader
@@ -14,59 +13,92 @@ class RawParser(object):
 
     def parse_from_file(self, file):
         try:
-            f = open(file, 'rb')
+            with open(file, 'rb') as f:
+                byte_stream = f.read()
+        except:
+            raise RuntimeError("Could not open file %s" % file)
 
-            return self.parse(f.read())
+        return self.parse(byte_stream)
+
+    def iter_from_file(self, file) -> Iterator[MeasurementRange]:
+        """
+        Yields the ranges of the file one after another, as parse_from_file would return them. The file is opened
+        once, and only the bytes of the current range are kept in memory.
+        """
+        try:
+            fp = open(file, 'rb')
         except:
             raise RuntimeError("Could not open file %s" % file)
 
+        with fp:
+            file_header = self._parse_header(memoryview(fp.read(FileHeader.LENGTH)))
+            fp.seek(file_header.get_length())
+
+            for i in range(0, file_header.get_number_of_completed_data_ranges()):
+                raw = fp.read(RangeHeader.LENGTH)
+                range_header = self._parse_range(memoryview(raw))
+                data_length = range_header.get_data_length() * range_header.get_number_of_data_records()
+                raw += fp.read(range_header.get_length() - RangeHeader.LENGTH + data_length)
+
+                yield self._parse_measurement(memoryview(raw))
+
     def parse(self, byte_stream):
-        return self._parse_measurements(byte_stream)
+        # Every header and data set is a view into this single buffer, hence
+        # walking through the ranges does not copy the remaining file content.
+        return self._parse_measurements(memoryview(byte_stream))
+
+    def _parse_header(self, raw, offset=0):
+        return FileHeader(raw[offset:offset + FileHeader.LENGTH])
 
-    def _parse_header(self, raw):
-        return FileHeader(raw[0:FileHeader.LENGTH])
+    def _parse_range(self, raw, offset=0):
+        return RangeHeader(raw[offset:offset + RangeHeader.LENGTH])
 
-    def _parse_range(self, raw):
-        return RangeHeader(raw[0:RangeHeader.LENGTH])
+    def parse_supplementary_headers(self, raw, range_header: RangeHeader, offset=0) -> Supplementaries:
+        """
+        Parses the supplementary headers of a range, which start at the given offset, i.e. directly after the range
+        header.
 
-    def _parse_supplementary_headers(self, raw, range_header: RangeHeader):
+        :param memoryview raw: Buffer containing the supplementary headers
+        :param RangeHeader range_header: Header of the range
+        :param int offset: Address of the first supplementary header in raw
+        """
         if range_header.has_supplementary_headers() is False:
             return Supplementaries()
         else:
             suppls = Supplementaries()
 
-            raw_data = raw
+            end = offset + range_header.get_supplementary_header_length()
+
+            while offset < min(end, len(raw)):
+                suppl = SupplementaryHeader(raw[offset:end])
+                if suppl.get_length() <= 0:
+                    raise RuntimeError("Invalid supplementary header length at address %s" % offset)
 
-            while len(raw_data) > 0 and suppls.get_length() < range_header.get_supplementary_header_length():
-                suppl = SupplementaryHeader(raw)
                 suppls.add_supplementary(suppl)
-                raw_data = raw_data[suppl.get_length():]
+                offset += suppl.get_length()
 
             return suppls
 
-    def _parse_data(self, raw, range_header: RangeHeader):
-        return DataSet(raw[0: range_header.get_data_length() * range_header.get_number_of_data_records()])
-
-    def _parse_measurement(self, raw):
+    def _parse_data(self, raw, range_header: RangeHeader, offset=0):
+        length = range_header.get_data_length() * range_header.get_number_of_data_records()
+        return DataSet(raw[offset:offset + length])
 
-        range = self._parse_range(raw)
-        raw = raw[range.get_length():]
-        suppls = self._parse_supplementary_headers(raw, range)
+    def _parse_measurement(self, raw, offset=0):
+        range = self._parse_range(raw, offset)
+        suppls = self.parse_supplementary_headers(raw, range, offset + RangeHeader.LENGTH)
         range.set_supplementaries(suppls)
-        raw = raw[suppls.get_length():]
-        data = self._parse_data(raw, range)
+        data = self._parse_data(raw, range, offset + range.get_length())
 
         return MeasurementRange(range, data)
 
     def _parse_measurements(self, raw):
         file = self._parse_header(raw)
-        raw = raw[file.get_length():]
+        offset = file.get_length()
         mss = []
 
         for i in range(0, file.get_number_of_completed_data_ranges()):
-            ms = self._parse_measurement(raw)
-            raw = raw[ms.get_length():]
+            ms = self._parse_measurement(raw, offset)
+            offset += ms.get_length()
             mss.append(ms)
 
-
         return Measurements(file, mss)
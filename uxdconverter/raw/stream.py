@@ -0,0 +1,144 @@
+import hashlib
+import os
+import time
+
+from typing import Iterator, List
+
+from uxdconverter.measurement import Measurement
+from uxdconverter.raw.converter import MeasurementConverter
+from uxdconverter.raw.header.file import FileHeader
+from uxdconverter.raw.index import RawIndex
+
+
+class RawFileFollower(object):
+    """
+    Follows a RAW file which is still being written by the diffractometer.
+
+    Every poll re-opens the file, checks the number of completed data ranges in the file header and decodes only
+    the ranges which were completed since the last poll. Ranges which are not completely written yet are picked up
+    by a later poll.
+
+    If the file is replaced or shrinks, e.g. a new measurement was started with the same file name, the index is
+    rebuilt and the ranges of the new file are returned from the beginning. The same happens if the ranges read so far
+    were overwritten in-place, which is detected by a fingerprint of the beginning and the end of these ranges. Hence,
+    an in-place rewrite which only changes data in the middle of the ranges read so far is not detected.
+    """
+
+    # Number of bytes at the beginning and at the end of the ranges read so far, which are part of the fingerprint
+    FINGERPRINT_SIZE = 64 * 1024
+
+    def __init__(self, file):
+        self._file = file
+        self._index = RawIndex(file)
+        self._converter = MeasurementConverter()
+        # (device, inode) and size of the file at the last poll
+        self._identity = None
+        self._size = 0
+        self._fingerprint = None
+
+    def get_index(self) -> RawIndex:
+        return self._index
+
+    def get_number_of_ranges(self):
+        return self._index.get_number_of_ranges()
+
+    def reset(self):
+        """
+        Forgets all ranges read so far, i.e. the next poll reads the file from the beginning.
+        """
+        self._index = RawIndex(self._file)
+        self._fingerprint = None
+
+    def _get_fingerprint(self):
+        """
+        Hash of the beginning and the end of the ranges read so far, or None if no range was read yet. The file header
+        is not part of it, since it changes with every completed range.
+        """
+        entries = self._index.get_entries()
+        if len(entries) == 0:
+            return None
+
+        start = FileHeader.LENGTH
+        end = entries[-1].get_end()
+        tail = max(start, end - self.FINGERPRINT_SIZE)
+
+        digest = hashlib.sha1()
+        try:
+            with open(self._file, 'rb') as fp:
+                fp.seek(start)
+                digest.update(fp.read(min(self.FINGERPRINT_SIZE, end - start)))
+                fp.seek(tail)
+                digest.update(fp.read(end - tail))
+        except OSError:
+            return None
+
+        return digest.hexdigest()
+
+    def poll(self) -> List[Measurement]:
+        """
+        Returns the measurements of all ranges which were completed since the last poll.
+
+        :return list(Measurement):
+        """
+        try:
+            stat = os.stat(self._file)
+        except OSError:
+            return []
+
+        identity = (stat.st_dev, stat.st_ino)
+        if self._identity is not None and (identity != self._identity or stat.st_size < self._size):
+            self.reset()
+        elif self._fingerprint is not None and self._get_fingerprint() != self._fingerprint:
+            # the file was rewritten in-place, with the same or a larger size
+            self.reset()
+
+        self._identity = identity
+        self._size = stat.st_size
+
+        entries = self._index.refresh()
+
+        header = self._index.get_header()
+        if header is not None and header.get_number_of_completed_data_ranges() < self._index.get_number_of_ranges():
+            # the file was rewritten in-place with fewer ranges
+            self.reset()
+            entries = self._index.refresh()
+
+        ranges = self._index.load_ranges([entry.get_number() for entry in entries])
+        self._fingerprint = self._get_fingerprint()
+
+        measurements = []
+        for ms_range in ranges:
+            measurement = self._converter.convert(ms_range)
+            measurement.file_name = self._file
+            measurements.append(measurement)
+
+        return measurements
+
+    def follow(self, interval=1.0, idle_timeout=None, number_of_ranges=None) -> Iterator[Measurement]:
+        """
+        Yields the measurements of the file as soon as their range is completed.
+
+        :param float interval: Time in seconds between two polls
+        :param float idle_timeout: Stop if no new range was completed within this time (in seconds).
+                                   If None, follow forever.
+        :param int number_of_ranges: Stop after this many ranges were read, e.g. the number of ranges of the job.
+        :return:
+        """
+        last_update = time.monotonic()
+
+        while True:
+            measurements = self.poll()
+
+            if len(measurements) > 0:
+                last_update = time.monotonic()
+
+            for measurement in measurements:
+                yield measurement
+
+            if number_of_ranges is not None and self.get_number_of_ranges() >= number_of_ranges:
+                return
+
+            if idle_timeout is not None and time.monotonic() - last_update > idle_timeout:
+                return
+
+            time.sleep(interval)
@@ -0,0 +1,139 @@
+import hashlib
+
+import numpy as np
+
+from typing import List
+
+from uxdconverter.converter import Converter
+from uxdconverter.measurement import Measurements, Measurement, MeasurementContext
+from uxdconverter.operation import ErrorCalculation
+from uxdconverter.pipeline import PipelineStage, remove_strange_data_points
+
+
+class ReductionGraph(object):
+    """
+    Memoized reduction of measurements, e.g. for interactive previews.
+
+    The reduction is done by the steps of a uxdconverter.converter.Converter, modelled as a graph of nodes:
+
+        merge ------\\
+                     subtract -> illumination -> error -> qz -> cropping -> normalization
+        background -/
+
+    The result of every node is cached, keyed by the key of its parents and the MeasurementContext attributes the
+    node depends on. Hence, if e.g. only the qz range changed, merging and the corrections before the cropping are not
+    computed again.
+
+    Only the most recent result of each node is kept.
+    """
+
+    def __init__(self, converter: Converter = None):
+        """
+        :param Converter converter: Provides the merging, the background subtraction and the stages of the reduction.
+                                    Its measurements are not used. Defaults to a Converter with the default stages.
+        """
+        if converter is None:
+            converter = Converter()
+
+        self._converter = converter
+        self._cache = {}
+        self._computed = []
+
+    def get_stages(self) -> List[PipelineStage]:
+        return self._converter.get_stages()
+
+    def insert_stage(self, stage: PipelineStage, before=None, after=None):
+        """
+        Inserts an additional correction, see Converter.insert_stage. The cached results are discarded.
+        """
+        self._converter.insert_stage(stage, before, after)
+        self.clear()
+
+    def remove_stage(self, name):
+        self._converter.remove_stage(name)
+        self.clear()
+
+    def clear(self):
+        self._cache = {}
+
+    def get_computed_nodes(self) -> List[str]:
+        """
+        Returns the names of the nodes which were computed (i.e. not taken from the cache) in the last reduction.
+        """
+        return list(self._computed)
+
+    def _fingerprint(self, measurements: List[Measurement]):
+        digest = hashlib.sha1()
+
+        for ms in measurements:
+            digest.update(str(ms.get_length()).encode('utf-8'))
+            # the columns are contiguous, hence they are hashed without copying them
+            for column in ms.get_columns():
+                digest.update(column)
+
+        return digest.hexdigest()
+
+    def _context_key(self, context: MeasurementContext, fields):
+        if fields is None:
+            return context.to_dict()
+
+        return tuple([getattr(context, field) for field in fields])
+
+    def _node(self, name, key, compute):
+        cached = self._cache.get(name)
+
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        result = compute()
+        self._cache[name] = (key, result)
+        self._computed.append(name)
+
+        return result
+
+    def _merge_backgrounds(self, backgrounds: List[Measurement]):
+        # merging scales the measurements, hence we work on copies to keep the inputs (and their fingerprint) intact.
+        return self._converter.merge_backgrounds([ms.copy() for ms in backgrounds])
+
+    def _subtract_background(self, measurement: Measurement, background: Measurement):
+        measurement = self._converter.subtract_background(measurement, background)
+
+        # the data of a measurement is read-only, hence it can be cached without copying it
+        return measurement.get_headers(), measurement.get_data_view()
+
+    def _apply_stage(self, stage: PipelineStage, data: np.ndarray, context: MeasurementContext):
+        if stage.is_enabled(context):
+            data = remove_strange_data_points(stage.get_manipulation().apply(np.array(data), context))
+            data.setflags(write=False)
+
+        return data
+
+    def reduce(self, measurements: Measurements) -> Measurement:
+        """
+        Reduces the measurements to a single measurement, see uxdconverter.converter.Converter.convert
+        """
+        mss = measurements.get_measurements()
+        backgrounds = measurements.get_background_measurements()
+        context = measurements.get_context()
+
+        if len(mss) == 0:
+            raise ValueError("Cannot convert if no measurement was given.")
+
+        self._computed = []
+
+        merge_key = ('merge', self._fingerprint(mss), self._context_key(context, ErrorCalculation.CONTEXT_FIELDS))
+        merged = self._node('merge', merge_key, lambda: self._converter.merge(mss, context))
+
+        background_key = ('background', self._fingerprint(backgrounds))
+        background = self._node('background', background_key, lambda: self._merge_backgrounds(backgrounds))
+
+        key = ('subtract', merge_key, background_key)
+        headers, data = self._node('subtract', key, lambda: self._subtract_background(merged, background))
+
+        for stage in self._converter.get_stages():
+            key = (stage.get_name(), key, stage.is_enabled(context),
+                   self._context_key(context, stage.get_context_fields()))
+            data = self._node(stage.get_name(), key, lambda stage=stage, data=data: self._apply_stage(stage, data,
+                                                                                                      context))
+
+        return Measurement(headers, data)
@@ -5,6 +5,7 @@ from typing import List
 from uxdconverter.ui.gui import Ui_UXDConverter
 from uxdconverter.ui.graph import Plotting
 from uxdconverter.converter import Converter
+from uxdconverter.reduction import ReductionGraph
 from uxdconverter.exporter import FileExporter, ParrattExportAlgorithm, ORSOExportAlgorithm
 from uxdconverter.measurement import MeasurementContext, Measurements
 from uxdconverter.operation import DataNormalization
@@ -13,6 +14,7 @@ from PyQt5.QtWidgets import QFileDialog, QTreeWidgetItem, QHeaderView, QMessageB
 from PyQt5.QtCore import Qt, pyqtSignal, QObject
 
 from uxdconverter.parser.general import GeneralParser
+from uxdconverter.cache import ParseCache
 from uxdconverter.ui.util import shortify_path
 from uxdconverter.ui.controllers.settings import SettingsTabController
 from uxdconverter.ui.controllers.xrd import XrdControllerTab
@@ -65,7 +67,10 @@ class Controller(QObject):
         self.app = app
         self.ui = ui
         self.logger = get_logger(__name__)
+        # parsed files are cached on disk only if enabled in the settings, see set_parse_cache
         self._parser = GeneralParser(self.logger)
+        # keeps the intermediate results, such that changing e.g. the qz range does not merge again.
+        self._reduction = ReductionGraph()
         self._files = [] # type: List[MeasurementFile]
 
 
@@ -107,6 +112,9 @@ class Controller(QObject):
 
         self.filesChanged.connect(self.update_file_list)
 
+    def set_parse_cache(self, enabled):
+        self._parser.set_cache(ParseCache() if enabled else None)
+
     def load_view(self, view_class):
         view = view_class()
 
@@ -309,7 +317,7 @@ class Controller(QObject):
 
         try:
             measurements = self.setup_measurement()
-            ms = Converter(measurements).convert()
+            ms = self._reduction.reduce(measurements)
         except Exception as e:
             self.logger.exception(e)
             return
@@ -336,7 +344,7 @@ class Controller(QObject):
     def plot_preview(self):
         try:
             ctx = self._settings_controller.get_measurement_context()
-            self._plotting.plot([Converter(self.setup_measurement()).convert()], ctx)
+            self._plotting.plot([self._reduction.reduce(self.setup_measurement())], ctx)
         except Exception as e:
             self.logger.exception(e)
 
@@ -35,8 +35,8 @@ class MeasurementTabController(object):
         item.setData(2, Qt.UserRole, measurement.file_name)
 
         region = QTreeWidgetItem(item)
-        data_region = measurement.get_data_region_x()
-        region.setText(0, f"Theta [deg]: {data_region[1]} ... {data_region[0]}")
+        summary = measurement.get_summary()
+        region.setText(0, f"Theta [deg]: {summary.get_x_min()} ... {summary.get_x_max()}")
         # region.setText(1, "Qz [Ang]: %s ... %s" % (datapoint_to_qz(data_region[1], context), datapoint_to_qz(data_region[0], context)))
         region.setFlags(region.flags() ^ Qt.ItemIsSelectable)
 
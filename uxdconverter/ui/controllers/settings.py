@@ -69,6 +69,9 @@ class SettingsModel():
     def read_plot_log_scale(self):
         return self.read_checkbox(self.ui.plot_log_scale)
 
+    def read_cache_files(self):
+        return self.read_checkbox(self.ui.cache_files)
+
     def read_normalization_max(self):
         return self.read_radio(self.ui.normalization_max)
 
@@ -102,12 +105,17 @@ class SettingsTabController(object):
         self.ui = ui
         self.app = app
         self._logger = get_logger(__name__)
+        self._parent = parent_controller
 
         self.model = SettingsModel(self.ui, parent_controller._trans_db)
         self.setup()
 
     def setup(self):
         self.ui.convert_qz.clicked.connect(self.update_label_data)
+        self.ui.cache_files.clicked.connect(self.update_cache)
+
+    def update_cache(self):
+        self._parent.set_parse_cache(self.model.read_cache_files())
 
     def update_label_data(self):
         if self.model.read_convert_qz():
@@ -31,7 +31,7 @@ class MeasurementTreeData(object):
         self._grouped = defaultdict(list)
 
     def add_measurements(self, measurements: Measurements):
-        for ms in measurements.get_measurements():
+        for ms in measurements.iter_measurements():
             self.add_measurement(ms)
 
     def add_measurement(self, measurement: Measurement):
@@ -138,7 +138,7 @@ class StressAnalysisController(object):
 
             # What is zip(..., color_cycle) doing? see https://matplotlib.org/cycler/#examples
             for ms, color in zip(measurements, color_cycle):
-                theta, dTheta, Int, dInt = zip(*ms.get_data())
+                theta, dTheta, Int, dInt = ms.get_columns()
                 # **color will yield key=value
                 # where key="color" (key of the cycler) and value is the current value of the cycle
                 ax.errorbar(theta, Int, xerr=dTheta, yerr=dInt, fmt=fmt, label=ms.get_display_name(), **color)
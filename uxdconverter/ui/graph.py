@@ -24,11 +24,7 @@ class Plotting(object):
 
         handles = []
         for ms in measurement:
-            data = ms.get_data()
-            x = [x[0] for x in data]
-            x_err = [x[1] for x in data]
-            y = [x[2] for x in data]
-            y_err = [x[3] for x in data]
+            x, x_err, y, y_err = ms.get_columns()
 
             handles.append(plt.errorbar(x, y, xerr=x_err, yerr=y_err, markeredgewidth=1, capsize=2))
 
@@ -60,10 +56,8 @@ class Plotting(object):
         plt.show()
 
     def interactive_plot(self, measurement: Measurement, signal=None):
-        data = measurement.get_data()
-
-        x = [x[0] for x in data]
-        y = [x[2] for x in data]
+        x = measurement.get_x()
+        y = measurement.get_y()
         global picked, norm
         picked = []
         norm = None
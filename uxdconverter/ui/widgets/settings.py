@@ -143,6 +143,12 @@ class Ui_Settings(object):
         self.plot_log_scale.setChecked(True)
         self.plot_log_scale.setObjectName("plot_log_scale")
         self.gridLayout_22.addWidget(self.plot_log_scale, 0, 1, 1, 1)
+        self.label_cache_files = QtWidgets.QLabel(self.groupBox_7)
+        self.label_cache_files.setObjectName("label_cache_files")
+        self.gridLayout_22.addWidget(self.label_cache_files, 1, 0, 1, 1)
+        self.cache_files = QtWidgets.QCheckBox(self.groupBox_7)
+        self.cache_files.setObjectName("cache_files")
+        self.gridLayout_22.addWidget(self.cache_files, 1, 1, 1, 1)
         self.gridLayout_23.addLayout(self.gridLayout_22, 0, 0, 1, 1)
         self.gridLayout_5.addWidget(self.groupBox_7, 2, 1, 1, 1)
         self.gridLayout.addLayout(self.gridLayout_5, 0, 0, 1, 1)
@@ -188,3 +194,6 @@ class Ui_Settings(object):
         self.groupBox_7.setTitle(_translate("Settings", "Plotting settings"))
         self.label_plot_yaxis.setText(_translate("Settings", "log y - Axis"))
         self.plot_log_scale.setText(_translate("Settings", "Enabled"))
+        self.label_cache_files.setText(_translate("Settings", "Cache parsed files"))
+        self.cache_files.setToolTip(_translate("Settings", "Store parsed files in the user cache directory, such that they are loaded faster next time"))
+        self.cache_files.setText(_translate("Settings", "Enabled"))
@@ -0,0 +1,73 @@
+import struct
+
+from typing import List
+
+from uxdconverter.raw.header.file import FileHeader
+from uxdconverter.raw.header.range import RangeHeader
+from uxdconverter.raw.header.supplementary import SupplementaryHeader
+from uxdconverter.raw.data import DataSet
+from uxdconverter.writer.synthetic import SyntheticRange
+
+
+class RawFileWriter(object):
+    """
+    Writes RAW1.01 files, readable by uxdconverter.raw.parser.RawParser
+    """
+
+    def __init__(self, ranges: List[SyntheticRange], wavelength=1.5406, anode='Cu', date='01/01/20', time='00:00:00'):
+        self._ranges = ranges
+        self._wavelength = wavelength
+        self._anode = anode
+        self._date = date
+        self._time = time
+
+    def write(self, file):
+        with open(file, 'wb') as fp:
+            fp.write(self.to_bytes())
+
+    def to_bytes(self) -> bytes:
+        return b''.join([self._file_header()] + [self._range(ms_range) for ms_range in self._ranges])
+
+    def _file_header(self):
+        total_time = sum([ms_range.step_time * ms_range.get_number_of_data_points() for ms_range in self._ranges])
+
+        return FileHeader.LAYOUT.pack(
+            raw_version=b'RAW1.01',
+            number_of_completed_data_ranges=len(self._ranges),
+            date=self._date.encode('utf-8'),
+            time=self._time.encode('utf-8'),
+            type_anode=self._anode.encode('utf-8'),
+            average_wavelength=self._wavelength,
+            units_wavelength=b'A',
+            total_measurement_time=total_time,
+        )
+
+    def _supplementary_headers(self, ms_range: SyntheticRange):
+        if ms_range.comment is None:
+            return b''
+
+        # type, length, reserved and the comment, padded to a multiple of four bytes.
+        comment = ms_range.comment.encode('utf-8')
+        comment += b'\x00' * (4 - len(comment) % 4)
+        length = 12 + len(comment)
+
+        return struct.pack('<III', SupplementaryHeader.TYPE_RANGE_COMMENT, length, 0) + comment
+
+    def _range(self, ms_range: SyntheticRange):
+        suppls = self._supplementary_headers(ms_range)
+
+        header = RangeHeader.LAYOUT.pack(
+            header_length=RangeHeader.LENGTH,
+            number_of_data_records=ms_range.get_number_of_data_points(),
+            start_theta=ms_range.get_start_theta(),
+            start_two_theta=ms_range.start_two_theta,
+            scan_mode=RangeHeader.SCAN_MODE_CONTINOUS,
+            step_size=ms_range.step_size,
+            step_time=ms_range.step_time,
+            measurement_mode=ms_range.mode,
+            wavelength=self._wavelength,
+            data_length=DataSet.LENGTH_FLOAT,
+            supplementary_header_length=len(suppls),
+        )
+
+        return header + suppls + ms_range.counts.astype(DataSet.DTYPE).tobytes()
@@ -0,0 +1,96 @@
+import numpy as np
+
+from typing import List
+
+from uxdconverter.raw.header.range import RangeHeader
+
+
+class SyntheticRange(object):
+    """
+    A single scan range, as it is written by the file writers.
+
+    The angles follow the RAW conventions: The detector moves in steps of step_size (in 2theta), starting at
+    start_two_theta. The sample angle theta starts at start_two_theta / 2 + psi.
+    """
+
+    def __init__(self, start_two_theta, step_size, counts, step_time=1.0,
+                 mode=RangeHeader.MEASUREMENT_LOCKED_COUPLED, psi=0.0, comment=None):
+        self.start_two_theta = float(start_two_theta)
+        self.step_size = float(step_size)
+        self.counts = np.asarray(counts, dtype=float)
+        self.step_time = float(step_time)
+        self.mode = mode
+        self.psi = float(psi)
+        self.comment = comment
+
+    def get_number_of_data_points(self):
+        return len(self.counts)
+
+    def get_two_theta(self) -> np.ndarray:
+        return self.start_two_theta + np.arange(len(self.counts)) * self.step_size
+
+    def get_start_theta(self):
+        return self.start_two_theta / 2.0 + self.psi
+
+    def get_end_two_theta(self):
+        return self.start_two_theta + (len(self.counts) - 1) * self.step_size
+
+
+class SyntheticMeasurementGenerator(object):
+    """
+    Generates synthetic scan ranges with a reflectivity-like intensity, i.e. a plateau of total reflection, a
+    steep flank followed by a q^-4 decay with Kiessig fringes, a constant background and poisson noise.
+    """
+
+    def __init__(self, seed=0, intensity=1e6, background=2.0, critical_two_theta=0.5, thickness=300.0,
+                 wavelength=1.5406):
+        self._random = np.random.default_rng(seed)
+        self._intensity = intensity
+        self._background = background
+        self._critical_two_theta = critical_two_theta
+        self._thickness = thickness
+        self._wavelength = wavelength
+
+    def reflectivity(self, two_theta):
+        two_theta = np.asarray(two_theta, dtype=float)
+        ratio = np.maximum(two_theta, 1e-6) / self._critical_two_theta
+
+        decay = np.where(ratio <= 1, 1.0, ratio ** -4)
+        qz = 4 * np.pi / self._wavelength * np.sin(np.deg2rad(two_theta / 2.0))
+        fringes = 1 + 0.5 * np.cos(qz * self._thickness) * np.minimum(ratio, 1)
+
+        return self._intensity * decay * fringes + self._background
+
+    def generate(self, number_of_ranges=4, points_per_range=200, step_size=0.01, start_two_theta=0.1,
+                 overlap=0.2, step_time=1.0, modes=None, psi_offsets=None) -> List[SyntheticRange]:
+        """
+        Generates consecutive, overlapping ranges.
+
+        :param int number_of_ranges: Number of ranges
+        :param int points_per_range: Number of data points per range
+        :param float step_size: Step size in 2theta (deg)
+        :param float start_two_theta: 2theta of the first data point (deg)
+        :param float overlap: Fraction of a range which overlaps with the previous range
+        :param float step_time: Counting time per data point (s)
+        :param list modes: Measurement modes (RangeHeader.MEASUREMENT_*), cycled over the ranges
+        :param list psi_offsets: Psi offsets (deg), cycled over the ranges
+        :return list(SyntheticRange):
+        """
+        if modes is None:
+            modes = [RangeHeader.MEASUREMENT_LOCKED_COUPLED]
+
+        if psi_offsets is None:
+            psi_offsets = [0.0]
+
+        advance = max(1, int(round(points_per_range * (1 - overlap))))
+
+        ranges = []
+        for i in range(number_of_ranges):
+            start = start_two_theta + i * advance * step_size
+            two_theta = start + np.arange(points_per_range) * step_size
+            counts = self._random.poisson(self.reflectivity(two_theta) * step_time).astype(float)
+
+            ranges.append(SyntheticRange(start, step_size, counts, step_time=step_time,
+                                         mode=modes[i % len(modes)], psi=psi_offsets[i % len(psi_offsets)]))
+
+        return ranges
@@ -0,0 +1,60 @@
+from typing import List
+
+from uxdconverter.writer.synthetic import SyntheticRange
+
+
+class UXDFileWriter(object):
+    """
+    Writes UXD files, readable by uxdconverter.parser.uxd.MeasurementsParser
+
+    The intensities are written as counts per second in the _2THETACPS data section.
+    """
+
+    def __init__(self, ranges: List[SyntheticRange], wavelength=1.5406, sample='synthetic', decimal='.'):
+        self._ranges = ranges
+        self._wavelength = wavelength
+        self._sample = sample
+        self._decimal = decimal
+
+    def write(self, file):
+        with open(file, 'w', encoding='utf-8') as fp:
+            fp.write(self.to_string())
+
+    def to_string(self) -> str:
+        lines = self._file_header()
+
+        for number, ms_range in enumerate(self._ranges):
+            lines += self._range(number + 1, ms_range)
+
+        return "\n".join(lines) + "\n"
+
+    def _number(self, value, fmt="{:.6f}"):
+        return fmt.format(value).replace('.', self._decimal)
+
+    def _file_header(self):
+        return [
+            "; UXD file written by UXDConverter",
+            "_FILEVERSION=1",
+            "_SAMPLE='%s'" % self._sample,
+            "_WL1=%s" % self._number(self._wavelength),
+            ";",
+        ]
+
+    def _range(self, number, ms_range: SyntheticRange):
+        lines = [
+            "; (Data for Range number %s)" % number,
+            "_STEPTIME=%s" % self._number(ms_range.step_time),
+            "_STEPSIZE=%s" % self._number(ms_range.step_size),
+            "_STEPMODE='C'",
+            "_START=%s" % self._number(ms_range.start_two_theta),
+            "_THETA=%s" % self._number(ms_range.get_start_theta()),
+            "_2THETA=%s" % self._number(ms_range.start_two_theta),
+            "_2THETACPS",
+        ]
+
+        cps = ms_range.counts / ms_range.step_time
+
+        for two_theta, value in zip(ms_range.get_two_theta(), cps):
+            lines.append("%s %s" % (self._number(two_theta, "{:12.5f}"), self._number(value, "{:14.5f}")))
+
+        return lines
@@ -0,0 +1,96 @@
+import numpy as np
+
+from typing import List
+from xml.sax.saxutils import escape
+
+from uxdconverter.writer.synthetic import SyntheticRange
+
+NAMESPACE = 'http://www.xrdml.com/XRDMeasurement/1.5'
+
+
+class XRDMLFileWriter(object):
+    """
+    Writes XRDML documents, readable by uxdconverter.parser.xrdml.XRDMLParser
+
+    Every range is written as a single scan with a 2Theta and an Omega axis, where omega = theta + psi.
+    """
+
+    def __init__(self, ranges: List[SyntheticRange], wavelength=1.5406, detector_mode='Scanning', sample='synthetic',
+                 use_intensities=False, use_list_positions=False):
+        self._ranges = ranges
+        self._wavelength = wavelength
+        self._detector_mode = detector_mode
+        self._sample = sample
+        self._use_intensities = use_intensities
+        self._use_list_positions = use_list_positions
+
+    def write(self, file):
+        with open(file, 'w', encoding='utf-8') as fp:
+            fp.write(self.to_string())
+
+    def to_string(self) -> str:
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<xrdMeasurements xmlns="%s" status="Completed">' % NAMESPACE,
+            '  <sample type="To be analyzed"><id>%s</id><name>%s</name></sample>' % (escape(self._sample),
+                                                                                      escape(self._sample)),
+            '  <xrdMeasurement measurementType="Repeated scan" status="Completed" sampleMode="Reflection">',
+            '    <usedWavelength intended="K-Alpha 1">',
+            '      <kAlpha1 unit="Angstrom">%s</kAlpha1>' % self._wavelength,
+            '    </usedWavelength>',
+            '    <diffractedBeamPath radius="240.00">',
+            '      <detector name="synthetic">',
+            '        <mode>%s</mode>' % escape(self._detector_mode),
+            '      </detector>',
+            '    </diffractedBeamPath>',
+        ]
+
+        for number, ms_range in enumerate(self._ranges):
+            lines += self._scan(number + 1, ms_range)
+
+        lines += [
+            '  </xrdMeasurement>',
+            '</xrdMeasurements>',
+        ]
+
+        return "\n".join(lines) + "\n"
+
+    def _positions(self, axis, start, end, number_of_steps):
+        if self._use_list_positions:
+            positions = " ".join(["%.6f" % position for position in np.linspace(start, end, number_of_steps)])
+            return [
+                '        <positions axis="%s" unit="deg">' % axis,
+                '          <listPositions>%s</listPositions>' % positions,
+                '        </positions>',
+            ]
+
+        return [
+            '        <positions axis="%s" unit="deg">' % axis,
+            '          <startPosition>%.6f</startPosition>' % start,
+            '          <endPosition>%.6f</endPosition>' % end,
+            '        </positions>',
+        ]
+
+    def _scan(self, number, ms_range: SyntheticRange):
+        two_theta_start = ms_range.start_two_theta
+        two_theta_end = ms_range.get_end_two_theta()
+        omega_start = two_theta_start / 2.0 + ms_range.psi
+        omega_end = two_theta_end / 2.0 + ms_range.psi
+
+        counts = " ".join(map(str, ms_range.counts.astype(int)))
+
+        if self._use_intensities:
+            intensities = '        <intensities unit="counts">%s</intensities>' % counts
+        else:
+            intensities = '        <counts unit="counts">%s</counts>' % counts
+
+        return ([
+            '    <scan appendNumber="%s" mode="Continuous" scanAxis="Gonio" status="Completed">' % number,
+            '      <dataPoints>',
+        ] + self._positions('2Theta', two_theta_start, two_theta_end, ms_range.get_number_of_data_points())
+          + self._positions('Omega', omega_start, omega_end, ms_range.get_number_of_data_points()) + [
+            '        <commonCountingTime unit="seconds">%s</commonCountingTime>' % ms_range.step_time,
+            intensities,
+            '      </dataPoints>',
+            '    </scan>',
+        ])